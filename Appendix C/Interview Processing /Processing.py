@@ -7,11 +7,20 @@ from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.style import WD_STYLE_TYPE
 import os
+import csv
+from collections import namedtuple
+from functools import lru_cache
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
 from nltk.tag import pos_tag
 from nltk.stem import WordNetLemmatizer
+import sys
+
+# Make the shared qualkit package importable when run from this folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.keywords import KeywordAutomaton
+from qualkit.segment import GUIDE_PATH, load_guide, segment_turns
 
 # Download necessary NLTK resources
 try:
@@ -26,215 +35,421 @@ except LookupError:
     nltk.download('stopwords')
     nltk.download('wordnet')
 
-def clean_transcript(input_file, output_file=None):
+# Speaker mapping table: which label means which speaker, per transcript
+SPEAKERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'speakers.csv')
+
+# Common filler words and phrases removed from every turn. A trailing '+'
+# lets the last letter repeat ('um+' also removes 'ummm'). More can be loaded
+# from a file with --disfluencies.
+DISFLUENCIES = ['um+', 'uh+', 'like', 'you know', 'I mean', 'so', 'just', 'kind of',
+                'sort of', 'literally', 'basically']
+
+# One turn of a cleaned transcript. transcript is the file's id (e.g. 'P7-1'),
+# participant the person speaking ('P7', or 'Interviewer'), index the number
+# of the turn, speaker 'Interviewer' or 'Expert', label the name the raw
+# transcript used ('Speaker 1'), section the number of the topic section it
+# belongs to and topic its interview guide topic (None if not segmented by guide).
+Turn = namedtuple('Turn', ['transcript', 'participant', 'index', 'speaker', 'label', 'text', 'section', 'topic'],
+                  defaults=(None,))
+
+
+def transcript_id(path):
     """
-    Clean a transcript from a Word file by:
-    - Removing timestamps
-    - Organizing content into logical sections
-    - Cleaning up speech disfluencies
-    - Improving conversation flow
-    - Clearly identifying speakers
-    - Preserving technical terminology
-    - Clarifying ambiguous statements
-    
+    Id of a transcript file: 'P7-1--edited.docx' -> 'P7-1', 'PV2.docx' -> 'PV2'
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'(--edited|_cleaned)+$', '', name)
+
+
+def participant_id(transcript):
+    """
+    Participant of a transcript id: 'P7-1' -> 'P7', 'PV2' -> 'PV2'
+
+    Returns:
+        str: The participant, or the transcript id itself if it has none
+    """
+    match = re.match(r'(PV\d+|P\d+|F\d+)', transcript or '')
+    return match.group(1) if match else transcript
+
+
+def load_speaker_table(path=SPEAKERS_FILE):
+    """
+    Read the speaker mapping table.
+
+    The table is a CSV file with columns transcript, label and speaker. Rows
+    with transcript '*' apply to every transcript; rows for a transcript id
+    override them.
+
     Args:
-        input_file (str): Path to the input Word file
-        output_file (str, optional): Path to save the cleaned transcript. 
-                                    If None, will use input_file_cleaned.docx
-    
+        path (str): Path to the table
+
     Returns:
-        str: Path to the saved cleaned transcript
+        dict: transcript id -> {label (lowercase): speaker}
     """
-    # Set default output file if not provided
-    if output_file is None:
-        file_name, file_ext = os.path.splitext(input_file)
-        output_file = f"{file_name}_cleaned.docx"
-    
-    print(f"Reading transcript from: {input_file}")
-    
-    try:
-        # Load the document
-        doc = Document(input_file)
-        full_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        
-        # Extract the cleaned content
-        cleaned_text = process_transcript(full_text)
-        
-        # Create a new document with the cleaned content
-        create_formatted_document(cleaned_text, output_file)
-        
-        print(f"Cleaned transcript saved to: {output_file}")
-        return output_file
-        
-    except Exception as e:
-        print(f"Error processing transcript: {str(e)}")
-        return None
+    table = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            table.setdefault(row['transcript'].strip(), {})[row['label'].strip().lower()] = row['speaker'].strip()
+    return table
 
-def process_transcript(text):
-    """Process the transcript text to clean and organize it"""
-    
-    # Step 1: Remove timestamps (assuming formats like [00:15] or (12:45) or 10:30 or standalone 00:00:05)
-    text = re.sub(r'[\[\(]?\d{1,2}:\d{2}(:\d{2})?[\]\)]?', '', text)
-    
-    # Step 2: Identify and standardize speaker labels
-    # First, handle Speaker notation with asterisks pattern like "*Speaker 1: *" or "*Speaker 2: *"
-    text = re.sub(r'\*Speaker 1:\s*\*', 'Interviewer: ', text, flags=re.IGNORECASE)
-    text = re.sub(r'\*Speaker 2:\s*\*', 'Expert: ', text, flags=re.IGNORECASE)
-    
-    # Then handle other common speaker notations
-    text = re.sub(r'\b(?:Interviewer|Questioner|Q|Interviewier)[\s:]+', 'Interviewer: ', text, flags=re.IGNORECASE)
-    text = re.sub(r'\b(?:Michael|Expert|Subject|Respondent|A|Mike)[\s:]+', 'Expert: ', text, flags=re.IGNORECASE)
-    
-    # Step 3: Clean up speech disfluencies
+
+def speaker_mapping(table, transcript=None):
+    """
+    Labels and speakers of one transcript: the '*' rows of the table, with the
+    rows of the transcript on top.
+
+    Returns:
+        dict: label (lowercase) -> speaker
+    """
+    mapping = dict(table.get('*', {}))
+    mapping.update(table.get(transcript, {}))
+    return mapping
+
+
+@lru_cache(maxsize=None)
+def _speaker_pattern(labels):
+    # Longest labels first, so that 'Speaker 12' is not read as 'Speaker 1'.
+    # A label starts a turn when it is followed by a colon ("Speaker 1: ...",
+    # "*Speaker 2: *...") or stands alone on its line (Teams, once the time
+    # after the name is removed).
+    alternatives = '|'.join(re.escape(label) for label in sorted(labels, key=len, reverse=True))
+    return re.compile(r'^[\s*]*(?P<label>' + alternatives + r')\s*(?::\s*\**\s*(?P<text>.*)|$)',
+                      re.IGNORECASE)
+
+
+def compile_speaker_pattern(mapping):
+    """
+    One compiled pattern that matches the start of a turn of any mapped speaker.
+
+    Args:
+        mapping (dict): label -> speaker, from speaker_mapping
+
+    Returns:
+        re.Pattern: Match objects have the groups 'label' and 'text'
+    """
+    return _speaker_pattern(tuple(sorted(mapping)))
+
+
+def load_disfluencies(path):
+    """
+    Read filler words and phrases from a text file, one per line.
+
+    Empty lines and lines starting with '#' are skipped.
+
+    Returns:
+        list: The phrases
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+@lru_cache(maxsize=None)
+def _disfluency_automaton(phrases):
+    return KeywordAutomaton(phrases)
+
+
+def disfluency_automaton(phrases=None):
+    """
+    The automaton that removes filler phrases, built once per list of phrases.
+
+    All phrases are found in one pass over the text, so cleaning takes as long
+    with hundreds of fillers as with a few.
+
+    Args:
+        phrases (list, optional): Filler phrases; DISFLUENCIES by default
+
+    Returns:
+        KeywordAutomaton: Matches whole words, ignoring case
+    """
+    return _disfluency_automaton(tuple(DISFLUENCIES if phrases is None else phrases))
+
+
+def clean_turn_text(content, disfluencies=None):
+    """
+    Clean up the text of one turn: disfluencies, repetitions, spacing and punctuation
+
+    Args:
+        content (str): Text of the turn
+        disfluencies (KeywordAutomaton, optional): Filler phrases to remove;
+                                                   disfluency_automaton() by default
+    """
+    # Clean up speech disfluencies
     # Remove common filler words and phrases
-    disfluencies = [r'\bum+\b', r'\buh+\b', r'\blike\b', r'\byou know\b', 
-                   r'\bI mean\b', r'\bso\b', r'\bjust\b', r'\bkind of\b', 
-                   r'\bsort of\b', r'\bliterally\b', r'\bbasically\b']
-    
-    for pattern in disfluencies:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-    
+    if disfluencies is None:
+        disfluencies = disfluency_automaton()
+    content = disfluencies.sub('', content)
+
     # Remove repeated words (e.g., "the the", "I I", etc.)
-    text = re.sub(r'\b(\w+)(\s+\1\b)+', r'\1', text, flags=re.IGNORECASE)
-    
+    content = re.sub(r'\b(\w+)(\s+\1\b)+', r'\1', content, flags=re.IGNORECASE)
+
     # Fix broken sentences with periods followed by lowercase letters
-    text = re.sub(r'\.(\s+[a-z])', lambda m: '. ' + m.group(1).strip().capitalize(), text)
-    
+    content = re.sub(r'\.(\s+[a-z])', lambda m: '. ' + m.group(1).strip().capitalize(), content)
+
     # Remove any remaining asterisks
-    text = re.sub(r'\*', '', text)
-    
-    # Step 4: Fix incomplete sentences and improve flow
-    # This is more complex and might require manual review
-    
-    # Step 5: Split the text into sections based on topic changes
-    # This is more advanced and may require content understanding
-    
-    # For now, let's split the text into paragraphs by speaker
+    content = re.sub(r'\*', '', content)
+
+    # Remove multiple spaces
+    content = re.sub(r'\s+', ' ', content).strip()
+
+    # Fix punctuation spacing
+    content = re.sub(r'\s*([,.;:!?])', r'\1', content)
+
+    # Make sure sentences end with proper punctuation
+    if content and content[-1] not in ".!?":
+        content += "."
+
+    # Capitalize the first letter of each sentence
+    return '. '.join(s.strip().capitalize() for s in content.split('. '))
+
+
+def check_speakers(turns, transcript, table):
+    """
+    Warn when a transcript without rows of its own in the speaker table looks
+    like it has the speakers the wrong way round.
+
+    The interviewer asks short questions, so the default mapping is suspect when
+    the 'Interviewer' says more than the 'Expert'. Add rows for the transcript
+    to the table to fix or confirm the mapping.
+
+    Returns:
+        bool: True if the mapping looks right (or the transcript is in the table)
+    """
+    if transcript in table:
+        return True
+    words = {}
+    for turn in turns:
+        if turn.speaker:
+            words[turn.speaker] = words.get(turn.speaker, 0) + len(turn.text.split())
+    if words.get('Interviewer', 0) > words.get('Expert', 0) > 0:
+        labels = sorted({turn.label for turn in turns if turn.speaker == 'Interviewer'})
+        print(f"Warning: in {transcript}, the interviewer ({', '.join(labels)}) says more than the expert; "
+              f"check the speakers and add {transcript} to {os.path.basename(SPEAKERS_FILE)}")
+        return False
+    return True
+
+
+def transcript_turns(text, speakers=None, transcript=None, segmentation='phrases', guide=None, disfluencies=None):
+    """
+    Split a transcript into cleaned, typed turns.
+
+    Args:
+        text (str): Raw transcript text
+        speakers (dict, optional): label -> speaker ('Interviewer' or 'Expert').
+                                   By default the speaker table's mapping for transcript.
+        transcript (str, optional): Transcript id, e.g. 'P3'
+        segmentation (str, optional): 'phrases', 'guide' or 'keywords' (see
+                                      qualkit/segment.py); None leaves all
+                                      turns in section 0
+        guide (list, optional): Interview guide questions for 'guide' and 'keywords'
+        disfluencies (list, optional): Filler phrases to remove; DISFLUENCIES by default
+
+    Returns:
+        list: Turn records. Lines before the first speaker (titles, dates) are
+              turns with speaker None.
+    """
+    if speakers is None:
+        table = load_speaker_table()
+        speakers = speaker_mapping(table, transcript)
+    else:
+        table = None
+        speakers = {label.lower(): speaker for label, speaker in speakers.items()}
+    pattern = compile_speaker_pattern(speakers)
+    fillers = disfluency_automaton(disfluencies)
+
+    # Step 1: Remove timestamps (assuming formats like [00:15] or (12:45) or 10:30 or standalone 00:00:05)
+    text = re.sub(r'[\[\(]?\d{1,2}:\d{2}(:\d{2})?[\]\)]?', '', text)
+
+    # Step 2: Split the text into paragraphs by speaker, identified through the mapping
     paragraphs = []
     current_speaker = None
+    current_label = None
     current_paragraph = []
-    
+
     # Split by lines first
-    lines = text.split('\n')
-    for line in lines:
+    for line in text.split('\n'):
         line = line.strip()
         if not line:
             continue
-            
+
         # Check if this line starts with a speaker label
-        speaker_match = re.match(r'^(Interviewer|Michael):\s*(.*)', line, re.IGNORECASE)
-        
+        speaker_match = pattern.match(line)
+
         if speaker_match:
             # If we have a previous paragraph, add it
             if current_paragraph:
-                paragraphs.append((current_speaker, ' '.join(current_paragraph)))
+                paragraphs.append((current_speaker, current_label, ' '.join(current_paragraph)))
                 current_paragraph = []
-            
+
             # Start a new paragraph with the new speaker
-            current_speaker = speaker_match.group(1)
-            content = speaker_match.group(2).strip()
+            current_label = speaker_match.group('label')
+            current_speaker = speakers[current_label.lower()]
+            content = (speaker_match.group('text') or '').strip()
             if content:
                 current_paragraph.append(content)
-        else:
+        elif current_speaker:
             # Continue with the current paragraph
-            if current_speaker:
-                current_paragraph.append(line)
-            else:
-                # If no speaker identified yet, assume it's part of the introduction or metadata
-                paragraphs.append((None, line))
-    
+            current_paragraph.append(line)
+        else:
+            # If no speaker identified yet, assume it's part of the introduction or metadata
+            paragraphs.append((None, None, line))
+
     # Add the last paragraph if there is one
     if current_paragraph:
-        paragraphs.append((current_speaker, ' '.join(current_paragraph)))
-    
-    # Combine consecutive paragraphs from the same speaker
+        paragraphs.append((current_speaker, current_label, ' '.join(current_paragraph)))
+
+    # Step 3: Combine consecutive paragraphs from the same speaker and clean them up
     combined_paragraphs = []
-    current_speaker = None
-    current_content = []
-    
-    for speaker, content in paragraphs:
-        if speaker == current_speaker:
-            current_content.append(content)
+    for speaker, label, content in paragraphs:
+        if combined_paragraphs and combined_paragraphs[-1][0] == speaker:
+            combined_paragraphs[-1][2].append(content)
         else:
-            if current_speaker is not None:
-                combined_paragraphs.append((current_speaker, ' '.join(current_content)))
-            current_speaker = speaker
-            current_content = [content]
-    
-    # Add the last group
-    if current_content:
-        combined_paragraphs.append((current_speaker, ' '.join(current_content)))
+            combined_paragraphs.append((speaker, label, [content]))
+
+    participant = participant_id(transcript)
+    turns = []
+    for speaker, label, contents in combined_paragraphs:
+        content = clean_turn_text(' '.join(contents), fillers)
+        if not content:
+            continue
+
+        if speaker == 'Expert':
+            who = participant
+        else:
+            who = speaker
+        turns.append(Turn(transcript, who, len(turns), speaker, label, content, 0))
+
+    if table is not None:
+        check_speakers(turns, transcript, table)
+
+    # Step 4: Create sections based on topic changes
+    if segmentation:
+        turns = segment_turns(turns, segmentation, guide)
+    return turns
+
+
+def format_turns(turns):
+    """
+    Format typed turns as the cleaned transcript text.
+
+    Returns:
+        str: One "Speaker: text" line per turn, with a "Section i: <topic>"
+             header ("Topic i" without a guide topic) and a blank line before
+             every new section
+    """
+    formatted_transcript = []
+    section = 0
+    for turn in turns:
+        if turn.section != section:
+            section = turn.section
+            # Add a separator and a section header
+            formatted_transcript.append("")
+            formatted_transcript.append(f"Section {section}: {turn.topic or f'Topic {section}'}")
+
+        if turn.speaker:
+            formatted_transcript.append(f"{turn.speaker}: {turn.text}")
+        else:
+            formatted_transcript.append(turn.text)
+
+    return "\n".join(formatted_transcript)
+
+
+def write_turns(turns, output_file):
+    """
+    Save typed turns as a CSV file with one row per turn, for aggregating by
+    participant without parsing the transcripts again.
+    """
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(Turn._fields)
+        writer.writerows(turns)
+
+
+def read_transcript(input_file, speakers=None, segmentation='phrases', guide=None, disfluencies=None):
+    """
+    Read the typed turns of a transcript Word file.
+
+    Args:
+        input_file (str): Path to the input Word file
+        speakers (dict, optional): label -> speaker mapping (see transcript_turns)
+        segmentation (str, optional): Segmentation mode (see transcript_turns)
+        guide (list, optional): Interview guide questions
+        disfluencies (list, optional): Filler phrases to remove
+
+    Returns:
+        list: Turn records
+    """
+    doc = Document(input_file)
+    full_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    return transcript_turns(full_text, speakers, transcript_id(input_file), segmentation, guide, disfluencies)
+
+
+def default_output_file(input_file):
+    """Path of the cleaned transcript of input_file (input_file_cleaned.docx)"""
+    file_name, file_ext = os.path.splitext(input_file)
+    return f"{file_name}_cleaned.docx"
+
+
+def clean_transcript(input_file, output_file=None, speakers=None, turns=None, segmentation='phrases', guide=None):
+    """
+    Clean a transcript from a Word file by:
+    - Removing timestamps
+    - Organizing content into logical sections
+    - Cleaning up speech disfluencies
+    - Improving conversation flow
+    - Clearly identifying speakers
+    - Preserving technical terminology
+    - Clarifying ambiguous statements
     
-    # Clean up each paragraph's content
-    cleaned_paragraphs = []
-    for speaker, content in combined_paragraphs:
-        # Remove multiple spaces
-        content = re.sub(r'\s+', ' ', content).strip()
-        
-        # Fix punctuation spacing
-        content = re.sub(r'\s*([,.;:!?])', r'\1', content)
-        
-        # Make sure sentences end with proper punctuation
-        if content and content[-1] not in ".!?":
-            content += "."
-            
-        # Capitalize the first letter of each sentence
-        content = '. '.join(s.strip().capitalize() for s in content.split('. '))
-        
-        cleaned_paragraphs.append((speaker, content))
+    Args:
+        input_file (str): Path to the input Word file
+        output_file (str, optional): Path to save the cleaned transcript. 
+                                    If None, will use input_file_cleaned.docx
+        speakers (dict, optional): label -> speaker mapping; by default the
+                                   rows of speakers.csv for this transcript
+        turns (list, optional): If given, the typed turns are appended to it
+        segmentation (str, optional): 'phrases', 'guide' or 'keywords'
+        guide (list, optional): Interview guide questions for 'guide' and 'keywords'
     
-    # Create sections based on topic changes
-    # This is a simple approach - a more advanced one would involve NLP
-    section_break_phrases = [
-        "let's move on to", "next topic", "another question",
-        "next question", "changing subjects", "moving forward"
-    ]
+    Returns:
+        str: Path to the saved cleaned transcript
+    """
+    # Set default output file if not provided
+    if output_file is None:
+        output_file = default_output_file(input_file)
     
-    # Initialize sections
-    sections = []
-    current_section = []
+    print(f"Reading transcript from: {input_file}")
     
-    for speaker, content in cleaned_paragraphs:
-        # Check if this paragraph indicates a topic change
-        is_section_break = False
-        lower_content = content.lower()
-        
-        for phrase in section_break_phrases:
-            if phrase in lower_content:
-                is_section_break = True
-                # Split at the section break phrase
-                break
-        
-        if is_section_break and current_section:
-            sections.append(current_section)
-            current_section = []
+    try:
+        # Load the document and extract the cleaned content
+        transcript_records = read_transcript(input_file, speakers, segmentation, guide)
+        if turns is not None:
+            turns.extend(transcript_records)
         
-        current_section.append((speaker, content))
-    
-    # Add the last section
-    if current_section:
-        sections.append(current_section)
-    
-    # Format the final transcript
-    formatted_transcript = []
-    
-    for i, section in enumerate(sections):
-        # Add a section header if this isn't the introduction
-        if i > 0:
-            formatted_transcript.append(f"Section {i}: Topic {i}")
+        # Create a new document with the cleaned content
+        create_formatted_document(format_turns(transcript_records), output_file)
         
-        # Add the paragraphs in this section
-        for speaker, content in section:
-            if speaker:
-                formatted_transcript.append(f"{speaker}: {content}")
-            else:
-                formatted_transcript.append(content)
+        print(f"Cleaned transcript saved to: {output_file}")
+        return output_file
         
-        # Add a separator between sections
-        if i < len(sections) - 1:
-            formatted_transcript.append("")
-    
-    return "\n".join(formatted_transcript)
+    except Exception as e:
+        print(f"Error processing transcript: {str(e)}")
+        return None
+
+def process_transcript(text, speakers=None, transcript=None, segmentation='phrases', guide=None):
+    """
+    Process the transcript text to clean and organize it
+
+    Args:
+        text (str): Raw transcript text
+        speakers (dict, optional): label -> speaker mapping (see transcript_turns)
+        transcript (str, optional): Transcript id, e.g. 'P3'
+        segmentation (str, optional): 'phrases', 'guide' or 'keywords'
+        guide (list, optional): Interview guide questions for 'guide' and 'keywords'
+
+    Returns:
+        str: The cleaned transcript
+    """
+    return format_turns(transcript_turns(text, speakers, transcript, segmentation, guide))
 
 def create_formatted_document(text, output_file):
     """Create a nicely formatted Word document with the cleaned transcript"""
@@ -299,25 +514,62 @@ def create_formatted_document(text, output_file):
 
 def main():
     parser = argparse.ArgumentParser(description='Clean a transcript from a Word file.')
-    parser.add_argument('input_file', help='Path to the input Word file')
-    parser.add_argument('--output', '-o', help='Path to save the cleaned transcript')
+    parser.add_argument('input_file', nargs='*', help='Path to the input Word file(s)')
+    parser.add_argument('--output', '-o', help='Path to save the cleaned transcript (one input file only)')
     parser.add_argument('--example', '-e', action='store_true', help='Process the example text instead of a file')
+    parser.add_argument('--speakers', '-s', default=SPEAKERS_FILE, help='Speaker mapping table (CSV)')
+    parser.add_argument('--turns', '-t', help='Save the typed turns of all transcripts to this CSV file')
+    parser.add_argument('--segment', choices=['phrases', 'guide', 'keywords'], default='phrases',
+                        help="How to find topic sections: transition phrases (default), similarity to the "
+                             "interview guide questions, or guide keywords")
+    parser.add_argument('--guide', default=GUIDE_PATH, help='Interview guide questions (CSV)')
+    parser.add_argument('--disfluencies', '-d',
+                        help='Text file of filler phrases to remove, one per line (default: the built-in list)')
     
     args = parser.parse_args()
+    table = load_speaker_table(args.speakers)
+    guide = load_guide(args.guide) if args.segment != 'phrases' else None
+    disfluencies = load_disfluencies(args.disfluencies) if args.disfluencies else None
     
     if args.example:
         # Example text processing
         example_text = """*Speaker 1: *So can you please introduce yourself a little bit?
 00:00:05 *Speaker 2: *. Uh, I'm an associate professor here. I'd like to you. I've been here since, uh, 2009, actually. So I was a very long time. And, um, my research area is, uh, uh, software verification. Uh, and I mostly work with theoretical in, uh, in the theoretical computer science area. I'm also a member of the CSat center, which is our center for information. Uh, trust. Uh, no. Sorry. Information security and trust. And, um, I am, uh, also had in the, uh, our master's in computer science, as I do."""
         
-        result = process_example_transcript(example_text)
+        result = format_turns(transcript_turns(example_text, speaker_mapping(table), None, args.segment, guide,
+                                               disfluencies))
         print(result)
     else:
-        # Process from file
-        clean_transcript(args.input_file, args.output)
+        if args.output and len(args.input_file) > 1:
+            parser.error('--output needs a single input file')
+        # Read all transcripts first, so that they are segmented in one pass
+        turns = []
+        outputs = {}
+        for input_file in args.input_file:
+            transcript = transcript_id(input_file)
+            print(f"Reading transcript from: {input_file}")
+            try:
+                transcript_records = read_transcript(input_file, speaker_mapping(table, transcript), None,
+                                                     disfluencies=disfluencies)
+            except Exception as e:
+                print(f"Error processing transcript: {str(e)}")
+                continue
+            check_speakers(transcript_records, transcript, table)
+            turns.extend(transcript_records)
+            outputs[transcript] = args.output or default_output_file(input_file)
+        turns = segment_turns(turns, args.segment, guide)
 
-if __name__ == "__main__":
-    main()
+        # Save one cleaned document per transcript
+        for transcript, output_file in outputs.items():
+            try:
+                create_formatted_document(format_turns([turn for turn in turns if turn.transcript == transcript]),
+                                          output_file)
+                print(f"Cleaned transcript saved to: {output_file}")
+            except Exception as e:
+                print(f"Error processing transcript: {str(e)}")
+        if args.turns:
+            write_turns(turns, args.turns)
+            print(f"{len(turns)} turns saved to: {args.turns}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,10 +1,13 @@
 import plotly.express as px
+import os
+import sys
 
-# Define the new hierarchical structure based on the table with RQ1 and RQ2
-labels = []
-parents = []
-values = []
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.hierarchy import hierarchy_frame, flatten_hierarchy
+from qualkit.sunburst import show_sunburst
 
+# Define the new hierarchical structure based on the table with RQ1 and RQ2
 affinity_structure = {
     "RQ1": {
         "Digitization in Denmark": [
@@ -45,27 +48,17 @@ affinity_structure = {
     }
 }
 
-# Build labels and parents
-for main_cat, subcats in affinity_structure.items():
-    labels.append(main_cat)
-    parents.append("")
-    values.append(0)
-
-    for subcat, clusters in subcats.items():
-        labels.append(subcat)
-        parents.append(main_cat)
-        values.append(0)
-
-        for cluster in clusters:
-            labels.append(cluster)
-            parents.append(subcat)
-            values.append(1)
+# Build the nodes: ids are paths, so equal labels in different branches stay apart
+levels = ['question', 'section', 'cluster']
+nodes = flatten_hierarchy(hierarchy_frame(affinity_structure, levels), levels)
 
 # Create Sunburst plot
 fig = px.sunburst(
-    names=labels,
-    parents=parents,
-    values=values,
+    ids=nodes['id'],
+    names=nodes['label'],
+    parents=nodes['parent'],
+    values=nodes['value'],
+    branchvalues='total',
     maxdepth=-1,
     title="RQ1 and RQ2: Clusters Matching Sections",
     width=1000,
@@ -73,14 +66,10 @@ fig = px.sunburst(
 )
 
 fig.update_layout(margin=dict(t=50, l=0, r=0, b=0))
-fig.show()
+show_sunburst(fig, 'ad_sunburst')
 import plotly.express as px
 
 # Define the new hierarchical structure based on the table
-labels = []
-parents = []
-values = []
-
 affinity_structure = {
     "RQ1: How does digitization aid in hybrid warfare campaigns, and how does this challenge Denmark’s cybersecurity governance frameworks?": {
         "Digitization in Denmark": [
@@ -121,27 +110,17 @@ affinity_structure = {
     }
 }
 
-# Build labels and parents
-for main_cat, subcats in affinity_structure.items():
-    labels.append(main_cat)
-    parents.append("")
-    values.append(0)
-
-    for subcat, clusters in subcats.items():
-        labels.append(subcat)
-        parents.append(main_cat)
-        values.append(0)
-
-        for cluster in clusters:
-            labels.append(cluster)
-            parents.append(subcat)
-            values.append(1)
+# Build the nodes: ids are paths, so equal labels in different branches stay apart
+levels = ['question', 'section', 'cluster']
+nodes = flatten_hierarchy(hierarchy_frame(affinity_structure, levels), levels)
 
 # Create Sunburst plot
 fig = px.sunburst(
-    names=labels,
-    parents=parents,
-    values=values,
+    ids=nodes['id'],
+    names=nodes['label'],
+    parents=nodes['parent'],
+    values=nodes['value'],
+    branchvalues='total',
     maxdepth=-1,
     title="RQ1 and RQ2: Clusters Matching Sections",
     width=1000,
@@ -149,5 +128,5 @@ fig = px.sunburst(
 )
 
 fig.update_layout(margin=dict(t=50, l=0, r=0, b=0))
-fig.show()
+show_sunburst(fig, 'ad_sunburst_questions')
 
@@ -2,6 +2,12 @@ import pandas as pd
 import plotly.express as px
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import PCA
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.autocluster import propose_clusters, agreement
 
 # Load your data into a DataFrame
 data = pd.read_csv("data.csv")  # Or parse your LaTeX into DataFrame
@@ -17,6 +23,12 @@ X_reduced = pca.fit_transform(X.toarray())
 data['x'] = X_reduced[:, 0]
 data['y'] = X_reduced[:, 1]
 
+# Propose clusters automatically and compare them with the manual ones
+proposed, proposed_names = propose_clusters(data['Pattern Label'], 'kmeans', data['Cluster'].nunique())
+data['Proposed Cluster'] = [proposed_names.get(int(c), 'Unclustered') for c in proposed]
+scores, report = agreement(data['Cluster'], proposed, proposed_names)
+print(f"Agreement of the proposed with the manual clusters: ARI {scores['ari']:.3f}, NMI {scores['nmi']:.3f}")
+
 # Plot using Plotly
 fig = px.scatter(
     data,
@@ -25,7 +37,7 @@ fig = px.scatter(
     color='Cluster',
     text='Pattern Label',
     title='Clustered Codes after Affinity Diagram',
-    hover_data=['Source']
+    hover_data=['Source', 'Proposed Cluster']
 )
 
 fig.update_traces(textposition='top center')
@@ -1,10 +1,14 @@
 import plotly.express as px
+import os
+import sys
 
-# Define the hierarchical structure
-labels = []
-parents = []
-values = []
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.hierarchy import hierarchy_frame, flatten_hierarchy, level_of_detail
+from qualkit.sunburst import show_sunburst
+from qualkit.provenance import load_store
 
+# Define the hierarchical structure
 affinity_structure = {
     "Critical Infrastructure Vulnerabilities": {
         "Digital System Dependencies": [
@@ -161,27 +165,24 @@ affinity_structure = {
     }
 }
 
-# Build labels and parents
-for main_cat, subcats in affinity_structure.items():
-    labels.append(main_cat)
-    parents.append("")
-    values.append(0)
-
-    for subcat, quotes in subcats.items():
-        labels.append(subcat)
-        parents.append(main_cat)
-        values.append(0)
-
-        for quote in quotes:
-            labels.append(quote)
-            parents.append(subcat)
-            values.append(1)
+# Build the nodes: ids are paths, so equal labels in different branches stay apart
+levels = ['category', 'subcategory', 'quote']
+nodes = flatten_hierarchy(hierarchy_frame(affinity_structure, levels), levels)
+# With a provenance store (python -m qualkit.provenance), quotes show their source on hover
+store = load_store()
+if store is not None:
+    # Before level_of_detail, so the folded quotes keep their source too
+    nodes['customdata'] = store.node_sources(nodes)
+# With QUALKIT_SUNBURST_LOD=<n>, show n quotes per sub-theme and load the rest on click
+nodes, hidden_quotes = level_of_detail(nodes)
 
 # Create Sunburst plot
 fig = px.sunburst(
-    names=labels,
-    parents=parents,
-    values=values,
+    ids=nodes['id'],
+    names=nodes['label'],
+    parents=nodes['parent'],
+    values=nodes['value'],
+    branchvalues='total',
     maxdepth=-1,
     title="Affinity Diagram: Danish Cybersecurity and Hybrid Warfare",
     width=1000,
@@ -189,5 +190,9 @@ fig = px.sunburst(
 )
 
 fig.update_layout(margin=dict(t=50, l=0, r=0, b=0))
-fig.show()
+
+if store is not None:
+    fig.update_traces(customdata=nodes['customdata'],
+                      hovertemplate='%{label}<br>%{customdata}<extra></extra>')
+show_sunburst(fig, 'main_sunburst', hidden_quotes)
 
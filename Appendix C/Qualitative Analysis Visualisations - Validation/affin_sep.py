@@ -1,10 +1,17 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 import pandas as pd
 import re
 import random
 from collections import Counter
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.export import save_figure
+from qualkit.figures import figure
+from qualkit.layout_cache import cached_layout
 
 # Parse the LaTeX table for hybrid threats data
 def parse_hybrid_threats_table(latex_content):
@@ -60,24 +67,24 @@ def create_theme_distribution_visualization(df):
     theme_participant_counts = theme_participant_counts.sort_values(by='Total', ascending=False)
     theme_participant_counts = theme_participant_counts.drop('Total', axis=1)
     
-    plt.figure(figsize=(15, 10))
+    with figure(figsize=(15, 10)) as fig:
+        ax = fig.subplots()
     
-    # Create horizontal bar chart with participant breakdown
-    ax = theme_participant_counts.plot(kind='barh', stacked=True, figsize=(15, 10), 
-                                       color=['#3498db', '#e74c3c', '#2ecc71'])
+        # Create horizontal bar chart with participant breakdown
+        theme_participant_counts.plot(kind='barh', stacked=True, ax=ax,
+                                      color=['#3498db', '#e74c3c', '#2ecc71'])
     
-    plt.title('Distribution of Hybrid Threat Themes by Participant', fontsize=18)
-    plt.xlabel('Number of Codes', fontsize=14)
-    plt.ylabel('Theme', fontsize=14)
+        ax.set_title('Distribution of Hybrid Threat Themes by Participant', fontsize=18)
+        ax.set_xlabel('Number of Codes', fontsize=14)
+        ax.set_ylabel('Theme', fontsize=14)
     
-    # Add total counts at the end of each bar
-    for i, total in enumerate(theme_participant_counts.sum(axis=1)):
-        plt.text(total + 0.3, i, f"{total}", va='center', fontsize=10, fontweight='bold')
+        # Add total counts at the end of each bar
+        for i, total in enumerate(theme_participant_counts.sum(axis=1)):
+            ax.text(total + 0.3, i, f"{total}", va='center', fontsize=10, fontweight='bold')
     
-    plt.tight_layout()
-    plt.legend(title='Participant')
-    plt.savefig('theme_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
+        fig.tight_layout()
+        ax.legend(title='Participant')
+        save_figure(fig, 'theme_distribution', dpi=300, bbox_inches='tight')
     
     print("Created theme distribution visualization")
 
@@ -88,31 +95,31 @@ def create_participant_theme_heatmap(df):
     # Count codes by theme and participant
     cross_tab = pd.crosstab(df['theme'], df['participant'])
     
-    plt.figure(figsize=(12, 10))
+    with figure(figsize=(12, 10)) as fig:
+        ax = fig.subplots()
     
-    # Create heatmap
-    im = plt.imshow(cross_tab.values, cmap='YlOrRd')
+        # Create heatmap
+        im = ax.imshow(cross_tab.values, cmap='YlOrRd')
     
-    # Add colorbar
-    cbar = plt.colorbar(im)
-    cbar.set_label('Number of Codes', rotation=270, labelpad=20)
+        # Add colorbar
+        cbar = fig.colorbar(im, ax=ax)
+        cbar.set_label('Number of Codes', rotation=270, labelpad=20)
     
-    # Configure axes
-    plt.xticks(range(len(cross_tab.columns)), cross_tab.columns, rotation=0)
-    plt.yticks(range(len(cross_tab.index)), cross_tab.index)
+        # Configure axes
+        ax.set_xticks(range(len(cross_tab.columns)), cross_tab.columns, rotation=0)
+        ax.set_yticks(range(len(cross_tab.index)), cross_tab.index)
     
-    # Add text annotations to cells
-    for i in range(len(cross_tab.index)):
-        for j in range(len(cross_tab.columns)):
-            text = plt.text(j, i, cross_tab.values[i, j],
-                           ha="center", va="center", 
-                           color="black" if cross_tab.values[i, j] < 5 else "white",
-                           fontweight='bold')
+        # Add text annotations to cells
+        for i in range(len(cross_tab.index)):
+            for j in range(len(cross_tab.columns)):
+                text = ax.text(j, i, cross_tab.values[i, j],
+                              ha="center", va="center", 
+                              color="black" if cross_tab.values[i, j] < 5 else "white",
+                              fontweight='bold')
     
-    plt.title('Heatmap of Hybrid Threat Themes by Participant', fontsize=16)
-    plt.tight_layout()
-    plt.savefig('participant_theme_heatmap.png', dpi=300)
-    plt.close()
+        ax.set_title('Heatmap of Hybrid Threat Themes by Participant', fontsize=16)
+        fig.tight_layout()
+        save_figure(fig, 'participant_theme_heatmap', dpi=300)
     
     print("Created participant-theme heatmap visualization")
 
@@ -121,156 +128,159 @@ def create_theme_network_visualization(df):
     Create a network visualization showing relationships between
     themes and participants.
     """
-    plt.figure(figsize=(20, 16))
-    ax = plt.gca()
-    ax.set_facecolor('#f8f8f8')
-    
-    # Get unique themes and participants
-    unique_themes = df['theme'].unique()
-    unique_participants = df['participant'].unique()
-    
-    # Count codes in each theme
-    theme_counts = df['theme'].value_counts()
-    
-    # Position for participants in a triangular layout
-    participant_pos = {}
-    for i, participant in enumerate(unique_participants):
-        angle = 2 * np.pi * i / len(unique_participants)
-        x = 50 * np.cos(angle)
-        y = 50 * np.sin(angle)
-        participant_pos[participant] = (x, y)
-    
-    # Position themes in a circular layout
-    theme_pos = {}
-    
-    # Calculate participant bias for each theme
-    theme_participant_bias = {}
-    for theme in unique_themes:
-        theme_df = df[df['theme'] == theme]
-        participant_counts = theme_df['participant'].value_counts()
+    with figure(figsize=(20, 16)) as fig:
+        ax = fig.subplots()
+        ax.set_facecolor('#f8f8f8')
+    
+        # Get unique themes and participants
+        unique_themes = df['theme'].unique()
+        unique_participants = df['participant'].unique()
+    
+        # Count codes in each theme
+        theme_counts = df['theme'].value_counts()
+    
+        # Position for participants in a triangular layout
+        participant_pos = {}
+        for i, participant in enumerate(unique_participants):
+            angle = 2 * np.pi * i / len(unique_participants)
+            x = 50 * np.cos(angle)
+            y = 50 * np.sin(angle)
+            participant_pos[participant] = (x, y)
+    
+        # Position themes in a circular layout
+        theme_pos = {}
+    
+        # Calculate participant bias for each theme
+        theme_participant_bias = {}
+        for theme in unique_themes:
+            theme_df = df[df['theme'] == theme]
+            participant_counts = theme_df['participant'].value_counts()
         
-        # Find the dominant participant (if any)
-        if len(participant_counts) > 0:
-            max_count = participant_counts.max()
-            dominants = [p for p, c in participant_counts.items() if c == max_count]
+            # Find the dominant participant (if any)
+            if len(participant_counts) > 0:
+                max_count = participant_counts.max()
+                dominants = [p for p, c in participant_counts.items() if c == max_count]
             
-            if len(dominants) == 1:
-                theme_participant_bias[theme] = dominants[0]  # Dominated by one participant
+                if len(dominants) == 1:
+                    theme_participant_bias[theme] = dominants[0]  # Dominated by one participant
+                else:
+                    theme_participant_bias[theme] = "mixed"  # Mixed participation
             else:
-                theme_participant_bias[theme] = "mixed"  # Mixed participation
-        else:
-            theme_participant_bias[theme] = "unknown"
-    
-    # Group themes by dominant participant
-    themes_by_dominant = {}
-    for theme, dominant in theme_participant_bias.items():
-        if dominant not in themes_by_dominant:
-            themes_by_dominant[dominant] = []
-        themes_by_dominant[dominant].append(theme)
-    
-    # Position themes based on dominant participant and count
-    for dominant, themes in themes_by_dominant.items():
-        if dominant in participant_pos:  # If it's a specific participant
-            center_x, center_y = participant_pos[dominant]
-            radius = 25  # Distance from participant
-        else:  # For "mixed" or "unknown"
-            center_x, center_y = 0, 0
-            radius = 20
+                theme_participant_bias[theme] = "unknown"
+    
+        # Group themes by dominant participant
+        themes_by_dominant = {}
+        for theme, dominant in theme_participant_bias.items():
+            if dominant not in themes_by_dominant:
+                themes_by_dominant[dominant] = []
+            themes_by_dominant[dominant].append(theme)
+    
+        # Position themes based on dominant participant and count
+        for dominant, themes in themes_by_dominant.items():
+            if dominant in participant_pos:  # If it's a specific participant
+                center_x, center_y = participant_pos[dominant]
+                radius = 25  # Distance from participant
+            else:  # For "mixed" or "unknown"
+                center_x, center_y = 0, 0
+                radius = 20
         
-        # Arrange themes around the participant in a circle
-        for i, theme in enumerate(themes):
-            angle = 2 * np.pi * i / len(themes)
-            x = center_x + radius * np.cos(angle)
-            y = center_y + radius * np.sin(angle)
-            theme_pos[theme] = (x, y)
-    
-    # Draw nodes for participants
-    participant_colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
-    
-    for participant, (x, y) in participant_pos.items():
-        participant_count = len(df[df['participant'] == participant])
-        size = np.sqrt(participant_count) * 4
-        color = participant_colors.get(participant, '#999999')
+            # Arrange themes around the participant in a circle
+            for i, theme in enumerate(themes):
+                angle = 2 * np.pi * i / len(themes)
+                x = center_x + radius * np.cos(angle)
+                y = center_y + radius * np.sin(angle)
+                theme_pos[theme] = (x, y)
+    
+        # Keep nodes where earlier runs put them; only new nodes use the layout above
+        participant_pos = cached_layout('theme_participant_network/participants', participant_pos)
+        theme_pos = cached_layout('theme_participant_network/themes', theme_pos)
+    
+        # Draw nodes for participants
+        participant_colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
+    
+        for participant, (x, y) in participant_pos.items():
+            participant_count = len(df[df['participant'] == participant])
+            size = np.sqrt(participant_count) * 4
+            color = participant_colors.get(participant, '#999999')
         
-        circle = plt.Circle((x, y), size, color=color, alpha=0.9)
-        ax.add_patch(circle)
+            circle = patches.Circle((x, y), size, color=color, alpha=0.9)
+            ax.add_patch(circle)
         
-        plt.text(x, y, f"{participant}\n({participant_count} codes)", 
-                 ha='center', va='center', fontsize=14, fontweight='bold', color='white')
+            ax.text(x, y, f"{participant}\n({participant_count} codes)", 
+                    ha='center', va='center', fontsize=14, fontweight='bold', color='white')
     
-    # Draw nodes for themes
-    for theme, (x, y) in theme_pos.items():
-        theme_count = theme_counts[theme]
-        size = np.sqrt(theme_count) * 2.5
+        # Draw nodes for themes
+        for theme, (x, y) in theme_pos.items():
+            theme_count = theme_counts[theme]
+            size = np.sqrt(theme_count) * 2.5
         
-        # Color based on dominant participant
-        dominant = theme_participant_bias.get(theme, "mixed")
-        if dominant in participant_colors:
-            color = participant_colors[dominant]
-            alpha = 0.7
-        else:
-            color = '#999999'  # Gray for mixed
-            alpha = 0.5
+            # Color based on dominant participant
+            dominant = theme_participant_bias.get(theme, "mixed")
+            if dominant in participant_colors:
+                color = participant_colors[dominant]
+                alpha = 0.7
+            else:
+                color = '#999999'  # Gray for mixed
+                alpha = 0.5
         
-        circle = plt.Circle((x, y), size, color=color, alpha=alpha)
-        ax.add_patch(circle)
+            circle = patches.Circle((x, y), size, color=color, alpha=alpha)
+            ax.add_patch(circle)
         
-        # Split long theme names into multiple lines
-        name_parts = theme.split()
-        if len(name_parts) > 3:
-            midpoint = len(name_parts) // 2
-            name_text = ' '.join(name_parts[:midpoint]) + '\n' + ' '.join(name_parts[midpoint:])
-        else:
-            name_text = theme
+            # Split long theme names into multiple lines
+            name_parts = theme.split()
+            if len(name_parts) > 3:
+                midpoint = len(name_parts) // 2
+                name_text = ' '.join(name_parts[:midpoint]) + '\n' + ' '.join(name_parts[midpoint:])
+            else:
+                name_text = theme
             
-        plt.text(x, y, name_text, ha='center', va='center', 
-                 fontsize=9, fontweight='bold')
+            ax.text(x, y, name_text, ha='center', va='center', 
+                    fontsize=9, fontweight='bold')
         
-        # Add count
-        plt.text(x, y-size-2, f"({theme_count})", ha='center', va='center', fontsize=8)
+            # Add count
+            ax.text(x, y-size-2, f"({theme_count})", ha='center', va='center', fontsize=8)
     
-    # Draw edges between participants and themes
-    for _, row in df.iterrows():
-        participant = row['participant']
-        theme = row['theme']
+        # Draw edges between participants and themes
+        for _, row in df.iterrows():
+            participant = row['participant']
+            theme = row['theme']
         
-        if participant in participant_pos and theme in theme_pos:
-            participant_x, participant_y = participant_pos[participant]
-            theme_x, theme_y = theme_pos[theme]
+            if participant in participant_pos and theme in theme_pos:
+                participant_x, participant_y = participant_pos[participant]
+                theme_x, theme_y = theme_pos[theme]
             
-            # Draw line with low alpha to avoid visual clutter
-            color = participant_colors.get(participant, '#999999')
-            plt.plot([participant_x, theme_x], [participant_y, theme_y], 
-                     color=color, alpha=0.05, linewidth=0.5)
+                # Draw line with low alpha to avoid visual clutter
+                color = participant_colors.get(participant, '#999999')
+                ax.plot([participant_x, theme_x], [participant_y, theme_y], 
+                        color=color, alpha=0.05, linewidth=0.5)
     
-    # Add summary connections with width based on count
-    for theme in unique_themes:
-        if theme not in theme_pos:
-            continue
+        # Add summary connections with width based on count
+        for theme in unique_themes:
+            if theme not in theme_pos:
+                continue
             
-        theme_x, theme_y = theme_pos[theme]
+            theme_x, theme_y = theme_pos[theme]
         
-        for participant in unique_participants:
-            if participant not in participant_pos:
-                continue
+            for participant in unique_participants:
+                if participant not in participant_pos:
+                    continue
                 
-            participant_x, participant_y = participant_pos[participant]
-            count = len(df[(df['theme'] == theme) & (df['participant'] == participant)])
+                participant_x, participant_y = participant_pos[participant]
+                count = len(df[(df['theme'] == theme) & (df['participant'] == participant)])
             
-            if count > 0:
-                color = participant_colors.get(participant, '#999999')
-                width = np.sqrt(count) * 0.8
+                if count > 0:
+                    color = participant_colors.get(participant, '#999999')
+                    width = np.sqrt(count) * 0.8
                 
-                plt.plot([participant_x, theme_x], [participant_y, theme_y], 
-                         color=color, alpha=0.6, linewidth=width)
+                    ax.plot([participant_x, theme_x], [participant_y, theme_y], 
+                            color=color, alpha=0.6, linewidth=width)
     
-    plt.title('Network Visualization of Hybrid Threat Themes and Participants', fontsize=18)
-    plt.xlim(-60, 60)
-    plt.ylim(-60, 60)
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig('theme_participant_network.png', dpi=300, bbox_inches='tight')
-    plt.close()
+        ax.set_title('Network Visualization of Hybrid Threat Themes and Participants', fontsize=18)
+        ax.set_xlim(-60, 60)
+        ax.set_ylim(-60, 60)
+        ax.axis('off')
+        fig.tight_layout()
+        save_figure(fig, 'theme_participant_network', dpi=300, bbox_inches='tight')
     
     print("Created network visualization of themes and participants")
 
@@ -278,51 +288,51 @@ def create_participant_focus_visualization(df):
     """
     Create a visualization that highlights what each participant focuses on.
     """
-    plt.figure(figsize=(15, 10))
-    
-    # Get top themes for each participant
-    top_themes_by_participant = {}
-    for participant in df['participant'].unique():
-        participant_df = df[df['participant'] == participant]
-        theme_counts = participant_df['theme'].value_counts().head(5)
-        top_themes_by_participant[participant] = theme_counts
-    
-    # Create a grouped bar chart
-    axes = []
-    index = 0
-    width = 0.8
-    colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
-    
-    # Prepare x positions
-    participant_count = len(top_themes_by_participant)
-    all_themes = set()
-    for themes in top_themes_by_participant.values():
-        all_themes.update(themes.index)
-    all_themes = sorted(all_themes)
-    
-    # Create positions for bars
-    positions = list(range(len(all_themes)))
-    
-    # Plot bars for each participant
-    for participant, theme_counts in top_themes_by_participant.items():
-        # Create bars for this participant
-        bars = [theme_counts.get(theme, 0) for theme in all_themes]
-        ax = plt.bar([p + index*width/participant_count for p in positions], 
-                     bars, width/participant_count, alpha=0.7,
-                     color=colors.get(participant, '#999999'), label=participant)
-        axes.append(ax)
-        index += 1
-    
-    plt.xlabel('Theme', fontsize=14)
-    plt.ylabel('Number of Codes', fontsize=14)
-    plt.title('Top Themes by Participant', fontsize=18)
-    plt.xticks([p + width/2 - width/participant_count/2 for p in positions], 
-               [theme[:20] + '...' if len(theme) > 20 else theme for theme in all_themes], 
-               rotation=45, ha='right')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('participant_focus.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    with figure(figsize=(15, 10)) as fig:
+        ax = fig.subplots()
+    
+        # Get top themes for each participant
+        top_themes_by_participant = {}
+        for participant in df['participant'].unique():
+            participant_df = df[df['participant'] == participant]
+            theme_counts = participant_df['theme'].value_counts().head(5)
+            top_themes_by_participant[participant] = theme_counts
+    
+        # Create a grouped bar chart
+        axes = []
+        index = 0
+        width = 0.8
+        colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
+    
+        # Prepare x positions
+        participant_count = len(top_themes_by_participant)
+        all_themes = set()
+        for themes in top_themes_by_participant.values():
+            all_themes.update(themes.index)
+        all_themes = sorted(all_themes)
+    
+        # Create positions for bars
+        positions = list(range(len(all_themes)))
+    
+        # Plot bars for each participant
+        for participant, theme_counts in top_themes_by_participant.items():
+            # Create bars for this participant
+            bars = [theme_counts.get(theme, 0) for theme in all_themes]
+            container = ax.bar([p + index*width/participant_count for p in positions], 
+                               bars, width/participant_count, alpha=0.7,
+                               color=colors.get(participant, '#999999'), label=participant)
+            axes.append(container)
+            index += 1
+    
+        ax.set_xlabel('Theme', fontsize=14)
+        ax.set_ylabel('Number of Codes', fontsize=14)
+        ax.set_title('Top Themes by Participant', fontsize=18)
+        ax.set_xticks([p + width/2 - width/participant_count/2 for p in positions], 
+                      [theme[:20] + '...' if len(theme) > 20 else theme for theme in all_themes], 
+                      rotation=45, ha='right')
+        ax.legend()
+        fig.tight_layout()
+        save_figure(fig, 'participant_focus', dpi=300, bbox_inches='tight')
     
     print("Created participant focus visualization")
 
@@ -335,8 +345,8 @@ def create_radar_chart_by_participant(df):
     from matplotlib.projections import register_projection
     from matplotlib.spines import Spine
 
-    def radar_factory(num_vars, frame='circle'):
-        """Create a radar chart with `num_vars` axes."""
+    def radar_factory(fig, num_vars, frame='circle'):
+        """Create a radar chart with `num_vars` axes on fig."""
         # Calculate angles for each axis
         theta = np.linspace(0, 2*np.pi, num_vars, endpoint=False)
 
@@ -360,9 +370,6 @@ def create_radar_chart_by_participant(df):
 
         register_projection(RadarAxes)
 
-        # Create the figure
-        fig = plt.figure(figsize=(9, 9))
-        
         # Add the radar axes to the figure
         rect = [0.1, 0.1, 0.8, 0.8]
         ax = fig.add_axes(rect, projection='radar')
@@ -370,8 +377,8 @@ def create_radar_chart_by_participant(df):
         # Set the angular gridlines
         ax.set_thetagrids(np.degrees(theta), labels=[])
         
-        # Return the figure and the radar axes
-        return fig, ax, theta
+        # Return the radar axes
+        return ax, theta
 
     # Get top 10 themes by count
     top_themes = df['theme'].value_counts().head(10).index.tolist()
@@ -387,38 +394,38 @@ def create_radar_chart_by_participant(df):
             theme_counts.loc[participant] = theme_counts.loc[participant] / total * 100
     
     # Create the radar chart
-    fig, ax, theta = radar_factory(len(top_themes), frame='polygon')
+    with figure(figsize=(9, 9)) as fig:
+        ax, theta = radar_factory(fig, len(top_themes), frame='polygon')
     
-    colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
+        colors = {'PV1': '#3498db', 'PV2': '#e74c3c', 'PV3': '#2ecc71'}
     
-    for participant in theme_counts.index:
-        values = theme_counts.loc[participant].values.tolist()
-        # Complete the loop for the radar chart
-        values.append(values[0])
+        for participant in theme_counts.index:
+            values = theme_counts.loc[participant].values.tolist()
+            # Complete the loop for the radar chart
+            values.append(values[0])
         
-        # Add angles
-        angles = np.concatenate((theta, [theta[0]]))
+            # Add angles
+            angles = np.concatenate((theta, [theta[0]]))
         
-        ax.plot(angles, values, color=colors.get(participant, '#999999'), 
-                linewidth=2, label=participant)
-        ax.fill(angles, values, color=colors.get(participant, '#999999'), alpha=0.25)
-    
-    # Add theme labels
-    ax.set_thetagrids(np.degrees(theta), labels=top_themes)
-    for label, angle in zip(ax.get_xticklabels(), theta):
-        if np.degrees(angle) > 90 and np.degrees(angle) < 270:
-            label.set_rotation(np.degrees(angle) + 180)
-        else:
-            label.set_rotation(np.degrees(angle))
-        label.set_fontsize(8)
-        label.set_horizontalalignment('center')
-    
-    ax.set_title('Theme Focus by Participant (Normalized %)', size=15)
-    ax.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
-    
-    plt.tight_layout()
-    plt.savefig('participant_radar.png', dpi=300, bbox_inches='tight')
-    plt.close()
+            ax.plot(angles, values, color=colors.get(participant, '#999999'), 
+                    linewidth=2, label=participant)
+            ax.fill(angles, values, color=colors.get(participant, '#999999'), alpha=0.25)
+    
+        # Add theme labels
+        ax.set_thetagrids(np.degrees(theta), labels=top_themes)
+        for label, angle in zip(ax.get_xticklabels(), theta):
+            if np.degrees(angle) > 90 and np.degrees(angle) < 270:
+                label.set_rotation(np.degrees(angle) + 180)
+            else:
+                label.set_rotation(np.degrees(angle))
+            label.set_fontsize(8)
+            label.set_horizontalalignment('center')
+    
+        ax.set_title('Theme Focus by Participant (Normalized %)', size=15)
+        ax.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
+    
+        fig.tight_layout()
+        save_figure(fig, 'participant_radar', dpi=300, bbox_inches='tight')
     
     print("Created radar chart visualization by participant")
 
@@ -429,20 +436,20 @@ def create_code_occurrence_chart(df):
     # Count occurrences of each code
     code_counts = df['code'].value_counts().head(15)  # Top 15 codes
     
-    plt.figure(figsize=(12, 8))
+    with figure(figsize=(12, 8)) as fig:
+        ax = fig.subplots()
     
-    # Create horizontal bar chart
-    bars = plt.barh(code_counts.index, code_counts.values, color='#3498db')
+        # Create horizontal bar chart
+        bars = ax.barh(code_counts.index, code_counts.values, color='#3498db')
     
-    # Add count labels
-    for i, (code, count) in enumerate(code_counts.items()):
-        plt.text(count + 0.1, i, str(count), va='center')
+        # Add count labels
+        for i, (code, count) in enumerate(code_counts.items()):
+            ax.text(count + 0.1, i, str(count), va='center')
     
-    plt.title('Most Common Hybrid Threat Codes', fontsize=16)
-    plt.xlabel('Occurrences', fontsize=12)
-    plt.tight_layout()
-    plt.savefig('code_occurrences.png', dpi=300, bbox_inches='tight')
-    plt.close()
+        ax.set_title('Most Common Hybrid Threat Codes', fontsize=16)
+        ax.set_xlabel('Occurrences', fontsize=12)
+        fig.tight_layout()
+        save_figure(fig, 'code_occurrences', dpi=300, bbox_inches='tight')
     
     print("Created code occurrence chart")
 
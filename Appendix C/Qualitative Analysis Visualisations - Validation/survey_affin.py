@@ -1,5 +1,13 @@
 import matplotlib.pyplot as plt
 import networkx as nx
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.forcelayout import force_layout
+from qualkit.layout_cache import load_layout, save_layout
+from qualkit.survey import load_coded_survey
 
 # Define the themes, their corresponding codes, and associated quotes
 themes = {
@@ -50,6 +58,11 @@ themes = {
     ]
 }
 
+# Answers coded in survey_codes.csv (python -m qualkit.survey) replace the themes above
+coded_themes = load_coded_survey()
+if coded_themes:
+    themes = coded_themes
+
 # Create a graph
 G = nx.Graph()
 
@@ -61,7 +74,9 @@ for theme, quotes in themes.items():
         G.add_edge(theme, code)
 
 # Define the layout for the plot
-pos = nx.spring_layout(G, seed=42)
+known_pos = load_layout('affinity_diagram_quotes')
+pos = force_layout(G, pos=known_pos, fixed=known_pos, seed=42)
+save_layout('affinity_diagram_quotes', pos)
 
 # Plot the graph
 plt.figure(figsize=(14, 10))
@@ -128,6 +143,9 @@ themes = {
     ]
 }
 
+if coded_themes:
+    themes = {theme: list(dict.fromkeys(code for code, _ in quotes)) for theme, quotes in coded_themes.items()}
+
 # Create a graph
 G = nx.Graph()
 
@@ -139,7 +157,9 @@ for theme, codes in themes.items():
         G.add_edge(theme, code)
 
 # Define the layout for the plot
-pos = nx.spring_layout(G, seed=42)
+known_pos = load_layout('affinity_diagram')
+pos = force_layout(G, pos=known_pos, fixed=known_pos, seed=42)
+save_layout('affinity_diagram', pos)
 
 # Plot the graph
 plt.figure(figsize=(12, 8))
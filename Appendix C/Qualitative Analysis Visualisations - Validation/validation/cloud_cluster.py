@@ -4,6 +4,13 @@ import matplotlib.patches as patches
 import numpy as np
 from matplotlib.colors import to_rgba
 import matplotlib as mpl
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from qualkit.export import save_figure
+from qualkit.palette import get_colors
 
 # Set high-quality rendering defaults
 mpl.rcParams['figure.dpi'] = 100
@@ -97,21 +104,8 @@ df = pd.DataFrame(data, columns=["code", "participants", "theme"])
 # Get unique themes
 unique_themes = sorted(df['theme'].unique())
 
-# Define a color mapping for each theme
-# Using a colorful but professional palette
-color_palette = [
-    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", 
-    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
-    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", 
-    "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5"
-]
-
-# Ensure we have enough colors for all themes
-while len(color_palette) < len(unique_themes):
-    color_palette.extend(color_palette)
-
-# Create theme-color mapping
-theme_colors = {theme: color_palette[i] for i, theme in enumerate(unique_themes)}
+# Shared theme colours (the same in every figure and on every run)
+theme_colors = get_colors(unique_themes, 'themes')
 
 def create_code_clustering(df, unique_themes, theme_colors):
     """
@@ -230,7 +224,7 @@ def create_code_clustering(df, unique_themes, theme_colors):
     plt.tight_layout()
     
     # Save the figure
-    plt.savefig('cybersecurity_code_clustering.png', dpi=300, bbox_inches='tight')
+    save_figure(plt.gcf(), 'cybersecurity_code_clustering', dpi=300, bbox_inches='tight')
     
     plt.show()
 
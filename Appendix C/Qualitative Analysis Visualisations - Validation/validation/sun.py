@@ -1,4 +1,11 @@
 import plotly.express as px
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from qualkit.hierarchy import hierarchy_frame, flatten_hierarchy
+from qualkit.sunburst import show_sunburst
 
 # Define simplified structure from the LaTeX table: Research Question -> Themes
 rq_themes = {
@@ -29,30 +36,21 @@ rq_themes = {
     ]
 }
 
-# Build sunburst chart data
-labels = []
-parents = []
-values = []
-
-for rq, themes in rq_themes.items():
-    labels.append(rq)
-    parents.append("")
-    values.append(0)
-
-    for theme in themes:
-        labels.append(theme)
-        parents.append(rq)
-        values.append(1)
+# Build the nodes: ids are paths, so equal labels in different branches stay apart
+levels = ['question', 'theme']
+nodes = flatten_hierarchy(hierarchy_frame(rq_themes, levels), levels)
 
 # Create sunburst chart
 fig = px.sunburst(
-    names=labels,
-    parents=parents,
-    values=values,
+    ids=nodes['id'],
+    names=nodes['label'],
+    parents=nodes['parent'],
+    values=nodes['value'],
+    branchvalues='total',
     title="Research Questions and Associated Themes",
     width=1000,
     height=800
 )
 
 fig.update_layout(margin=dict(t=50, l=0, r=0, b=0))
-fig.show()
+show_sunburst(fig, 'sun_sunburst')
@@ -5,6 +5,14 @@ from matplotlib.colors import to_rgba
 import matplotlib as mpl
 from matplotlib.patches import Wedge, ConnectionPatch, Circle
 import matplotlib.patheffects as PathEffects
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.export import save_figure
+from qualkit.layout import wrap_label
+from qualkit.palette import get_colors, get_rgba
 
 # Set high-quality rendering defaults
 mpl.rcParams['figure.dpi'] = 100
@@ -45,39 +53,8 @@ expanded_df = pd.DataFrame(expanded_data, columns=["section", "research_question
 # Get unique clusters
 unique_clusters = sorted(expanded_df['cluster'].unique())
 
-# Define a color mapping for each cluster
-# Using a colorful but professional palette
-color_palette = [
-    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", 
-    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
-    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5"
-]
-
-# Ensure we have enough colors for all clusters
-while len(color_palette) < len(unique_clusters):
-    color_palette.extend(color_palette)
-
-# Create cluster-color mapping
-cluster_colors = {cluster: color_palette[i] for i, cluster in enumerate(unique_clusters)}
-
-# Function to wrap text to fit in pie wedges
-def wrap_text(text, width=15):
-    """Wrap text to fit in specified width"""
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        if len(' '.join(current_line + [word])) <= width:
-            current_line.append(word)
-        else:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return '\n'.join(lines)
+# Shared cluster colours (the same in every figure and on every run)
+cluster_colors = get_colors(unique_clusters, 'clusters')
 
 def create_improved_visualization(df, expanded_df, unique_clusters, cluster_colors):
     """Create improved pie chart visualizations for each research question"""
@@ -111,7 +88,7 @@ def create_improved_visualization(df, expanded_df, unique_clusters, cluster_colo
         values = [1] * n_sections
         
         # Colors for sections
-        section_colors = plt.cm.tab20(np.linspace(0, 1, n_sections))
+        section_colors = list(get_rgba(sections, 'sections').values())
         
         # Create pie chart for sections
         wedges, _ = ax.pie(values, radius=0.7, colors=section_colors, 
@@ -135,7 +112,8 @@ def create_improved_visualization(df, expanded_df, unique_clusters, cluster_colo
             y = 1.4 * np.sin(angle_rad)
             
             # Add section text with background for better readability
-            section_text = wrap_text(section, 15)
+            # Wrapped to a width in points, measured for the font of the label
+            section_text = wrap_label(section, 110, fontsize=12, fontweight='bold')
             text = ax.text(x, y, section_text, ha='center', va='center', fontsize=12, fontweight='bold',
                           bbox=dict(boxstyle="round,pad=0.4", fc='white', ec=section_colors[i], alpha=0.9, linewidth=2))
             
@@ -244,7 +222,7 @@ def create_improved_visualization(df, expanded_df, unique_clusters, cluster_colo
     plt.subplots_adjust(bottom=0.12, top=0.9)
     
     # Save the figure
-    plt.savefig('research_question_pie_charts.png', dpi=300, bbox_inches='tight')
+    save_figure(plt.gcf(), 'research_question_pie_charts', dpi=300, bbox_inches='tight')
     
     plt.show()
 
@@ -1,9 +1,16 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 import random
 import pandas as pd
 import re
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.export import save_figure
+from qualkit.figures import figure
+from qualkit.palette import get_rgba
 
 # Parse the LaTeX table function
 def parse_latex_table(latex_content):
@@ -30,9 +37,8 @@ def create_separate_source_affinity_diagrams(df):
     unique_clusters = df['cluster'].unique()
     num_clusters = len(unique_clusters)
     
-    # Create a color map for clusters
-    colors = plt.cm.tab20(np.linspace(0, 1, num_clusters))
-    cluster_colors = {cluster: colors[i] for i, cluster in enumerate(unique_clusters)}
+    # Shared cluster colours (the same in every figure and on every run)
+    cluster_colors = get_rgba(unique_clusters, 'clusters')
     
     # Split data by source
     interview_df = df[df['source'] == "Interview"]
@@ -40,101 +46,100 @@ def create_separate_source_affinity_diagrams(df):
     
     # Function to create an affinity diagram for a specific source
     def create_affinity_diagram(source_df, source_name):
-        plt.figure(figsize=(36, 30))
-        ax = plt.gca()
-        ax.set_facecolor('#F5F5F5')
+        with figure(f"{source_name.lower()}_affinity_diagram", figsize=(36, 30)) as fig:
+            ax = fig.subplots()
+            ax.set_facecolor('#F5F5F5')
         
-        # Setup cluster positions in a circular layout
-        cluster_centers = {}
-        angle_step = 2 * np.pi / num_clusters
-        radius = 60  # Spread of clusters from center
+            # Setup cluster positions in a circular layout
+            cluster_centers = {}
+            angle_step = 2 * np.pi / num_clusters
+            radius = 60  # Spread of clusters from center
         
-        for i, cluster in enumerate(unique_clusters):
-            angle = i * angle_step
-            x = radius * np.cos(angle)
-            y = radius * np.sin(angle)
-            cluster_centers[cluster] = (x, y)
+            for i, cluster in enumerate(unique_clusters):
+                angle = i * angle_step
+                x = radius * np.cos(angle)
+                y = radius * np.sin(angle)
+                cluster_centers[cluster] = (x, y)
         
-        width, height = 3.5, 0.9  # Dimensions for pattern label boxes
+            width, height = 3.5, 0.9  # Dimensions for pattern label boxes
         
-        # Function to generate positions for items within a cluster
-        def generate_cluster_positions(center_x, center_y, n):
-            if n == 0:
-                return []
+            # Function to generate positions for items within a cluster
+            def generate_cluster_positions(center_x, center_y, n):
+                if n == 0:
+                    return []
                 
-            cols = max(1, int(np.ceil(np.sqrt(n * 1.5))))  # More columns than strictly needed for better spacing
-            rows = int(np.ceil(n / cols))
-            spacing_x = width * 2.2  # Horizontal spacing
-            spacing_y = height * 3.0  # Vertical spacing
+                cols = max(1, int(np.ceil(np.sqrt(n * 1.5))))  # More columns than strictly needed for better spacing
+                rows = int(np.ceil(n / cols))
+                spacing_x = width * 2.2  # Horizontal spacing
+                spacing_y = height * 3.0  # Vertical spacing
             
-            start_x = center_x - (cols - 1) * spacing_x / 2
-            start_y = center_y + (rows - 1) * spacing_y / 2
+                start_x = center_x - (cols - 1) * spacing_x / 2
+                start_y = center_y + (rows - 1) * spacing_y / 2
             
-            positions = []
-            for i in range(n):
-                row = i // cols
-                col = i % cols
+                positions = []
+                for i in range(n):
+                    row = i // cols
+                    col = i % cols
                 
-                # Add staggered layout and jitter
-                offset = spacing_x / 3 if row % 2 else 0
-                jitter_x = random.uniform(-0.5, 0.5)
-                jitter_y = random.uniform(-0.5, 0.5)
+                    # Add staggered layout and jitter
+                    offset = spacing_x / 3 if row % 2 else 0
+                    jitter_x = random.uniform(-0.5, 0.5)
+                    jitter_y = random.uniform(-0.5, 0.5)
                 
-                x = start_x + col * spacing_x + jitter_x + offset
-                y = start_y - row * spacing_y + jitter_y
-                positions.append((x, y))
-            return positions
+                    x = start_x + col * spacing_x + jitter_x + offset
+                    y = start_y - row * spacing_y + jitter_y
+                    positions.append((x, y))
+                return positions
         
-        # Draw clusters and their items
-        for cluster in unique_clusters:
-            cluster_df = source_df[source_df['cluster'] == cluster]
-            center_x, center_y = cluster_centers[cluster]
-            color = cluster_colors[cluster]
+            # Draw clusters and their items
+            for cluster in unique_clusters:
+                cluster_df = source_df[source_df['cluster'] == cluster]
+                center_x, center_y = cluster_centers[cluster]
+                color = cluster_colors[cluster]
             
-            # Draw cluster label
-            plt.text(center_x, center_y + 6, cluster, ha='center', va='center',
-                     fontsize=16, fontweight='bold',
-                     bbox=dict(facecolor='white', alpha=0.95, boxstyle='round,pad=1.2',
-                               edgecolor=color, linewidth=2))
+                # Draw cluster label
+                ax.text(center_x, center_y + 6, cluster, ha='center', va='center',
+                        fontsize=16, fontweight='bold',
+                        bbox=dict(facecolor='white', alpha=0.95, boxstyle='round,pad=1.2',
+                                  edgecolor=color, linewidth=2))
             
-            # Skip empty clusters (for the current source)
-            if len(cluster_df) == 0:
-                continue
+                # Skip empty clusters (for the current source)
+                if len(cluster_df) == 0:
+                    continue
                 
-            # Generate positions for the items in this cluster
-            positions = generate_cluster_positions(center_x, center_y, len(cluster_df))
+                # Generate positions for the items in this cluster
+                positions = generate_cluster_positions(center_x, center_y, len(cluster_df))
             
-            # Draw the item boxes
-            for i, (_, row) in enumerate(cluster_df.iterrows()):
-                x, y = positions[i]
+                # Draw the item boxes
+                for i, (_, row) in enumerate(cluster_df.iterrows()):
+                    x, y = positions[i]
                 
-                # Create rectangle for the pattern label
-                rect_color = tuple(list(color[:3]) + [0.75])
-                rect = patches.Rectangle((x - width / 2, y - height / 2), width, height,
-                                         facecolor=rect_color, edgecolor='black',
-                                         linewidth=1.0, alpha=0.9)
-                ax.add_patch(rect)
+                    # Create rectangle for the pattern label
+                    rect_color = tuple(list(color[:3]) + [0.75])
+                    rect = patches.Rectangle((x - width / 2, y - height / 2), width, height,
+                                             facecolor=rect_color, edgecolor='black',
+                                             linewidth=1.0, alpha=0.9)
+                    ax.add_patch(rect)
                 
-                # Add the pattern label text
-                label = row['pattern_label']
-                short_text = (label[:40] + "...") if len(label) > 40 else label
-                plt.text(x, y, short_text, fontsize=8,
-                         ha='center', va='center', zorder=2)
+                    # Add the pattern label text
+                    label = row['pattern_label']
+                    short_text = (label[:40] + "...") if len(label) > 40 else label
+                    ax.text(x, y, short_text, fontsize=8,
+                            ha='center', va='center', zorder=2)
         
-        # Title and customization
-        plt.title(f"Cybersecurity Pattern Labels - {source_name} Source", fontsize=24)
-        plt.axis('off')
-        plt.axis('equal')
+            # Title and customization
+            ax.set_title(f"Cybersecurity Pattern Labels - {source_name} Source", fontsize=24)
+            ax.axis('off')
+            ax.axis('equal')
         
-        # Add a legend for clusters
-        legend_elements = [patches.Patch(facecolor=cluster_colors[clust], label=clust)
-                           for clust in unique_clusters]
-        plt.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, -0.02),
-                   ncol=3, fontsize=12, frameon=True)
+            # Add a legend for clusters
+            legend_elements = [patches.Patch(facecolor=cluster_colors[clust], label=clust)
+                               for clust in unique_clusters]
+            ax.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, -0.02),
+                      ncol=3, fontsize=12, frameon=True)
         
-        plt.tight_layout()
-        plt.savefig(f"{source_name.lower()}_affinity_diagram.png", dpi=300, bbox_inches="tight")
-        plt.close()
+            fig.tight_layout()
+            save_figure(fig, f"{source_name.lower()}_affinity_diagram", dpi=300, bbox_inches="tight")
     
     # Create separate diagrams for each source
     create_affinity_diagram(interview_df, "Interview")
@@ -155,31 +160,31 @@ def create_heatmap_comparison(df):
     cross_tab = cross_tab.sort_values(by='Total', ascending=False)
     cross_tab = cross_tab.drop('Total', axis=1)
     
-    plt.figure(figsize=(14, 12))
-    
-    # Create heatmap
-    im = plt.imshow(cross_tab.values, cmap='YlOrRd')
+    with figure('cluster_source_heatmap', figsize=(14, 12)) as fig:
+        ax = fig.subplots()
+
+        # Create heatmap
+        im = ax.imshow(cross_tab.values, cmap='YlOrRd')
     
-    # Add colorbar
-    cbar = plt.colorbar(im)
-    cbar.set_label('Number of Pattern Labels', rotation=270, labelpad=20)
+        # Add colorbar
+        cbar = fig.colorbar(im, ax=ax)
+        cbar.set_label('Number of Pattern Labels', rotation=270, labelpad=20)
     
-    # Configure axes
-    plt.xticks(range(len(cross_tab.columns)), cross_tab.columns, rotation=0)
-    plt.yticks(range(len(cross_tab.index)), cross_tab.index)
+        # Configure axes
+        ax.set_xticks(range(len(cross_tab.columns)), cross_tab.columns, rotation=0)
+        ax.set_yticks(range(len(cross_tab.index)), cross_tab.index)
     
-    # Add text annotations to cells
-    for i in range(len(cross_tab.index)):
-        for j in range(len(cross_tab.columns)):
-            text = plt.text(j, i, cross_tab.values[i, j],
-                           ha="center", va="center", 
-                           color="black" if cross_tab.values[i, j] < 5 else "white",
-                           fontweight='bold')
+        # Add text annotations to cells
+        for i in range(len(cross_tab.index)):
+            for j in range(len(cross_tab.columns)):
+                text = ax.text(j, i, cross_tab.values[i, j],
+                              ha="center", va="center", 
+                              color="black" if cross_tab.values[i, j] < 5 else "white",
+                              fontweight='bold')
     
-    plt.title('Distribution of Cybersecurity Pattern Labels by Cluster and Source', fontsize=16)
-    plt.tight_layout()
-    plt.savefig('cluster_source_heatmap.png', dpi=300)
-    plt.close()
+        ax.set_title('Distribution of Cybersecurity Pattern Labels by Cluster and Source', fontsize=16)
+        fig.tight_layout()
+        save_figure(fig, 'cluster_source_heatmap', dpi=300)
     
     print("Created cluster-source heatmap visualization")
 
@@ -188,141 +193,140 @@ def create_network_visualization(df):
     Create a network visualization showing relationships between
     clusters and sources, without displaying small count numbers.
     """
-    plt.figure(figsize=(20, 16))
-    ax = plt.gca()
-    ax.set_facecolor('#f8f8f8')
+    with figure('source_cluster_network', figsize=(20, 16)) as fig:
+        ax = fig.subplots()
+        ax.set_facecolor('#f8f8f8')
     
-    # Get unique clusters and count patterns in each
-    unique_clusters = df['cluster'].unique()
-    cluster_counts = df['cluster'].value_counts()
+        # Get unique clusters and count patterns in each
+        unique_clusters = df['cluster'].unique()
+        cluster_counts = df['cluster'].value_counts()
     
-    # Position for sources
-    source_pos = {'Interview': (-50, 0), 'Survey': (50, 0)}
+        # Position for sources
+        source_pos = {'Interview': (-50, 0), 'Survey': (50, 0)}
     
-    # Position clusters in a circular layout
-    cluster_pos = {}
-    num_clusters = len(unique_clusters)
+        # Position clusters in a circular layout
+        cluster_pos = {}
+        num_clusters = len(unique_clusters)
     
-    # Interview-heavy clusters on left side, Survey-heavy on right, balanced in middle
-    cluster_source_bias = {}
-    for cluster in unique_clusters:
-        cluster_df = df[df['cluster'] == cluster]
-        interview_count = len(cluster_df[cluster_df['source'] == 'Interview'])
-        survey_count = len(cluster_df[cluster_df['source'] == 'Survey'])
+        # Interview-heavy clusters on left side, Survey-heavy on right, balanced in middle
+        cluster_source_bias = {}
+        for cluster in unique_clusters:
+            cluster_df = df[df['cluster'] == cluster]
+            interview_count = len(cluster_df[cluster_df['source'] == 'Interview'])
+            survey_count = len(cluster_df[cluster_df['source'] == 'Survey'])
         
-        if interview_count > survey_count:
-            cluster_source_bias[cluster] = -1  # Left side
-        elif survey_count > interview_count:
-            cluster_source_bias[cluster] = 1   # Right side
-        else:
-            cluster_source_bias[cluster] = 0   # Middle
-    
-    # Sort clusters by bias and then by total count
-    sorted_clusters = sorted(
-        cluster_source_bias.items(), 
-        key=lambda x: (x[1], -cluster_counts[x[0]])
-    )
-    
-    # Distribute clusters in an arc based on their bias
-    left_clusters = [c for c, b in sorted_clusters if b == -1]
-    middle_clusters = [c for c, b in sorted_clusters if b == 0]
-    right_clusters = [c for c, b in sorted_clusters if b == 1]
-    
-    # Position the clusters
-    def position_cluster_group(clusters, start_angle, end_angle, radius=40):
-        positions = {}
-        if not clusters:
-            return positions
+            if interview_count > survey_count:
+                cluster_source_bias[cluster] = -1  # Left side
+            elif survey_count > interview_count:
+                cluster_source_bias[cluster] = 1   # Right side
+            else:
+                cluster_source_bias[cluster] = 0   # Middle
+    
+        # Sort clusters by bias and then by total count
+        sorted_clusters = sorted(
+            cluster_source_bias.items(), 
+            key=lambda x: (x[1], -cluster_counts[x[0]])
+        )
+    
+        # Distribute clusters in an arc based on their bias
+        left_clusters = [c for c, b in sorted_clusters if b == -1]
+        middle_clusters = [c for c, b in sorted_clusters if b == 0]
+        right_clusters = [c for c, b in sorted_clusters if b == 1]
+    
+        # Position the clusters
+        def position_cluster_group(clusters, start_angle, end_angle, radius=40):
+            positions = {}
+            if not clusters:
+                return positions
             
-        angle_step = (end_angle - start_angle) / max(1, len(clusters) - 1) if len(clusters) > 1 else 0
+            angle_step = (end_angle - start_angle) / max(1, len(clusters) - 1) if len(clusters) > 1 else 0
         
-        for i, cluster in enumerate(clusters):
-            angle = start_angle + i * angle_step
-            x = radius * np.cos(angle)
-            y = radius * np.sin(angle)
-            positions[cluster] = (x, y)
+            for i, cluster in enumerate(clusters):
+                angle = start_angle + i * angle_step
+                x = radius * np.cos(angle)
+                y = radius * np.sin(angle)
+                positions[cluster] = (x, y)
         
-        return positions
+            return positions
     
-    # Position each group
-    left_pos = position_cluster_group(left_clusters, 3*np.pi/4, 5*np.pi/4, radius=30)
-    middle_pos = position_cluster_group(middle_clusters, np.pi/4, 3*np.pi/4, radius=40)
-    right_pos = position_cluster_group(right_clusters, -np.pi/4, np.pi/4, radius=30)
+        # Position each group
+        left_pos = position_cluster_group(left_clusters, 3*np.pi/4, 5*np.pi/4, radius=30)
+        middle_pos = position_cluster_group(middle_clusters, np.pi/4, 3*np.pi/4, radius=40)
+        right_pos = position_cluster_group(right_clusters, -np.pi/4, np.pi/4, radius=30)
     
-    # Combine all positions
-    cluster_pos = {**left_pos, **middle_pos, **right_pos}
+        # Combine all positions
+        cluster_pos = {**left_pos, **middle_pos, **right_pos}
     
-    # Draw nodes for sources
-    for source, (x, y) in source_pos.items():
-        source_count = len(df[df['source'] == source])
-        size = np.sqrt(source_count) * 50
-        color = '#3498db' if source == 'Interview' else '#e74c3c'
+        # Draw nodes for sources
+        for source, (x, y) in source_pos.items():
+            source_count = len(df[df['source'] == source])
+            size = np.sqrt(source_count) * 50
+            color = '#3498db' if source == 'Interview' else '#e74c3c'
         
-        circle = plt.Circle((x, y), 6, color=color, alpha=0.9)
-        ax.add_patch(circle)
+            circle = patches.Circle((x, y), 6, color=color, alpha=0.9)
+            ax.add_patch(circle)
         
-        plt.text(x, y-10, f"{source}\n({source_count} patterns)", 
-                 ha='center', va='center', fontsize=14, fontweight='bold')
+            ax.text(x, y-10, f"{source}\n({source_count} patterns)", 
+                    ha='center', va='center', fontsize=14, fontweight='bold')
     
-    # Draw nodes for clusters
-    for cluster, (x, y) in cluster_pos.items():
-        cluster_count = cluster_counts[cluster]
-        size = np.sqrt(cluster_count) * 5
+        # Draw nodes for clusters
+        for cluster, (x, y) in cluster_pos.items():
+            cluster_count = cluster_counts[cluster]
+            size = np.sqrt(cluster_count) * 5
         
-        circle = plt.Circle((x, y), size, color='#2ecc71', alpha=0.7)
-        ax.add_patch(circle)
+            circle = patches.Circle((x, y), size, color='#2ecc71', alpha=0.7)
+            ax.add_patch(circle)
         
-        # Add cluster name
-        name_parts = cluster.split()
-        if len(name_parts) > 3:
-            # Split long names into multiple lines
-            midpoint = len(name_parts) // 2
-            name_text = ' '.join(name_parts[:midpoint]) + '\n' + ' '.join(name_parts[midpoint:])
-        else:
-            name_text = cluster
+            # Add cluster name
+            name_parts = cluster.split()
+            if len(name_parts) > 3:
+                # Split long names into multiple lines
+                midpoint = len(name_parts) // 2
+                name_text = ' '.join(name_parts[:midpoint]) + '\n' + ' '.join(name_parts[midpoint:])
+            else:
+                name_text = cluster
             
-        plt.text(x, y, name_text, ha='center', va='center', 
-                 fontsize=9, fontweight='bold')
+            ax.text(x, y, name_text, ha='center', va='center', 
+                    fontsize=9, fontweight='bold')
         
-        # Remove the count display below clusters
-        # The following line is commented out to remove the small numbers
-        # plt.text(x, y-size-3, f"({cluster_count})", ha='center', va='center', fontsize=8)
-    
-    # Draw edges between sources and clusters
-    for _, row in df.iterrows():
-        source = row['source']
-        cluster = row['cluster']
+            # Remove the count display below clusters
+            # The following line is commented out to remove the small numbers
+            # ax.text(x, y-size-3, f"({cluster_count})", ha='center', va='center', fontsize=8)
+    
+        # Draw edges between sources and clusters
+        for _, row in df.iterrows():
+            source = row['source']
+            cluster = row['cluster']
         
-        source_x, source_y = source_pos[source]
-        cluster_x, cluster_y = cluster_pos[cluster]
+            source_x, source_y = source_pos[source]
+            cluster_x, cluster_y = cluster_pos[cluster]
         
-        # Draw line with low alpha to avoid visual clutter
-        color = '#3498db' if source == 'Interview' else '#e74c3c'
-        plt.plot([source_x, cluster_x], [source_y, cluster_y], 
-                 color=color, alpha=0.05, linewidth=0.5)
-    
-    # Add summary connections with width based on count
-    for cluster in unique_clusters:
-        cluster_x, cluster_y = cluster_pos[cluster]
+            # Draw line with low alpha to avoid visual clutter
+            color = '#3498db' if source == 'Interview' else '#e74c3c'
+            ax.plot([source_x, cluster_x], [source_y, cluster_y], 
+                    color=color, alpha=0.05, linewidth=0.5)
+    
+        # Add summary connections with width based on count
+        for cluster in unique_clusters:
+            cluster_x, cluster_y = cluster_pos[cluster]
         
-        for source in ['Interview', 'Survey']:
-            source_x, source_y = source_pos[source]
-            count = len(df[(df['cluster'] == cluster) & (df['source'] == source)])
+            for source in ['Interview', 'Survey']:
+                source_x, source_y = source_pos[source]
+                count = len(df[(df['cluster'] == cluster) & (df['source'] == source)])
             
-            if count > 0:
-                color = '#3498db' if source == 'Interview' else '#e74c3c'
-                width = np.sqrt(count) * 0.8
+                if count > 0:
+                    color = '#3498db' if source == 'Interview' else '#e74c3c'
+                    width = np.sqrt(count) * 0.8
                 
-                plt.plot([source_x, cluster_x], [source_y, cluster_y], 
-                         color=color, alpha=0.6, linewidth=width)
-    
-    plt.title('Network Visualization of Cybersecurity Pattern Sources and Clusters', fontsize=18)
-    plt.xlim(-60, 60)
-    plt.ylim(-50, 50)
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig('source_cluster_network.png', dpi=300, bbox_inches='tight')
-    plt.close()
+                    ax.plot([source_x, cluster_x], [source_y, cluster_y], 
+                            color=color, alpha=0.6, linewidth=width)
+    
+        ax.set_title('Network Visualization of Cybersecurity Pattern Sources and Clusters', fontsize=18)
+        ax.set_xlim(-60, 60)
+        ax.set_ylim(-50, 50)
+        ax.axis('off')
+        fig.tight_layout()
+        save_figure(fig, 'source_cluster_network', dpi=300, bbox_inches='tight')
     
     print("Created network visualization of sources and clusters")
 # Main function that runs the visualizations
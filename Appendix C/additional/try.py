@@ -3,6 +3,14 @@ import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib as mpl
 from matplotlib.patches import Circle
+import os
+import sys
+
+# Shared helpers live in Appendix C/qualkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.export import save_figure
+from qualkit.layout import wrap_label
+from qualkit.palette import get_colors, get_rgba
 
 # Set rendering defaults
 mpl.rcParams['figure.dpi'] = 200
@@ -38,33 +46,13 @@ expanded_df = pd.DataFrame(expanded_data, columns=["section", "research_question
 
 # Unique clusters and color mapping
 unique_clusters = sorted(expanded_df['cluster'].unique())
-color_palette = [
-    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
-    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5"
-]
-while len(color_palette) < len(unique_clusters):
-    color_palette *= 2
-cluster_colors = {cluster: color_palette[i] for i, cluster in enumerate(unique_clusters)}
+cluster_colors = get_colors(unique_clusters, 'clusters')
 
 rq_titles = {
     "RQ1": "RQ1: How does digitization aid in hybrid warfare campaigns, and how does this challenge Denmark's cybersecurity governance frameworks?",
     "RQ2": "RQ2: How do geopolitical tensions influence evolution of cyberwarfare against Denmark?"
 }
 
-def wrap_text(text, width=20):
-    words = text.split()
-    lines, current_line = [], []
-    for word in words:
-        if len(' '.join(current_line + [word])) <= width:
-            current_line.append(word)
-        else:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-    if current_line:
-        lines.append(' '.join(current_line))
-    return '\n'.join(lines)
-
 def create_single_rq_visualization(rq, rq_title, df, expanded_df, cluster_colors):
     fig = plt.figure(figsize=(16, 14), dpi=100)
     ax = fig.add_subplot(111)
@@ -74,15 +62,14 @@ def create_single_rq_visualization(rq, rq_title, df, expanded_df, cluster_colors
     sections = rq_df['section'].tolist()
     n_sections = len(sections)
 
-    section_colors = plt.cm.tab20(np.linspace(0, 1, n_sections))
-    section_color_map = {section: section_colors[i] for i, section in enumerate(sections)}
+    section_color_map = get_rgba(sections, 'sections')
 
     center_x, center_y = 0.5, 0.48  # Moved slightly down
     rq_radius = 0.1
     ax.add_patch(plt.Circle((center_x, center_y), rq_radius, fc='royalblue', ec='black', lw=2))
     ax.text(center_x, center_y, rq.upper(), ha='center', va='center', fontsize=16, fontweight='bold', color='white')
 
-    wrapped_title = wrap_text(rq_title, width=55)
+    wrapped_title = wrap_label(rq_title, 380, fontsize=12, fontweight='bold')
     ax.text(center_x, 0.96, wrapped_title, ha='center', va='center',
             fontsize=12, fontweight='bold',
             bbox=dict(boxstyle="round,pad=0.3", fc='white', ec='black', alpha=0.8))
@@ -97,7 +84,7 @@ def create_single_rq_visualization(rq, rq_title, df, expanded_df, cluster_colors
         ax.add_patch(plt.Circle((theme_x, theme_y), theme_radius,
                                 fc=section_color_map[section], ec='black', lw=1.5, alpha=0.9))
 
-        section_text = wrap_text(section, width=10)
+        section_text = wrap_label(section, 100, fontsize=9, fontweight='bold')
         ax.text(theme_x, theme_y, section_text, ha='center', va='center',
                 fontsize=9, fontweight='bold', color='black')
         ax.plot([center_x, theme_x], [center_y, theme_y], '-', lw=2,
@@ -166,13 +153,13 @@ def create_legend_figure(unique_clusters, cluster_colors):
 
 def main():
     rq1_fig = create_single_rq_visualization("RQ1", rq_titles["RQ1"], df, expanded_df, cluster_colors)
-    rq1_fig.savefig('rq1_visualization.png', dpi=700, bbox_inches='tight')
+    save_figure(rq1_fig, 'rq1_visualization', dpi=700, bbox_inches='tight')
 
     rq2_fig = create_single_rq_visualization("RQ2", rq_titles["RQ2"], df, expanded_df, cluster_colors)
-    rq2_fig.savefig('rq2_visualization.png', dpi=700, bbox_inches='tight')
+    save_figure(rq2_fig, 'rq2_visualization', dpi=700, bbox_inches='tight')
 
     legend_fig = create_legend_figure(unique_clusters, cluster_colors)
-    legend_fig.savefig('clusters_legend.png', dpi=700, bbox_inches='tight')
+    save_figure(legend_fig, 'clusters_legend', dpi=700, bbox_inches='tight')
 
     plt.show()
 
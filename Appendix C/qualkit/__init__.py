@@ -0,0 +1,6 @@
+"""
+Shared helpers for the qualitative analysis and visualisation scripts in Appendix C.
+
+The scripts live in several folders and are run from their own directory, so each
+one adds the Appendix C folder to sys.path before importing from this package.
+"""
@@ -0,0 +1,320 @@
+"""
+Inter-coder agreement for coding tables with several coders.
+
+data.csv and the codebooks of vis.py are coded by one person. For a
+reliability check, every coder codes the same segments (pattern labels,
+quotes, codes) and the assignments are compared. The codings are one long
+table with one row per coder and segment:
+
+    segment                      coder   code
+    Medical Data Vulnerability   YL      Healthcare Security Vulnerabilities
+    Medical Data Vulnerability   AB      Critical Infrastructure
+
+Such a table is read from a CSV with segment, coder and code columns, or
+put together from one coding table per coder (data.csv, a LaTeX longtable,
+vis.py or main.py; see read_codebook in qualkit/suggest.py), where the label
+is the segment and its cluster or theme the code:
+
+    codings = read_codings(['data_yl.csv', 'data_ab.csv'], coders=['YL', 'AB'])
+    report = agreement_report(codings)
+    report['fleiss'], report['alpha'], report['codes']
+
+Reported are Cohen's kappa for every pair of coders, Fleiss' kappa and
+Krippendorff's alpha (nominal) over all coders, and per code how often the
+coders agreed on it, its own alpha and the code it is most often confused
+with. Segments a coder did not code count as missing, not as a disagreement.
+
+All statistics come from two count matrices built in one pass each: a
+sparse (segments x codes) matrix of how many coders gave each code, and the
+(codes x codes) coincidence matrix derived from it by one sparse product.
+Pairwise confusion matrices are np.bincount over code index pairs. From the
+command line:
+
+    python -m qualkit.agreement data_yl.csv data_ab.csv --coders YL AB --out disagreement.csv
+    python -m qualkit.agreement codings.csv
+"""
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from qualkit.suggest import read_codebook
+
+LONG_COLUMNS = ['segment', 'coder', 'code']
+
+
+def read_codings(paths, coders=None):
+    """
+    Codings of several coders as one long table.
+
+    Args:
+        paths (list): Either one CSV file with segment, coder and code columns,
+                      or one coding table per coder
+        coders (list, optional): Names of the coders of the tables; the file
+                                 names by default
+
+    Returns:
+        pandas.DataFrame: Columns segment, coder and code; one row per coder
+                          and segment (the first code if a coder gave several)
+
+    Raises:
+        ValueError: If coders does not have one name per table
+    """
+    if len(paths) == 1 and paths[0].lower().endswith('.csv'):
+        df = pd.read_csv(paths[0], dtype=str)
+        df.columns = [c.strip().lower() for c in df.columns]
+        if set(LONG_COLUMNS) <= set(df.columns):
+            return _clean(df[LONG_COLUMNS])
+
+    if coders is None:
+        coders = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(coders) != len(paths):
+        raise ValueError(f"{len(paths)} coding tables but {len(coders)} coder names")
+    frames = []
+    for path, coder in zip(paths, coders):
+        table = read_codebook(path)
+        frames.append(pd.DataFrame({'segment': table['label'], 'coder': coder, 'code': table['group']}))
+    return _clean(pd.concat(frames, ignore_index=True))
+
+
+def _clean(df):
+    """Drop empty codes and repeated (segment, coder) rows"""
+    df = df.astype(str).apply(lambda column: column.str.strip())
+    df = df[(df['code'] != '') & (df['code'].str.lower() != 'nan')]
+    return df.drop_duplicates(['segment', 'coder']).reset_index(drop=True)
+
+
+def coding_matrix(codings):
+    """
+    Codes as integers, one row per segment and one column per coder.
+
+    Returns:
+        tuple: ((segments x coders) int array with -1 where a coder did not
+                code a segment, segment names, coder names, code names)
+    """
+    segments, segment_index = np.unique(codings['segment'].values, return_inverse=True)
+    coders, coder_index = np.unique(codings['coder'].values, return_inverse=True)
+    codes, code_index = np.unique(codings['code'].values, return_inverse=True)
+    matrix = np.full((len(segments), len(coders)), -1, dtype=np.int64)
+    matrix[segment_index, coder_index] = code_index
+    return matrix, segments, coders, codes
+
+
+def confusion_matrix(a, b, n_codes):
+    """
+    Confusion matrix of two coders over the segments both coded.
+
+    Args:
+        a, b (numpy.ndarray): Code indices, -1 for missing
+        n_codes (int): Number of codes
+
+    Returns:
+        numpy.ndarray: (codes x codes) counts; rows are a's codes
+    """
+    both = (a >= 0) & (b >= 0)
+    return np.bincount(a[both] * n_codes + b[both], minlength=n_codes * n_codes).reshape(n_codes, n_codes)
+
+
+def cohen_kappa(confusion):
+    """
+    Cohen's kappa from a confusion matrix.
+
+    Returns:
+        float: kappa, or nan if the coders share no segment
+    """
+    total = confusion.sum()
+    if total == 0:
+        return float('nan')
+    observed = np.trace(confusion) / total
+    expected = (confusion.sum(axis=0) @ confusion.sum(axis=1)) / total ** 2
+    if expected == 1:
+        return 1.0
+    return float((observed - expected) / (1 - expected))
+
+
+def pairwise_kappa(matrix, coders, n_codes):
+    """
+    Cohen's kappa of every pair of coders.
+
+    Returns:
+        pandas.DataFrame: Columns coder_a, coder_b, segments (coded by both) and kappa
+    """
+    rows = []
+    for i, j in itertools.combinations(range(len(coders)), 2):
+        confusion = confusion_matrix(matrix[:, i], matrix[:, j], n_codes)
+        rows.append({'coder_a': coders[i], 'coder_b': coders[j],
+                     'segments': int(confusion.sum()), 'kappa': cohen_kappa(confusion)})
+    return pd.DataFrame(rows, columns=['coder_a', 'coder_b', 'segments', 'kappa'])
+
+
+def code_counts(matrix, n_codes):
+    """
+    Sparse (segments x codes) matrix of how many coders gave each code to each segment.
+    """
+    from scipy.sparse import csr_matrix
+
+    segments, coders = np.nonzero(matrix >= 0)
+    return csr_matrix((np.ones(len(segments)), (segments, matrix[segments, coders])),
+                      shape=(matrix.shape[0], n_codes))
+
+
+def fleiss_kappa(counts):
+    """
+    Fleiss' kappa of a (segments x codes) count matrix.
+
+    Segments coded by fewer than two coders are left out; the others may
+    have different numbers of coders.
+
+    Returns:
+        float: kappa, or nan if no segment has two codings
+    """
+    raters = np.asarray(counts.sum(axis=1)).ravel()
+    keep = raters >= 2
+    if not keep.any():
+        return float('nan')
+    counts = counts[np.flatnonzero(keep)]
+    raters = raters[keep]
+    # Share of agreeing coder pairs per segment, then their mean
+    squares = np.asarray(counts.multiply(counts).sum(axis=1)).ravel()
+    observed = np.mean((squares - raters) / (raters * (raters - 1)))
+    shares = np.asarray(counts.sum(axis=0)).ravel() / raters.sum()
+    expected = np.sum(shares ** 2)
+    if expected == 1:
+        return 1.0
+    return float((observed - expected) / (1 - expected))
+
+
+def coincidence_matrix(counts):
+    """
+    Krippendorff's coincidence matrix of a (segments x codes) count matrix.
+
+    Every ordered pair of codings of a segment counts 1 / (codings - 1), so
+    every pairable coding adds 1 to its row. Segments with one coding are
+    left out.
+
+    Returns:
+        numpy.ndarray: (codes x codes) coincidences
+    """
+    from scipy.sparse import diags
+
+    codings = np.asarray(counts.sum(axis=1)).ravel()
+    weights = np.where(codings >= 2, 1 / np.maximum(codings - 1, 1), 0)
+    weighted = diags(weights) @ counts
+    coincidences = np.asarray((counts.T @ weighted).todense())
+    # A coding is not paired with itself
+    coincidences -= np.diag(np.asarray(weighted.sum(axis=0)).ravel())
+    return coincidences
+
+
+def krippendorff_alpha(coincidences):
+    """
+    Krippendorff's alpha for nominal codes from a coincidence matrix.
+
+    Returns:
+        float: alpha, or nan without pairable codings
+    """
+    marginals = coincidences.sum(axis=1)
+    total = marginals.sum()
+    if total <= 1:
+        return float('nan')
+    disagreement = total - np.trace(coincidences)
+    expected = (total ** 2 - np.sum(marginals ** 2)) / (total - 1)
+    if expected == 0:
+        return 1.0
+    return float(1 - disagreement / expected)
+
+
+def code_disagreement(coincidences, codes):
+    """
+    Agreement per code.
+
+    Args:
+        coincidences (numpy.ndarray): Coincidence matrix
+        codes (list): Code names
+
+    Returns:
+        pandas.DataFrame: Columns code, codings (pairable codings with this
+                          code), agreement (share of them paired with the
+                          same code), alpha (of this code against all others)
+                          and confused_with (the other code it is paired with
+                          most), lowest agreement first
+    """
+    marginals = coincidences.sum(axis=1)
+    total = marginals.sum()
+    same = np.diag(coincidences)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        agreement = np.where(marginals > 0, same / marginals, np.nan)
+        # Binary alpha of "this code or another": the code disagrees with
+        # others in marginals - same pairs
+        alpha = 1 - (total - 1) * (marginals - same) / (marginals * (total - marginals))
+    others = coincidences - np.diag(same)
+    partner = others.argmax(axis=1)
+    report = pd.DataFrame({
+        'code': codes,
+        'codings': marginals.round(2),
+        'agreement': np.round(agreement, 3),
+        'alpha': np.round(alpha, 3),
+        'confused_with': [codes[p] if others[i, p] > 0 else '' for i, p in enumerate(partner)],
+    })
+    report = report[report['codings'] > 0]
+    return report.sort_values(['agreement', 'codings'], ascending=[True, False]).reset_index(drop=True)
+
+
+def agreement_report(codings):
+    """
+    All agreement statistics of a long coding table.
+
+    Args:
+        codings (pandas.DataFrame): Columns segment, coder and code (see read_codings)
+
+    Returns:
+        dict: segments, coders, shared (segments coded by two coders or more),
+              cohen (DataFrame from pairwise_kappa), fleiss, alpha and codes
+              (DataFrame from code_disagreement)
+    """
+    matrix, segments, coders, codes = coding_matrix(codings)
+    counts = code_counts(matrix, len(codes))
+    coincidences = coincidence_matrix(counts)
+    return {
+        'segments': len(segments),
+        'coders': list(coders),
+        'shared': int(((matrix >= 0).sum(axis=1) >= 2).sum()),
+        'cohen': pairwise_kappa(matrix, coders, len(codes)),
+        'fleiss': fleiss_kappa(counts),
+        'alpha': krippendorff_alpha(coincidences),
+        'codes': code_disagreement(coincidences, list(codes)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inter-coder agreement of several coders' coding tables")
+    parser.add_argument('tables', nargs='+',
+                        help="One CSV with segment, coder and code columns, or one coding table per coder")
+    parser.add_argument('--coders', nargs='+', default=None, help="Coder names, one per table (default: file names)")
+    parser.add_argument('--out', default=None, help="CSV file for the per-code disagreement report")
+    args = parser.parse_args(argv)
+
+    codings = read_codings(args.tables, args.coders)
+    report = agreement_report(codings)
+    if len(report['coders']) < 2:
+        parser.error("Agreement needs the codings of at least two coders")
+
+    print(f"{report['segments']} segments, {report['shared']} coded by two coders or more; "
+          f"coders: {', '.join(report['coders'])}")
+    for _, pair in report['cohen'].iterrows():
+        print(f"Cohen's kappa {pair['coder_a']} / {pair['coder_b']}: {pair['kappa']:.3f} ({pair['segments']} segments)")
+    print(f"Fleiss' kappa: {report['fleiss']:.3f}")
+    print(f"Krippendorff's alpha: {report['alpha']:.3f}")
+    print("\nCodes with the most disagreement:")
+    print(report['codes'].head(15).to_string(index=False))
+    if args.out:
+        report['codes'].to_csv(args.out, index=False)
+        print(f"Saved {os.path.abspath(args.out)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
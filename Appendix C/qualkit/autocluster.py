@@ -0,0 +1,273 @@
+"""
+Proposed clusters for pattern labels, compared with the manual ones.
+
+The clusters in data.csv were assigned by hand on the affinity board, and
+affinity_d.py only projects the labels to 2D afterwards. This module clusters
+the labels automatically, as a second opinion on the manual assignment:
+
+    df = read_pattern_table('data.csv')
+    proposed, names = propose_clusters(df['pattern_label'], method='kmeans')
+    scores, report = agreement(df['cluster'], proposed, names)
+    print(scores)   # {'ari': ..., 'nmi': ...}
+
+The labels are sparse TF-IDF vectors (the same terms as the suggestion index
+in qualkit/suggest.py), projected to at most 100 dimensions with LSA
+(TruncatedSVD), which groups labels that share related words rather than the
+very same ones. Two algorithms are available:
+
+- 'kmeans': MiniBatchKMeans, with as many clusters as there are manual
+  clusters unless given. Runs in time linear in the labels.
+- 'hdbscan': HDBSCAN, which finds the number of clusters itself; labels that
+  fit no cluster are put in 'Unclustered'.
+
+Agreement with the manual clusters is reported as the adjusted Rand index
+(ARI, 0 = chance, 1 = identical) and the normalised mutual information (NMI).
+
+For code sets that do not fit in memory, cluster_chunked reads the table in
+chunks and never holds more than one chunk of vectors: a HashingVectorizer
+(no vocabulary to keep) feeds MiniBatchKMeans.partial_fit in a first pass and
+predict in a second, appending the proposals to a CSV file. From the command line:
+
+    python -m qualkit.autocluster data.csv --method hdbscan --out proposals.csv
+    python -m qualkit.autocluster huge.csv --chunk-size 50000 --out proposals.csv
+
+Needs scikit-learn (1.3 or later for HDBSCAN).
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from qualkit.board import read_pattern_table
+from qualkit.suggest import analyze
+
+NOISE_NAME = 'Unclustered'
+# Dimensions of the LSA projection, at most, and labels per dimension at least
+LSA_COMPONENTS = 100
+LABELS_PER_COMPONENT = 5
+# Features of the hashed vectors in chunked mode
+HASH_FEATURES = 2 ** 18
+# Terms in the name of a proposed cluster
+NAME_TERMS = 3
+
+
+def vectorize_labels(labels):
+    """
+    TF-IDF vectors of some labels.
+
+    Returns:
+        tuple: (sparse matrix with unit rows, array of the term of every column)
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(analyzer=analyze, sublinear_tf=True)
+    matrix = vectorizer.fit_transform([str(label) for label in labels])
+    return matrix, vectorizer.get_feature_names_out()
+
+
+def _lsa(matrix, random_state):
+    """Unit-length LSA projection of TF-IDF vectors, with fewer dimensions for few labels"""
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.preprocessing import normalize
+
+    components = min(LSA_COMPONENTS, matrix.shape[0] // LABELS_PER_COMPONENT, matrix.shape[1] - 1)
+    if components < 2:
+        return matrix
+    return normalize(TruncatedSVD(components, random_state=random_state).fit_transform(matrix))
+
+
+def _cluster_names(matrix, terms, assignments):
+    """
+    Name every cluster after the terms with the highest mean weight in it.
+
+    Returns:
+        dict: cluster number -> name, e.g. 'attack / state / actor'
+    """
+    from scipy.sparse import csr_matrix
+
+    clusters = np.unique(assignments[assignments >= 0])
+    if len(clusters) == 0:
+        return {}
+    rows = np.searchsorted(clusters, assignments[assignments >= 0])
+    # One indicator row per cluster, so that all term sums are one product
+    members = csr_matrix((np.ones(len(rows)), (rows, np.flatnonzero(assignments >= 0))),
+                         shape=(len(clusters), len(assignments)))
+    weights = np.asarray((members @ matrix).todense())
+    # Name clusters with single words; word pairs mostly repeat them
+    weights[:, np.char.find(terms.astype(str), ' ') >= 0] = 0
+    names = {}
+    for i, cluster in enumerate(clusters):
+        top = np.argsort(-weights[i])[:NAME_TERMS]
+        names[int(cluster)] = ' / '.join(terms[t] for t in top if weights[i, t] > 0)
+    return names
+
+
+def propose_clusters(labels, method='kmeans', n_clusters=None, min_cluster_size=3, random_state=42):
+    """
+    Cluster labels automatically.
+
+    Args:
+        labels (list): Pattern labels
+        method (str): 'kmeans' or 'hdbscan'
+        n_clusters (int, optional): Number of clusters for 'kmeans'; required there
+        min_cluster_size (int): Smallest cluster 'hdbscan' reports
+        random_state (int): Seed, so that repeated runs propose the same clusters
+
+    Returns:
+        tuple: (array with the cluster number of every label, -1 for noise;
+                dict of cluster number -> name)
+
+    Raises:
+        ValueError: If the method is unknown or 'kmeans' has no n_clusters
+    """
+    matrix, terms = vectorize_labels(labels)
+    reduced = _lsa(matrix, random_state)
+
+    if method == 'kmeans':
+        from sklearn.cluster import MiniBatchKMeans
+
+        if not n_clusters:
+            raise ValueError("kmeans needs n_clusters")
+        model = MiniBatchKMeans(n_clusters=min(n_clusters, matrix.shape[0]), batch_size=1024,
+                                n_init=3, random_state=random_state)
+        assignments = model.fit_predict(reduced)
+    elif method == 'hdbscan':
+        from sklearn.cluster import HDBSCAN
+
+        assignments = HDBSCAN(min_cluster_size=min_cluster_size).fit_predict(reduced)
+    else:
+        raise ValueError(f"Unknown method {method!r}; use 'kmeans' or 'hdbscan'")
+
+    return assignments, _cluster_names(matrix, terms, assignments)
+
+
+def agreement(manual, proposed, names=None):
+    """
+    Compare proposed clusters with the manual ones.
+
+    Args:
+        manual (list): Manual cluster of every label
+        proposed (list): Proposed cluster number of every label
+        names (dict, optional): Proposed cluster number -> name
+
+    Returns:
+        tuple: ({'ari': float, 'nmi': float}, DataFrame with one row per proposed
+               cluster: name, size, the manual cluster most of its labels are in
+               and the share of its labels in that cluster)
+    """
+    from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+
+    manual = np.asarray(manual)
+    proposed = np.asarray(proposed)
+    scores = {
+        'ari': adjusted_rand_score(manual, proposed),
+        'nmi': normalized_mutual_info_score(manual, proposed),
+    }
+    counts = pd.crosstab(proposed, manual)
+    names = names or {}
+    report = pd.DataFrame({
+        'proposed': [names.get(int(c), NOISE_NAME if c < 0 else f"Cluster {c}") for c in counts.index],
+        'size': counts.sum(axis=1).values,
+        'manual': counts.idxmax(axis=1).values,
+        'purity': (counts.max(axis=1) / counts.sum(axis=1)).round(3).values,
+    })
+    return scores, report.sort_values('size', ascending=False).reset_index(drop=True)
+
+
+def _read_chunks(path, chunk_size):
+    """Chunks of a CSV pattern label table, with the columns of read_pattern_table"""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk.columns = [c.strip().lower().replace(' ', '_') for c in chunk.columns]
+        yield chunk[['pattern_label', 'source', 'cluster']]
+
+
+def cluster_chunked(path, out, n_clusters=None, chunk_size=10000, random_state=42):
+    """
+    Cluster a CSV table chunk by chunk with MiniBatchKMeans, in bounded memory.
+
+    Args:
+        path (str): CSV file with Pattern Label, Source and Cluster columns
+        out (str): CSV file the table is written to, with a proposed_cluster column
+        n_clusters (int, optional): Number of clusters; the number of manual clusters by default
+        chunk_size (int): Rows held in memory at a time
+        random_state (int): Seed of MiniBatchKMeans
+
+    Returns:
+        tuple: (scores and report as from agreement, without cluster names)
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Stateless, so every chunk is vectorised alike without a shared vocabulary
+    vectorizer = HashingVectorizer(analyzer=analyze, n_features=HASH_FEATURES,
+                                   alternate_sign=False, norm='l2')
+    if not n_clusters:
+        manual = set()
+        for chunk in _read_chunks(path, chunk_size):
+            manual.update(chunk['cluster'].unique())
+        n_clusters = len(manual)
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=min(chunk_size, 4096),
+                            n_init=3, random_state=random_state)
+
+    # First pass: fit. partial_fit needs at least n_clusters rows, so small
+    # chunks are held back until enough rows have come together.
+    pending = []
+    for chunk in _read_chunks(path, chunk_size):
+        pending.append(chunk['pattern_label'].astype(str))
+        if sum(len(p) for p in pending) >= n_clusters:
+            model.partial_fit(vectorizer.transform(pd.concat(pending)))
+            pending = []
+    if pending:
+        if not hasattr(model, 'cluster_centers_'):
+            raise ValueError(f"{path} has fewer rows than the {n_clusters} clusters asked for")
+        model.partial_fit(vectorizer.transform(pd.concat(pending)))
+
+    # Second pass: assign and write. Only the cluster numbers of all rows are
+    # kept, for the agreement scores.
+    manual, proposed = [], []
+    header = True
+    for chunk in _read_chunks(path, chunk_size):
+        chunk = chunk.assign(proposed_cluster=model.predict(vectorizer.transform(chunk['pattern_label'].astype(str))))
+        chunk.to_csv(out, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        manual.append(chunk['cluster'].astype(str).values)
+        proposed.append(chunk['proposed_cluster'].values)
+    return agreement(np.concatenate(manual), np.concatenate(proposed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Propose clusters for pattern labels and compare them with the manual ones")
+    parser.add_argument('table', help="Pattern label table (data.csv or a LaTeX longtable)")
+    parser.add_argument('--method', choices=['kmeans', 'hdbscan'], default='kmeans')
+    parser.add_argument('--clusters', type=int, default=None,
+                        help="Number of clusters for kmeans (default: number of manual clusters)")
+    parser.add_argument('--min-cluster-size', type=int, default=3, help="Smallest hdbscan cluster (default: 3)")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Read a CSV table in chunks of this many rows (kmeans only)")
+    parser.add_argument('--out', default=None, help="CSV file for the labels with their proposed cluster")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size:
+        if args.method != 'kmeans' or not args.table.lower().endswith('.csv') or not args.out:
+            parser.error("--chunk-size needs --method kmeans, a CSV table and --out")
+        scores, report = cluster_chunked(args.table, args.out, args.clusters, args.chunk_size)
+    else:
+        df = read_pattern_table(args.table)
+        n_clusters = args.clusters or df['cluster'].nunique()
+        proposed, names = propose_clusters(df['pattern_label'], args.method, n_clusters, args.min_cluster_size)
+        scores, report = agreement(df['cluster'], proposed, names)
+        if args.out:
+            df['proposed_cluster'] = [names.get(int(c), NOISE_NAME) for c in proposed]
+            df.to_csv(args.out, index=False)
+
+    print(f"Agreement with the manual clusters: ARI {scores['ari']:.3f}, NMI {scores['nmi']:.3f}")
+    print(report.to_string(index=False))
+    if args.out:
+        print(f"Saved {os.path.abspath(args.out)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
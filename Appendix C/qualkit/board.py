@@ -0,0 +1,210 @@
+"""
+Data-driven affinity board (miro_visualization.html).
+
+The board used to be generated as one absolutely positioned <div> per note,
+with the positions baked into a Python f-string. Here the notes are reduced to
+a compact, column-oriented JSON payload, and a static canvas viewer
+(qualkit/static/board.js, part of the shared bundle in qualkit/html.py) renders
+only the notes in the viewport, so the board opens immediately and stays
+responsive with 10k+ notes.
+
+Payload layout:
+
+    {
+      "clusters": [name, ...], "colors": ["#rrggbb", ...],
+      "sources": ["Interview", "Survey"],
+      "notes": {"label": [...], "cluster": [index, ...], "source": [index, ...]},
+      "views": [{"id", "title", "description", "meta",
+                 "x": [...], "y": [...], "headers": [{"label", "x", "y", ...}]}]
+    }
+
+Each view holds one x/y pair per note (its centre, in board pixels, with y
+pointing down).
+"""
+import argparse
+import re
+
+import pandas as pd
+
+from .html import read_page, write_page
+from .layout import pack_clusters, pack_rectangles
+from .layout_cache import load_layout, save_layout
+from .palette import get_colors
+
+# Note size in board pixels, matching NOTE_W/NOTE_H in board.js
+NOTE_SIZE = (120, 48)
+NOTE_GAP = 12
+
+
+def read_pattern_table(path):
+    """
+    Read a pattern label table: a CSV file like data.csv (Pattern Label,
+    Source, Cluster) or a LaTeX longtable with rows "label & source & cluster \\\\".
+
+    Args:
+        path (str): Table file
+
+    Returns:
+        DataFrame: 'pattern_label', 'source' and 'cluster' columns
+    """
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+        df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
+        return df[['pattern_label', 'source', 'cluster']]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        matches = re.findall(r'(.*?) & (.*?) & (.*?) \\\\', f.read())
+    rows = [{'pattern_label': m[0].strip(), 'source': m[1].strip(), 'cluster': m[2].strip()}
+            for m in matches if m[0].strip() != '\\textbf{Pattern Label}']  # Skip header row
+    return pd.DataFrame(rows, columns=['pattern_label', 'source', 'cluster'])
+
+
+def board_from_table(path):
+    """Build the board payload straight from a pattern label table"""
+    df = read_pattern_table(path)
+    return board_payload(df, get_colors(sorted(df['cluster'].unique()), 'clusters'))
+
+
+def board_payload(df, cluster_colors):
+    """
+    Build the board payload from the pattern label table.
+
+    Args:
+        df (DataFrame): Table with 'pattern_label', 'cluster' and 'source' columns
+        cluster_colors (dict): cluster -> hex colour
+
+    Returns:
+        dict: Board payload (see module docstring)
+    """
+    clusters = list(cluster_colors)
+    sources = ['Interview', 'Survey']
+    cluster_index = {cluster: i for i, cluster in enumerate(clusters)}
+    source_index = {source: i for i, source in enumerate(sources)}
+
+    labels = df['pattern_label'].astype(str).tolist()
+    note_clusters = [cluster_index[c] for c in df['cluster']]
+    note_sources = [source_index.get(s, len(sources) - 1) for s in df['source']]
+
+    payload = {
+        'clusters': clusters,
+        'colors': [cluster_colors[c] for c in clusters],
+        'sources': sources,
+        'notes': {'label': labels, 'cluster': note_clusters, 'source': note_sources},
+        'views': [
+            _source_view(note_sources, sources),
+            _cluster_view(labels, note_clusters, clusters, cluster_colors),
+        ],
+    }
+    return payload
+
+
+def _source_view(note_sources, sources):
+    """Interview notes on the left, survey notes on the right, each in a compact grid"""
+    x = [0.0] * len(note_sources)
+    y = [0.0] * len(note_sources)
+    headers = []
+
+    offset = 0.0
+    for s, source in enumerate(sources):
+        members = [i for i, v in enumerate(note_sources) if v == s]
+        centres, (block_w, block_h) = pack_rectangles([NOTE_SIZE] * len(members), gap=NOTE_GAP, aspect=0.8)
+        left = offset
+        for i, (cx, cy) in zip(members, centres):
+            x[i] = round(left + block_w / 2 + cx, 1)
+            y[i] = round(-cy, 1)  # Screen y points down
+        headers.append({'label': source.upper(), 'x': left + block_w / 2,
+                        'y': -block_h / 2 - 60, 'size': 24})
+        offset += block_w + 8 * NOTE_GAP
+
+    # Centre the two blocks on the origin
+    shift = (offset - 8 * NOTE_GAP) / 2
+    x = [v - shift for v in x]
+    for header in headers:
+        header['x'] -= shift
+
+    return {
+        'id': 'bySource', 'title': 'By Source', 'meta': 'source_cluster',
+        'description': ['This view organizes pattern labels by their source (Interview or Survey).',
+                        'Each color represents a different cluster category.',
+                        'Drag notes to rearrange them, drag the background to pan and scroll to zoom.'],
+        'x': x, 'y': y, 'headers': headers,
+    }
+
+
+def _cluster_view(labels, note_clusters, clusters, cluster_colors):
+    """One packed block of notes per cluster under its label, without overlaps"""
+    members = {cluster: [] for cluster in clusters}
+    for i, c in enumerate(note_clusters):
+        members[clusters[c]].append(i)
+
+    header_sizes = {cluster: (9 * len(cluster) + 40, 54) for cluster in clusters}
+    note_sizes = {cluster: [NOTE_SIZE] * len(members[cluster]) for cluster in clusters}
+    # Blocks start where they were last time, so editing the table (e.g. under
+    # qualkit/serve.py) only moves the clusters that have to make room
+    known = load_layout('board_clusters')
+    start = {cluster: known[cluster] for cluster in clusters if cluster in known}
+    layout = pack_clusters(header_sizes, note_sizes, note_gap=NOTE_GAP, cluster_gap=6 * NOTE_GAP,
+                           start=start)
+    save_layout('board_clusters', layout['blocks'])
+
+    x = [0.0] * len(labels)
+    y = [0.0] * len(labels)
+    headers = []
+    for cluster in clusters:
+        for i, (cx, cy) in zip(members[cluster], layout['notes'][cluster]):
+            x[i] = round(float(cx), 1)
+            y[i] = round(float(-cy), 1)  # Screen y points down
+        hx, hy = layout['headers'][cluster]
+        headers.append({'label': cluster, 'x': float(hx), 'y': float(-hy),
+                        'color': cluster_colors[cluster], 'size': 14})
+
+    return {
+        'id': 'byClusters', 'title': 'By Clusters', 'meta': 'source_tag',
+        'description': ['This view organizes pattern labels by their cluster category.',
+                        'Each cluster is packed around its label without overlapping notes.',
+                        'Interview (I) and Survey (S) sources are indicated in each note.'],
+        'x': x, 'y': y, 'headers': headers,
+    }
+
+
+def write_board(path, payload, title='Cybersecurity Pattern Labels Visualization', inline=False):
+    """Write a board page to path, with the shared viewer bundle next to it (or inlined)"""
+    return write_page(path, 'board', payload, title, inline=inline)
+
+
+def rebuild_board(path):
+    """
+    Rewrite a checked-in board page from its own data as a self-contained page,
+    with the current viewer bundle and the current palette colours.
+
+    Args:
+        path (str): Board page written by write_board
+
+    Returns:
+        str: path
+    """
+    viewer, title, payload = read_page(path)
+    if viewer != 'board':
+        raise ValueError('{} is a {} page, not a board'.format(path, viewer))
+    cluster_colors = get_colors(payload['clusters'], 'clusters')
+    payload['colors'] = [cluster_colors[c] for c in payload['clusters']]
+    for view in payload['views']:
+        for header in view['headers']:
+            if 'color' in header:
+                header['color'] = cluster_colors[header['label']]
+    return write_board(path, payload, title, inline=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild checked-in board pages as self-contained HTML.')
+    parser.add_argument('pages', nargs='+', help='Board pages to rebuild in place')
+
+    args = parser.parse_args()
+
+    for path in args.pages:
+        rebuild_board(path)
+        print(f"Rebuilt: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Word clouds of pattern labels with cached word counts and layouts.
+
+WordCloud.generate re-tokenises the whole text and searches a new layout (font
+size, position and orientation of every word on an occupancy map) on every
+call, so the cloud changed on each run and cost the same however little had
+changed. Here the two steps are separate and cached:
+
+- WordFrequencies counts the words of a list of labels and, when the list
+  changes, only re-counts the labels that were added or removed. Its counts
+  are stored in wordcloud_cache.json in the user's cache directory
+  ($XDG_CACHE_HOME/qualkit, by default ~/.cache/qualkit, next to the
+  palette), so the next run starts from them.
+- cloud_layout looks up the layout of a vocabulary (the top words, their
+  weights and the WordCloud options) in the same file and only searches a
+  new one when the vocabulary changed.
+
+Several clouds (e.g. one per cluster and one per source) are laid out in one
+call by batch_clouds, with the missing layouts computed in parallel:
+
+    clouds = batch_clouds({'interview': interview_labels, 'survey': survey_labels})
+    ax.imshow(clouds['interview'], interpolation='bilinear')
+
+The worker processes are started the platform's default way, which on
+Windows and macOS imports the calling script again in every worker; scripts
+that call batch_clouds must therefore only run under
+if __name__ == '__main__'.
+
+Clouds show single words: WordCloud's collocations (frequent two-word
+phrases) are switched off, as the counts are kept per word.
+
+The cache file is rewritten under a lock, keeping the clouds other processes
+stored, and replaced atomically, as the palette is. Set
+QUALKIT_WORDCLOUD_CACHE to another file, or to "off" to disable the layout
+cache. Needs the wordcloud package.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .palette import _locked, user_cache_dir
+
+CLOUD_CACHE_ENV = 'QUALKIT_WORDCLOUD_CACHE'
+CACHE_NAME = 'wordcloud_cache.json'
+
+# Same word pattern as WordCloud.process_text
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+
+# Options of the pattern label clouds; the fixed seed makes layouts repeatable
+DEFAULT_OPTIONS = {
+    'width': 800,
+    'height': 400,
+    'background_color': 'white',
+    'colormap': 'viridis',
+    'max_words': 100,
+    'random_state': 42,
+    # Words are counted one by one (see label_words), without bigrams
+    'collocations': False,
+}
+
+
+@lru_cache(maxsize=None)
+def _stopwords():
+    from wordcloud import STOPWORDS
+    return frozenset(w.lower() for w in STOPWORDS)
+
+
+@lru_cache(maxsize=65536)
+def label_words(label):
+    """
+    Words of one label, as WordCloud would count them with collocations=False.
+
+    Returns:
+        tuple: The words in their original case, without stopwords and numbers
+    """
+    stopwords = _stopwords()
+    words = []
+    for word in TOKEN_PATTERN.findall(label):
+        if word.lower().endswith("'s"):
+            word = word[:-2]
+        if word.isdigit() or word.lower() in stopwords:
+            continue
+        words.append(word)
+    return tuple(words)
+
+
+class WordFrequencies:
+    """
+    Word counts of a collection of labels that can be updated in place.
+
+    Words are counted case-insensitively and shown in their most common form;
+    a plural is merged into its singular when both occur, as WordCloud does.
+
+    Args:
+        labels (iterable, optional): Initial labels
+    """
+
+    def __init__(self, labels=()):
+        self.labels = Counter()
+        self.counts = Counter()
+        self.forms = {}
+        self.update(labels)
+
+    def _count(self, label, n):
+        for word in label_words(label):
+            key = word.lower()
+            self.counts[key] += n
+            forms = self.forms.setdefault(key, Counter())
+            forms[word] += n
+            if forms[word] <= 0:
+                del forms[word]
+            if self.counts[key] <= 0:
+                del self.counts[key]
+                del self.forms[key]
+
+    def add(self, label, n=1):
+        """Count a label (n more times)"""
+        self.labels[label] += n
+        self._count(label, n)
+
+    def remove(self, label, n=1):
+        """Stop counting a label (n of its occurrences)"""
+        n = min(n, self.labels[label])
+        if n <= 0:
+            return
+        self.labels[label] -= n
+        if self.labels[label] == 0:
+            del self.labels[label]
+        self._count(label, -n)
+
+    def update(self, labels):
+        """
+        Make the counted labels equal to labels, re-counting only the differences.
+
+        Args:
+            labels (iterable): The new collection of labels
+
+        Returns:
+            int: Number of labels that were added or removed
+        """
+        new = Counter(labels)
+        changed = 0
+        for label in set(new) | set(self.labels):
+            delta = new[label] - self.labels[label]
+            if delta > 0:
+                self.add(label, delta)
+            elif delta < 0:
+                self.remove(label, -delta)
+            changed += abs(delta)
+        return changed
+
+    def state(self):
+        """Labels, word counts and word forms as plain dicts (see from_state)"""
+        return {
+            'labels': dict(self.labels),
+            'counts': dict(self.counts),
+            'forms': {key: dict(forms) for key, forms in self.forms.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """WordFrequencies restored from state() without counting the labels again"""
+        model = cls()
+        model.labels = Counter(state.get('labels', {}))
+        model.counts = Counter(state.get('counts', {}))
+        model.forms = {key: Counter(forms) for key, forms in state.get('forms', {}).items()}
+        return model
+
+    def frequencies(self):
+        """
+        Word frequencies for WordCloud.generate_from_frequencies.
+
+        Returns:
+            dict: display form -> count
+        """
+        counts = Counter(self.counts)
+        for key in list(counts):
+            # Merge 'attacks' into 'attack', but leave words such as 'access'
+            if key.endswith('s') and not key.endswith('ss') and key[:-1] in counts:
+                counts[key[:-1]] += counts.pop(key)
+        return {self.forms[key].most_common(1)[0][0]: n for key, n in counts.items()}
+
+
+def get_cache_path():
+    """Return the path of the layout cache, or None if caching is switched off"""
+    path = os.environ.get(CLOUD_CACHE_ENV)
+    if path is None:
+        return os.path.join(user_cache_dir(), CACHE_NAME)
+    path = path.strip()
+    if path.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    return path
+
+
+def _read_cache(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _vocabulary_key(frequencies, options):
+    """Hash of everything the layout depends on"""
+    top = sorted(frequencies.items(), key=lambda item: (-item[1], item[0]))[:options.get('max_words', 200)]
+    text = json.dumps([top, sorted(options.items())], default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _compute_layout(job):
+    """Search the layout of one cloud (runs in a worker process)"""
+    frequencies, options = job
+    from wordcloud import WordCloud
+    cloud = WordCloud(**options).generate_from_frequencies(frequencies)
+    return {
+        'words': cloud.words_,
+        'layout': [[word, freq, size, list(map(int, position)),
+                    None if orientation is None else int(orientation), color]
+                   for (word, freq), size, position, orientation, color in cloud.layout_],
+    }
+
+
+def _restore(entry, options):
+    """A WordCloud that draws a stored layout without searching it again"""
+    from PIL import Image
+    from wordcloud import WordCloud
+    cloud = WordCloud(**options)
+    cloud.words_ = entry['words']
+    cloud.layout_ = [((word, freq), size, tuple(position),
+                      None if orientation is None else Image.Transpose(orientation), color)
+                     for word, freq, size, position, orientation, color in entry['layout']]
+    return cloud
+
+
+def batch_clouds(groups, jobs=None, models=None, **options):
+    """
+    Lay out one word cloud per group of labels, reusing cached layouts.
+
+    Args:
+        groups (dict): Cloud name -> labels
+        jobs (int, optional): Worker processes for the layouts that are not
+                              cached; one per CPU by default
+        models (dict, optional): Cloud name -> WordFrequencies kept between
+                                 calls; updated in place. Models that are not
+                                 given start from the counts in the cache.
+        **options: WordCloud options, added to DEFAULT_OPTIONS
+
+    Returns:
+        dict: Cloud name -> WordCloud with its layout, ready for imshow or
+              to_file. Groups without any words are left out.
+    """
+    options = dict(DEFAULT_OPTIONS, **options)
+    models = {} if models is None else models
+    path = get_cache_path()
+    cache = _read_cache(path) if path else {}
+
+    frequencies, keys, missing = {}, {}, []
+    changed = set()
+    for name, labels in groups.items():
+        if name not in models:
+            state = cache.get(name, {}).get('model')
+            models[name] = WordFrequencies.from_state(state) if state else WordFrequencies()
+        model = models[name]
+        if model.update(labels):
+            changed.add(name)
+            cache.setdefault(name, {})['model'] = model.state()
+        frequencies[name] = model.frequencies()
+        if not frequencies[name]:
+            continue
+        keys[name] = _vocabulary_key(frequencies[name], options)
+        if cache.get(name, {}).get('key') != keys[name]:
+            missing.append(name)
+
+    if missing:
+        work = [(frequencies[name], options) for name in missing]
+        if len(missing) == 1:
+            layouts = [_compute_layout(work[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                layouts = list(pool.map(_compute_layout, work))
+        for name, layout in zip(missing, layouts):
+            cache[name] = dict(layout, key=keys[name], model=models[name].state())
+    if path and (missing or changed):
+        with _locked(path):
+            # Re-read under the lock, so clouds other processes stored are kept
+            stored = _read_cache(path)
+            stored.update({name: cache[name] for name in changed.union(missing)})
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, 'w') as f:
+                json.dump(stored, f)
+            os.replace(temp, path)
+
+    return {name: _restore(cache[name], options) for name in keys}
+
+
+def cloud_layout(name, labels, **options):
+    """Lay out a single word cloud (see batch_clouds)"""
+    return batch_clouds({name: labels}, **options)[name]
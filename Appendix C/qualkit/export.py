@@ -0,0 +1,155 @@
+"""
+Figure export for the visualisation scripts.
+
+By default every figure is written straight to PNG, as the scripts always did.
+Setting the environment variable QUALKIT_EXPORT to "svg" or "pdf" switches to
+vector-first mode: each figure is laid out once and saved as a vector file, and
+its name, target PNG path and resolution are recorded in vector_manifest.json in
+the working directory. PNGs at any resolution are then derived from the vector
+files in a separate, parallel step without re-running the analysis:
+
+    QUALKIT_EXPORT=svg python affin.py
+    python -m qualkit.export "Qualitative Analysis Visualisations - Main/vector_manifest.json" --dpi 600
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+EXPORT_MODE_ENV = 'QUALKIT_EXPORT'
+MANIFEST_NAME = 'vector_manifest.json'
+VECTOR_FORMATS = ('svg', 'pdf')
+
+
+def get_export_mode():
+    """Return the active export mode: 'png' (default), 'svg' or 'pdf'."""
+    mode = os.environ.get(EXPORT_MODE_ENV, 'png').strip().lower()
+    if mode not in ('png',) + VECTOR_FORMATS:
+        raise ValueError(f"Unsupported {EXPORT_MODE_ENV}={mode!r}; use 'png', 'svg' or 'pdf'")
+    return mode
+
+
+def save_figure(fig, name, dpi=300, **savefig_kwargs):
+    """
+    Save a figure as PNG or, in vector-first mode, as SVG/PDF.
+
+    Args:
+        fig: Matplotlib figure to save
+        name (str): Output path without extension, e.g. 'visualizations/code_clustering'
+        dpi (int): Resolution of the PNG. In vector mode this is recorded as the
+                   default resolution for rasterization (and used for any
+                   rasterized artists embedded in the vector file).
+        **savefig_kwargs: Passed through to fig.savefig (bbox_inches, facecolor, ...)
+
+    Returns:
+        str: Path of the file that was written
+    """
+    mode = get_export_mode()
+    if mode == 'png':
+        path = f"{name}.png"
+        fig.savefig(path, dpi=dpi, **savefig_kwargs)
+        return path
+
+    path = f"{name}.{mode}"
+    fig.savefig(path, format=mode, dpi=dpi, **savefig_kwargs)
+    _record_vector(path, f"{name}.png", dpi)
+    return path
+
+
+def _record_vector(vector_path, png_path, dpi):
+    """Add or update a figure entry in the manifest of the working directory"""
+    manifest = load_manifest(MANIFEST_NAME) if os.path.exists(MANIFEST_NAME) else {}
+    manifest[vector_path] = {'png': png_path, 'dpi': dpi}
+    with open(MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_manifest(manifest_path):
+    """Load a vector manifest as a dict of vector path -> {'png', 'dpi'}"""
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def _rasterize_one(job):
+    """Render the first page of one vector file to PNG (runs in a worker process)"""
+    src, dst, dpi = job
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+
+    # PyMuPDF renders both SVG and PDF and is the fastest option
+    try:
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf  # PyMuPDF < 1.24
+        with pymupdf.open(src) as doc:
+            doc[0].get_pixmap(dpi=dpi).save(dst)
+        return dst
+    except ImportError:
+        pass
+
+    if src.endswith('.svg'):
+        try:
+            import cairosvg
+            cairosvg.svg2png(url=src, write_to=dst, dpi=dpi)
+            return dst
+        except (ImportError, OSError):
+            pass
+    elif shutil.which('pdftoppm'):
+        subprocess.run(['pdftoppm', '-png', '-singlefile', '-r', str(dpi),
+                        src, os.path.splitext(dst)[0]], check=True)
+        return dst
+
+    raise RuntimeError(f"No rasterizer available for {src}. Install PyMuPDF (pip install pymupdf), "
+                       "cairosvg, or poppler-utils (pdftoppm).")
+
+
+def rasterize(manifest_path=MANIFEST_NAME, dpi=None, out_dir=None, workers=None):
+    """
+    Derive PNGs from previously exported vector files.
+
+    Args:
+        manifest_path (str): Path to a vector_manifest.json
+        dpi (int, optional): Resolution for all PNGs. If None, each figure's
+                             recorded resolution is used.
+        out_dir (str, optional): Directory to write PNGs to. If None, PNGs are
+                                 written where the PNG-mode export would put them.
+        workers (int, optional): Number of worker processes (default: CPU count)
+
+    Returns:
+        list: Paths of the PNG files that were written
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for vector_path, entry in load_manifest(manifest_path).items():
+        png_path = entry['png']
+        if out_dir is not None:
+            png_path = os.path.join(os.path.abspath(out_dir), os.path.basename(png_path))
+        jobs.append((os.path.join(base_dir, vector_path),
+                     os.path.join(base_dir, png_path),
+                     dpi or entry['dpi']))
+
+    if not jobs:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_rasterize_one, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rasterize exported vector figures to PNG.')
+    parser.add_argument('manifest', nargs='?', default=MANIFEST_NAME, help='Path to vector_manifest.json')
+    parser.add_argument('--dpi', type=int, help='Resolution for all PNGs (default: recorded per figure)')
+    parser.add_argument('--out-dir', '-o', help='Directory to write the PNGs to')
+    parser.add_argument('--workers', '-j', type=int, help='Number of worker processes')
+
+    args = parser.parse_args()
+
+    written = rasterize(args.manifest, dpi=args.dpi, out_dir=args.out_dir, workers=args.workers)
+    for path in written:
+        print(f"Rasterized: {path}")
+    print(f"{len(written)} figures rasterized")
+
+
+if __name__ == "__main__":
+    main()
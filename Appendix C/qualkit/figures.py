@@ -0,0 +1,133 @@
+"""
+Explicit figure lifecycle for the visualisation scripts.
+
+Figures are created as matplotlib.figure.Figure objects rather than through
+pyplot, so they never enter pyplot's global figure registry and are released as
+soon as the `with` block that owns them exits, even if drawing raises:
+
+    with figure(figsize=(14, 10)) as fig:
+        ax = fig.subplots()
+        ...
+        save_figure(fig, 'cluster_stats', dpi=300, bbox_inches='tight')
+
+Setting the environment variable QUALKIT_TRACK_FIGURES=1 enables memory
+tracking: every figure is registered, and when the script exits a report lists
+the figures that are still alive (plus any left open in pyplot) together with
+the peak memory of the process.
+"""
+import atexit
+import gc
+import os
+import sys
+import weakref
+from contextlib import contextmanager
+
+from matplotlib.figure import Figure
+
+TRACK_ENV = 'QUALKIT_TRACK_FIGURES'
+
+# (weak reference, label) for every figure created while tracking is enabled
+_tracked_figures = []
+# Tracked figures that have been closed but may still be referenced
+_closed_figures = weakref.WeakSet()
+
+
+def tracking_enabled():
+    """Return True if figure memory tracking is switched on"""
+    return os.environ.get(TRACK_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def new_figure(name=None, **figure_kwargs):
+    """
+    Create a figure outside pyplot's global state.
+
+    Args:
+        name (str, optional): Label used in the memory tracking report
+        **figure_kwargs: Passed to matplotlib.figure.Figure (figsize, dpi, facecolor, ...)
+
+    Returns:
+        Figure: The new figure
+    """
+    fig = Figure(**figure_kwargs)
+    if tracking_enabled():
+        label = name or f"figure {len(_tracked_figures) + 1} ({_caller()})"
+        _tracked_figures.append((weakref.ref(fig), label))
+    return fig
+
+
+def close_figure(fig):
+    """Release a figure's artists and detach it from pyplot if it was ever registered there"""
+    fig.clear()
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close(fig)
+    if tracking_enabled():
+        _closed_figures.add(fig)
+
+
+@contextmanager
+def figure(name=None, **figure_kwargs):
+    """
+    Context manager around new_figure/close_figure.
+
+    Args:
+        name (str, optional): Label used in the memory tracking report
+        **figure_kwargs: Passed to matplotlib.figure.Figure
+
+    Yields:
+        Figure: The figure, which is closed when the block exits
+    """
+    fig = new_figure(name, **figure_kwargs)
+    try:
+        yield fig
+    finally:
+        close_figure(fig)
+
+
+def retained_figures():
+    """Return the labels of tracked figures that are still alive and were never closed"""
+    gc.collect()
+    return [label for ref, label in _tracked_figures
+            if ref() is not None and ref() not in _closed_figures]
+
+
+def report():
+    """Print the figure memory tracking report"""
+    retained = retained_figures()
+    print(f"\nFigure tracking: {len(_tracked_figures)} created, {len(retained)} retained without being closed")
+    for label in retained:
+        print(f"  retained: {label}")
+
+    if 'matplotlib.pyplot' in sys.modules:
+        open_numbers = sys.modules['matplotlib.pyplot'].get_fignums()
+        if open_numbers:
+            print(f"  open in pyplot: {len(open_numbers)} figure(s) {open_numbers}")
+
+    peak = _peak_memory_mb()
+    if peak is not None:
+        print(f"  peak memory: {peak:.0f} MB")
+
+
+def _caller():
+    """Return 'file:line' of the code that asked for a figure"""
+    frame = sys._getframe(1)
+    while frame is not None and (frame.f_code.co_filename == __file__
+                                 or frame.f_code.co_filename.endswith('contextlib.py')):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+def _peak_memory_mb():
+    """Return the peak resident memory of the process in MB, if the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+if tracking_enabled():
+    atexit.register(report)
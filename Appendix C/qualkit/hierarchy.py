@@ -0,0 +1,188 @@
+"""
+Flat node tables for plotly sunbursts, treemaps and icicles.
+
+Plotly draws a hierarchy from parallel lists of ids, labels, parents and
+values. The scripts used to build these lists with nested loops, using the
+label as the id, so two quotes with the same text (or a theme that appears
+under two participants) collapsed into one node. Here the hierarchy is a
+DataFrame with one column per level, one row per leaf:
+
+    category                         subcategory                   quote
+    Critical Infrastructure Vuln...  Digital System Dependencies   P3: Denmark has ...
+
+flatten_hierarchy turns it into a node table with one groupby per level. The
+id of a node is its path, so equal labels in different branches stay apart,
+and every leaf gets an id of its own:
+
+    rows = hierarchy_frame(affinity_structure, ['category', 'subcategory', 'quote'])
+    nodes = flatten_hierarchy(rows, ['category', 'subcategory', 'quote'])
+    fig = go.Figure(go.Sunburst(**hierarchy_trace(nodes)))   # or go.Treemap, go.Icicle
+"""
+import os
+
+import pandas as pd
+
+# Joins the labels of a path into an id; never part of the text of a label
+ID_SEPARATOR = '\x1f'
+# Last part of the id of a "N more" node (leaf ids end in a row number instead)
+MORE_SUFFIX = 'more'
+LOD_ENV = 'QUALKIT_SUNBURST_LOD'
+
+
+def hierarchy_frame(structure, levels):
+    """
+    Turn a nested dict of lists into a DataFrame with one row per leaf.
+
+    Args:
+        structure (dict): e.g. {category: {subcategory: [quote, ...]}}
+        levels (list): Column names, one per level including the leaves
+
+    Returns:
+        pandas.DataFrame: Columns levels, in the order of the structure
+
+    Raises:
+        ValueError: If a leaf is not at the depth given by levels
+    """
+    rows = []
+
+    def walk(node, path):
+        if isinstance(node, dict):
+            for key, child in node.items():
+                walk(child, path + [key])
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                rows.append(path + [item])
+        else:
+            rows.append(path + [node])
+
+    walk(structure, [])
+    for row in rows:
+        if len(row) != len(levels):
+            raise ValueError(f"Leaf {row[-1]!r} is at depth {len(row)}, expected {len(levels)}")
+    return pd.DataFrame(rows, columns=levels)
+
+
+def flatten_hierarchy(df, levels, value=None, root=None):
+    """
+    Build the node table of a hierarchy.
+
+    Args:
+        df (pandas.DataFrame): One row per leaf
+        levels (list): Columns of df from the outermost level to the leaves
+        value (str, optional): Column with the size of each leaf; every leaf
+                               counts 1 by default
+        root (str, optional): Label of a single root node above the first level
+
+    Returns:
+        pandas.DataFrame: Columns id, parent, label, value and depth, parents
+                          before their children. Values are totals, so use
+                          branchvalues='total' in plotly.
+    """
+    labels = df[levels].astype(str).reset_index(drop=True)
+    if value is None:
+        weights = pd.Series(1, index=labels.index)
+    else:
+        weights = df[value].reset_index(drop=True)
+
+    tables = []
+    if root is None:
+        parent_ids = pd.Series('', index=labels.index)
+    else:
+        tables.append(pd.DataFrame({'id': [root], 'parent': [''], 'label': [root],
+                                    'value': [weights.sum()], 'depth': [0]}))
+        parent_ids = pd.Series(root, index=labels.index)
+    offset = len(tables)
+
+    for depth, level in enumerate(levels):
+        if depth == len(levels) - 1:
+            # Leaves are not merged: the row number keeps equal texts apart
+            ids = parent_ids + ID_SEPARATOR + labels.index.astype(str)
+            nodes = pd.DataFrame({'id': ids, 'parent': parent_ids,
+                                  'label': labels[level], 'value': weights})
+        else:
+            if depth == 0 and root is None:
+                ids = labels[level]
+            else:
+                ids = parent_ids + ID_SEPARATOR + labels[level]
+            nodes = (pd.DataFrame({'id': ids, 'parent': parent_ids,
+                                   'label': labels[level], 'value': weights})
+                     .groupby('id', sort=False)
+                     .agg(parent=('parent', 'first'), label=('label', 'first'), value=('value', 'sum'))
+                     .reset_index())
+        nodes['depth'] = depth + offset
+        tables.append(nodes)
+        parent_ids = ids
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def hierarchy_trace(nodes):
+    """
+    Keyword arguments for go.Sunburst, go.Treemap or go.Icicle.
+
+    Args:
+        nodes (pandas.DataFrame): Node table from flatten_hierarchy
+
+    Returns:
+        dict: ids, labels, parents, values and branchvalues
+    """
+    return {
+        'ids': nodes['id'].tolist(),
+        'labels': nodes['label'].tolist(),
+        'parents': nodes['parent'].tolist(),
+        'values': nodes['value'].tolist(),
+        'branchvalues': 'total',
+    }
+
+
+def level_of_detail(nodes, max_leaves=None):
+    """
+    Fold the leaves beyond the first max_leaves of every parent into one "N more" node.
+
+    The folded leaves are returned separately, so that an exported sunburst can
+    load them on click (see export_sunburst in qualkit/sunburst.py). The size
+    of the figure then depends on max_leaves, not on the number of quotes.
+    If nodes has a customdata column (e.g. hover text), the folded leaves keep
+    theirs in the sidecar and the "N more" nodes get ''.
+
+    Args:
+        nodes (pandas.DataFrame): Node table from flatten_hierarchy
+        max_leaves (int, optional): Leaves shown per parent; QUALKIT_SUNBURST_LOD
+                                    by default. 0 or unset leaves nodes unchanged.
+
+    Returns:
+        tuple: (node table with "N more" nodes, sidecar). The sidecar is
+               {'pageSize': max_leaves, 'more': {id of "N more" node:
+               {'parent': id, 'children': [[id, label, value(, customdata)], ...]}}},
+               or {} if nothing was folded.
+    """
+    if max_leaves is None:
+        max_leaves = int(os.environ.get(LOD_ENV, '0') or 0)
+    if max_leaves <= 0:
+        return nodes, {}
+
+    is_leaf = ~nodes['id'].isin(nodes['parent'])
+    rank = nodes[is_leaf].groupby('parent', sort=False).cumcount()
+    folded = pd.Series(False, index=nodes.index)
+    folded[rank.index] = rank >= max_leaves
+    if not folded.any():
+        return nodes, {}
+
+    columns = ['id', 'label', 'value']
+    if 'customdata' in nodes.columns:
+        columns.append('customdata')
+    hidden = {}
+    more = []
+    for parent, leaves in nodes[folded].groupby('parent', sort=False):
+        more_id = parent + ID_SEPARATOR + MORE_SUFFIX
+        hidden[more_id] = {
+            'parent': parent,
+            'children': leaves[columns].values.tolist(),
+        }
+        node = {'id': more_id, 'parent': parent, 'label': f"{len(leaves)} more",
+                'value': leaves['value'].sum(), 'depth': leaves['depth'].iloc[0]}
+        if 'customdata' in nodes.columns:
+            node['customdata'] = ''
+        more.append(node)
+    sidecar = {'pageSize': max_leaves, 'more': hidden}
+    return pd.concat([nodes[~folded], pd.DataFrame(more)], ignore_index=True), sidecar
@@ -0,0 +1,184 @@
+"""
+Shared static assets for the interactive HTML visualizations.
+
+Each HTML visualization used to inline its own copy of the viewer code and
+styles, so every page (and every regeneration) re-shipped the same JavaScript
+and CSS and the browser could cache none of it. Here all viewers live in
+qualkit/static and are concatenated into one bundle, named after a hash of its
+content:
+
+    qualkit-assets/qualkit.<hash>.js
+    qualkit-assets/qualkit.<hash>.css
+
+The bundle is written once next to the pages by write_page (it is generated,
+so qualkit-assets/ is git-ignored); every page is a small shell that links it,
+carries its data as a JSON island and mounts its viewer:
+
+    write_page('visualizations/interactive_visualization.html', 'network', payload,
+               title='Cybersecurity Research Visualization', scripts=[D3_URL])
+
+A changed viewer gives a new hash, so a cached old bundle is never used with a
+new page. The data stays inline, so pages still open straight from disk.
+
+Pages that are checked in cannot link the ignored bundle, so they are written
+with inline=True and carry the bundle in <style>/<script> tags instead:
+
+    write_page('cybersecurity_visualization.html', 'board', payload, title, inline=True)
+"""
+import hashlib
+import json
+import os
+import re
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+ASSET_DIR = 'qualkit-assets'
+
+# Bundle contents in load order; core.js must come first
+JS_SOURCES = ['core.js', 'board.js', 'network.js', 'thememap.js']
+CSS_SOURCES = ['board.css', 'network.css', 'thememap.css']
+
+D3_URL = 'https://cdnjs.cloudflare.com/ajax/libs/d3/7.8.5/d3.min.js'
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+{css}{scripts}</head>
+<body class="qk-{viewer}">
+    <script id="qualkit-data" type="application/json">{data}</script>
+{js}    <script>{boot}</script>
+</body>
+</html>
+"""
+
+_bundle = None
+
+
+def _concatenate(names):
+    """Join static sources, each preceded by a comment naming it"""
+    parts = []
+    for name in names:
+        with open(os.path.join(STATIC_DIR, name), 'r', encoding='utf-8') as f:
+            parts.append('/* {} */\n{}'.format(name, f.read()))
+    return '\n'.join(parts)
+
+
+def get_bundle():
+    """
+    Build the JS and CSS bundles (once per process).
+
+    Returns:
+        dict: {'js': (file name, text), 'css': (file name, text)}
+    """
+    global _bundle
+    if _bundle is None:
+        js = _concatenate(JS_SOURCES)
+        css = _concatenate(CSS_SOURCES)
+        digest = hashlib.sha1((js + css).encode('utf-8')).hexdigest()[:10]
+        _bundle = {
+            'js': ('qualkit.{}.js'.format(digest), js),
+            'css': ('qualkit.{}.css'.format(digest), css),
+        }
+    return _bundle
+
+
+def install_bundle(out_dir):
+    """
+    Copy the bundle to out_dir/qualkit-assets unless it is already there.
+
+    Args:
+        out_dir (str): Directory the HTML pages are written to
+
+    Returns:
+        dict: {'js': path, 'css': path}, relative to out_dir
+    """
+    asset_dir = os.path.join(out_dir, ASSET_DIR)
+    os.makedirs(asset_dir, exist_ok=True)
+
+    paths = {}
+    for kind, (name, text) in get_bundle().items():
+        path = os.path.join(asset_dir, name)
+        # The name is a content hash, so an existing file is already up to date
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        paths[kind] = ASSET_DIR + '/' + name
+    return paths
+
+
+def render_page(viewer, payload, title, assets=None, scripts=(), boot=None):
+    """
+    Render the HTML shell of one page.
+
+    Args:
+        viewer (str): Name of the viewer in the bundle ('board', 'network', 'thememap')
+        payload (dict): Data handed to the viewer
+        title (str): Page title
+        assets (dict, optional): Bundle paths from install_bundle. If None, the
+                                 bundle is inlined and the page is self-contained.
+        scripts (iterable): Extra script URLs loaded before the bundle (e.g. D3)
+        boot (str, optional): Start-up script; mounts the viewer by default
+
+    Returns:
+        str: HTML document
+    """
+    # Compact JSON; '</' is escaped so a label can never close the script tag
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+    script_tags = ''.join('    <script src="{}"></script>\n'.format(url) for url in scripts)
+    if boot is None:
+        boot = "qualkit.mount('{}');".format(viewer)
+    if assets is None:
+        bundle = get_bundle()
+        css = '    <style>\n{}\n    </style>\n'.format(bundle['css'][1])
+        js = '    <script>\n{}\n    </script>\n'.format(bundle['js'][1].replace('</script', '<\\/script'))
+    else:
+        css = '    <link rel="stylesheet" href="{}">\n'.format(assets['css'])
+        js = '    <script src="{}"></script>\n'.format(assets['js'])
+    return PAGE_TEMPLATE.format(title=title, css=css, js=js,
+                                scripts=script_tags, viewer=viewer, data=data, boot=boot)
+
+
+def write_page(path, viewer, payload, title, scripts=(), inline=False):
+    """
+    Write an HTML page and make sure the shared bundle is next to it.
+
+    Args:
+        path (str): Output file
+        viewer (str): Name of the viewer in the bundle
+        payload (dict): Data handed to the viewer
+        title (str): Page title
+        scripts (iterable): Extra script URLs loaded before the bundle
+        inline (bool): Embed the bundle in the page instead of linking it, for
+                       pages that are checked in (qualkit-assets/ is not)
+
+    Returns:
+        str: path
+    """
+    assets = None if inline else install_bundle(os.path.dirname(os.path.abspath(path)))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_page(viewer, payload, title, assets, scripts))
+    return path
+
+
+def read_page(path):
+    """
+    Read back the viewer, title and payload of a page written by write_page.
+
+    Args:
+        path (str): HTML file
+
+    Returns:
+        tuple: (viewer, title, payload)
+
+    Raises:
+        ValueError: If the page has no qualkit data island
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    viewer = re.search(r'<body class="qk-(\w+)">', html)
+    title = re.search(r'<title>(.*?)</title>', html, re.S)
+    data = re.search(r'<script id="qualkit-data" type="application/json">(.*?)</script>', html, re.S)
+    if not (viewer and title and data):
+        raise ValueError('{} is not a qualkit page'.format(path))
+    return viewer.group(1), title.group(1), json.loads(data.group(1).replace('<\\/', '</'))
@@ -0,0 +1,202 @@
+"""
+Find many phrases in a text in one pass (Aho-Corasick).
+
+Checking a text against a list of phrases with `phrase in text` or one regex
+per phrase scans the text once per phrase. KeywordAutomaton compiles the
+phrases into a trie with failure links, so the text is scanned once however
+many phrases there are:
+
+    automaton = KeywordAutomaton({"let's move on to": 'break', 'next question': 'break'})
+    for start, end, value in automaton.finditer(text):
+        ...
+    automaton.search(text)     # first match or None
+    automaton.sub('', text)    # text with the phrases removed
+
+Matching ignores case and, by default, only reports whole words: 'so' does
+not match inside 'also'. A phrase ending in '+' may repeat its last letter
+any number of times, as in the regexes it replaces: 'um+' matches 'um',
+'umm' and 'ummmmmmmmmm'. The phrase is added to the trie without the '+';
+where it matches, the match is extended by scanning forward over every
+further repetition of the letter. The automaton itself still reads the text
+one character at a time, so phrases that overlap the repetitions (such as
+'mmm' in 'ummmm') are looked for as usual.
+"""
+from collections import deque
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def _lower(text):
+    """Lowercase text without changing its length (so match positions stay valid)"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. 'İ') lowercase to two; keep those as they are
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a set of phrases.
+
+    Args:
+        phrases (dict or iterable, optional): phrase -> value, or phrases that
+                                              are their own value
+        ignore_case (bool): Match regardless of case
+        whole_words (bool): Only report matches that start and end at word boundaries
+    """
+
+    def __init__(self, phrases=(), ignore_case=True, whole_words=True):
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+        # State 0 is the root; goto[state] maps a character to the next state
+        self._goto = [{}]
+        self._fail = [0]
+        # (phrase length, value, repeated letter or None) of every phrase that ends in a state
+        self._out = [[]]
+        self._all_out = [[]]
+        self._built = True
+        self.phrases = {}
+        items = phrases.items() if isinstance(phrases, dict) else ((p, p) for p in phrases)
+        for phrase, value in items:
+            self.add(phrase, value)
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def add(self, phrase, value=None):
+        """Add a phrase; value (the phrase itself by default) is reported with its matches"""
+        if not phrase:
+            return
+        value = phrase if value is None else value
+        key = _lower(phrase) if self.ignore_case else phrase
+        self.phrases[key] = value
+        repeat = None
+        if key.endswith('+') and len(key) > 1:
+            # 'um+' is stored as 'um'; its matches are extended over further 'm's
+            key, repeat = key[:-1], key[-2]
+        state = 0
+        for char in key:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        # A phrase added twice keeps its last value
+        self._out[state] = ([item for item in self._out[state] if item[0::2] != (len(key), repeat)]
+                            + [(len(key), value, repeat)])
+        self._built = False
+
+    def _build(self):
+        """Compute the failure links breadth-first and merge the outputs along them"""
+        fail = self._fail
+        queue = deque()
+        for nxt in self._goto[0].values():
+            fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(char, 0)
+        # Outputs of the suffix states, so matching never follows failure links for output
+        self._all_out = [list(out) for out in self._out]
+        queue.extend(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if fail[state]:
+                self._all_out[state] = self._all_out[state] + self._all_out[fail[state]]
+            queue.extend(self._goto[state].values())
+        self._built = True
+
+    def finditer(self, text):
+        """
+        Find all (possibly overlapping) occurrences of the phrases.
+
+        Args:
+            text (str): Text to search
+
+        Yields:
+            tuple: (start, end, value) in order of the end of the phrase; a
+                   '+' phrase ends after the last repetition of its letter
+        """
+        if not self._built:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._all_out
+        haystack = _lower(text) if self.ignore_case else text
+        whole_words = self.whole_words
+        state = 0
+        for i, char in enumerate(haystack):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            for length, value, repeat in out[state]:
+                end = i + 1
+                start = end - length
+                if repeat is not None:
+                    # Extend the match over the repetitions that follow; the
+                    # automaton goes on from i + 1 as usual
+                    while end < len(haystack) and haystack[end] == repeat:
+                        end += 1
+                if whole_words and ((start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]))
+                                    or (end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]))):
+                    continue
+                yield start, end, value
+
+    def findall(self, text):
+        """All matches as a list of (start, end, value)"""
+        return list(self.finditer(text))
+
+    def search(self, text):
+        """The first match (by end position) as (start, end, value), or None"""
+        return next(self.finditer(text), None)
+
+    def sub(self, repl, text):
+        """
+        Replace the phrases in a text, like re.sub with all phrases as alternatives.
+
+        Overlapping matches are resolved leftmost first, then longest first.
+
+        Args:
+            repl (str): Replacement of every match
+            text (str): Text to change
+
+        Returns:
+            str: The text with every selected match replaced by repl
+        """
+        matches = sorted(((start, -end) for start, end, _ in self.finditer(text)))
+        if not matches:
+            return text
+        pieces = []
+        position = 0
+        for start, end in matches:
+            end = -end
+            if start < position:
+                continue
+            pieces.append(text[position:start])
+            pieces.append(repl)
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+    def count(self, text):
+        """
+        Number of matches of each value.
+
+        Returns:
+            dict: value -> count
+        """
+        counts = {}
+        for _, _, value in self.finditer(text):
+            counts[value] = counts.get(value, 0) + 1
+        return counts
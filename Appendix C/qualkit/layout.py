@@ -0,0 +1,425 @@
+"""
+Deterministic, collision-free layout for affinity diagrams.
+
+The affinity scripts used to place notes on a staggered grid with random jitter
+and relied on a very large canvas to keep the labels apart. The layout here
+works in points instead: every note is sized from the measured extent of its
+text, notes are shelf-packed into a compact block per cluster, and the cluster
+blocks are arranged on a circle and pushed apart until no two overlap. Each
+pass finds the overlapping blocks with one vectorized sort-and-sweep, so only
+blocks whose x ranges meet are compared.
+
+Because everything is measured in points, a figure of
+(width / 72, height / 72) inches whose axes span the layout bounds draws one
+data unit as exactly one point, and the text fits its note at any dpi:
+
+    layout = pack_clusters(headers, notes)
+    xmin, ymin, xmax, ymax = layout['bounds']
+    fig = new_figure(figsize=((xmax - xmin) / 72, (ymax - ymin) / 72))
+
+The same input and seed always produce the same layout.
+
+Labels are fitted to a width in points, not to a number of characters:
+wrap_label and truncate_label add up glyph advance widths that are read from
+the font file once per font (and scaled to any size), so thousands of labels
+are wrapped or shortened without drawing or measuring each one:
+
+    text = truncate_label(label, 180, fontsize=9)
+    title = wrap_label(rq_title, 400, fontsize=12, fontweight='bold')
+"""
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from matplotlib.ft2font import LOAD_NO_HINTING
+from matplotlib.textpath import TextToPath
+
+# Default seed, only used to break ties between boxes with identical centres
+LAYOUT_SEED = 0
+# Extra separation of overlapping boxes in remove_overlaps, relative to the smallest box
+MARGIN = 0.1
+# remove_overlaps spreads out piles of boxes to this many times their area
+SPREAD = 1.2
+# Number of nearest boxes next to which remove_overlaps tries to put a stuck box
+NEIGHBOURS = 50
+
+_text_to_path = TextToPath()
+
+
+@lru_cache(maxsize=4096)
+def measure_text(text, fontsize, fontweight='normal', linespacing=1.2):
+    """
+    Measure the extent of a (possibly multi-line) label without a renderer.
+
+    Args:
+        text (str): Label text; lines are separated by '\\n'
+        fontsize (float): Font size in points
+        fontweight (str): Font weight, e.g. 'normal' or 'bold'
+        linespacing (float): Line spacing as a multiple of the font size
+
+    Returns:
+        tuple: (width, height) in points
+    """
+    prop = FontProperties(size=fontsize, weight=fontweight)
+    lines = text.split('\n')
+    width = 0.0
+    for line in lines:
+        if line:
+            w, _, _ = _text_to_path.get_text_width_height_descent(line, prop, ismath=False)
+            width = max(width, w)
+    height = fontsize * (1 + linespacing * (len(lines) - 1))
+    return width, height
+
+
+# Glyph widths are read at this size and scaled; unhinted outlines scale linearly
+_METRICS_SIZE = 100.0
+
+
+class _GlyphWidths:
+    """Advance widths of the glyphs of one font, in points at a size of 1 pt"""
+
+    def __init__(self, path):
+        self.path = path
+        self.widths = {}
+
+    def width(self, char):
+        w = self.widths.get(char)
+        if w is None:
+            font = get_font(self.path)
+            # The font object is shared with matplotlib, so set the size every time
+            font.set_size(_METRICS_SIZE, 72)
+            glyph = font.load_char(ord(char), flags=LOAD_NO_HINTING)
+            w = self.widths[char] = glyph.linearHoriAdvance / 65536 / _METRICS_SIZE
+        return w
+
+
+@lru_cache(maxsize=None)
+def _glyph_widths(fontweight):
+    return _GlyphWidths(findfont(FontProperties(weight=fontweight)))
+
+
+def text_width(text, fontsize, fontweight='normal'):
+    """
+    Width of a single line of text from cached glyph widths.
+
+    Kerning is ignored, which makes this a little wider than measure_text
+    (well under 1% for ordinary labels).
+
+    Args:
+        text (str): One line of text
+        fontsize (float): Font size in points
+        fontweight (str): Font weight, e.g. 'normal' or 'bold'
+
+    Returns:
+        float: Width in points
+    """
+    glyphs = _glyph_widths(fontweight)
+    return fontsize * sum(glyphs.width(c) for c in text)
+
+
+def wrap_label(text, max_width, fontsize, fontweight='normal'):
+    """
+    Break a label into lines no wider than max_width, at spaces.
+
+    A single word wider than max_width gets a line of its own.
+
+    Args:
+        text (str): Label text
+        max_width (float): Line width in points
+        fontsize (float): Font size in points
+        fontweight (str): Font weight
+
+    Returns:
+        str: The label with lines separated by '\\n'
+    """
+    space = text_width(' ', fontsize, fontweight)
+    lines, line, used = [], [], 0.0
+    for word in text.split():
+        w = text_width(word, fontsize, fontweight)
+        if line and used + space + w > max_width:
+            lines.append(' '.join(line))
+            line, used = [], 0.0
+        used += (space if line else 0.0) + w
+        line.append(word)
+    if line:
+        lines.append(' '.join(line))
+    return '\n'.join(lines)
+
+
+def truncate_label(text, max_width, fontsize, fontweight='normal', ellipsis='...'):
+    """
+    Shorten a label to max_width, ending it with an ellipsis if it was cut.
+
+    Args:
+        text (str): One line of text
+        max_width (float): Width in points
+        fontsize (float): Font size in points
+        fontweight (str): Font weight
+        ellipsis (str): Appended to a shortened label
+
+    Returns:
+        str: text if it fits, otherwise its longest prefix that fits with the ellipsis
+    """
+    glyphs = _glyph_widths(fontweight)
+    ends = np.cumsum([fontsize * glyphs.width(c) for c in text])
+    if not len(ends) or ends[-1] <= max_width:
+        return text
+    room = max_width - text_width(ellipsis, fontsize, fontweight)
+    keep = int(np.searchsorted(ends, room, side='right'))
+    return text[:keep].rstrip() + ellipsis
+
+
+def pack_rectangles(sizes, gap=4.0, aspect=1.6, min_width=0.0):
+    """
+    Shelf-pack rectangles into rows, keeping their order.
+
+    Args:
+        sizes (list): (width, height) of each rectangle
+        gap (float): Space between neighbouring rectangles
+        aspect (float): Target width / height ratio of the packed block
+        min_width (float): Rows may always be at least this wide, e.g. the
+                           width of a header drawn above the block
+
+    Returns:
+        tuple: (centres, (block_width, block_height)) where centres are the
+               rectangle centres relative to the centre of the block
+    """
+    if not sizes:
+        return [], (0.0, 0.0)
+
+    # Aim for a row width that gives the block roughly the requested aspect ratio
+    area = sum((w + gap) * (h + gap) for w, h in sizes)
+    row_width = max(np.sqrt(area * aspect), max(w for w, _ in sizes), min_width)
+
+    rows = [[]]
+    used = 0.0
+    for index, (w, h) in enumerate(sizes):
+        if rows[-1] and used + gap + w > row_width:
+            rows.append([])
+            used = 0.0
+        used += (gap if rows[-1] else 0.0) + w
+        rows[-1].append(index)
+
+    row_widths = [sum(sizes[i][0] for i in row) + gap * (len(row) - 1) for row in rows]
+    row_heights = [max(sizes[i][1] for i in row) for row in rows]
+    block_width = max(row_widths)
+    block_height = sum(row_heights) + gap * (len(rows) - 1)
+
+    centres = [None] * len(sizes)
+    top = block_height / 2
+    for row, row_w, row_h in zip(rows, row_widths, row_heights):
+        # Centre each row horizontally
+        x = -row_w / 2
+        y = top - row_h / 2
+        for i in row:
+            w = sizes[i][0]
+            centres[i] = (x + w / 2, y)
+            x += w + gap
+        top -= row_h + gap
+
+    return centres, (block_width, block_height)
+
+
+def _overlapping_pairs(pos, half):
+    """
+    Index arrays (i, j) of all pairs of boxes that overlap.
+
+    Sort and sweep along x: after sorting by left edge, the boxes whose x
+    range can overlap box a are the ones that follow it up to its right edge,
+    so the candidates come from one searchsorted instead of comparing all pairs.
+    """
+    n = len(pos)
+    left = pos[:, 0] - half[:, 0]
+    order = np.argsort(left, kind='stable')
+    ends = np.searchsorted(left[order], (pos[:, 0] + half[:, 0])[order], side='left')
+    counts = np.maximum(ends - np.arange(n) - 1, 0)
+    a = np.repeat(np.arange(n), counts)
+    b = a + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    i, j = order[a], order[b]
+    overlap = half[i] + half[j] - np.abs(pos[j] - pos[i])
+    keep = (overlap > 0).all(axis=1)
+    return i[keep], j[keep]
+
+
+def _place_clear(pos, half, stuck, margin):
+    """
+    Move each stuck box to the nearest clear place: where it is, or touching
+    one of its nearest neighbours on any side. Boxes with no clear place
+    nearby are shelf-packed into a block beside the layout.
+    """
+    placed = np.ones(len(pos), dtype=bool)
+    placed[stuck] = False
+    homeless = []
+    for b in stuck:
+        others = np.flatnonzero(placed)
+        distance = np.abs(pos[others] - pos[b]).max(axis=1)
+        near = others[np.argsort(distance, kind='stable')[:NEIGHBOURS]]
+        candidates = [pos[b][None, :]]
+        for axis in (0, 1):
+            for side in (-1, 1):
+                beside = np.repeat(pos[b][None, :], len(near), axis=0)
+                beside[:, axis] = pos[near, axis] + side * (half[near, axis] + half[b, axis] + margin)
+                candidates.append(beside)
+        candidates = np.concatenate(candidates)
+        # Only boxes within reach of some candidate can block it
+        lo = candidates.min(axis=0) - half[b]
+        hi = candidates.max(axis=0) + half[b]
+        window = others[((pos[others] + half[others] > lo) & (pos[others] - half[others] < hi)).all(axis=1)]
+        reach = half[window] + half[b]
+        hits = (np.abs(candidates[:, None, :] - pos[window][None, :, :]) < reach[None, :, :]).all(axis=2)
+        clear = candidates[~hits.any(axis=1)]
+        if len(clear):
+            pos[b] = clear[np.argmin(np.abs(clear - pos[b]).sum(axis=1))]
+            placed[b] = True
+        else:
+            homeless.append(b)
+
+    if homeless:
+        block, (block_w, _) = pack_rectangles([tuple(2 * half[b]) for b in homeless], gap=margin)
+        right = (pos[placed, 0] + half[placed, 0]).max() + margin
+        pos[homeless] = np.array(block) + (right + block_w / 2, pos[placed, 1].mean())
+    return pos
+
+
+def remove_overlaps(centres, sizes, gap=0.0, max_iterations=500, seed=LAYOUT_SEED):
+    """
+    Push axis-aligned boxes apart until none of them overlap.
+
+    In each pass, every overlapping pair is separated along the axis of least
+    penetration, each box moving half the distance (plus a small margin); the
+    moves of all pairs are summed at once. Overlapping pairs are found by a
+    sort-and-sweep along x. Boxes whose centres span less area than the boxes
+    themselves are spread out around their centre first, as they could only jam.
+
+    Crowded piles can still push each other back and forth without settling.
+    Boxes that overlap after max_iterations passes are put, one at a time, in
+    the nearest place clear of all others (or, failing that, packed with
+    pack_rectangles into a block beside the layout), so the result never has
+    overlaps.
+
+    Args:
+        centres (list): (x, y) starting centre of each box
+        sizes (list): (width, height) of each box
+        gap (float): Minimum clearance between boxes
+        max_iterations (int): Upper bound on the number of passes
+        seed (int): Seed for the direction in which boxes with identical
+                    centres are separated
+
+    Returns:
+        numpy.ndarray: (n, 2) array of box centres
+    """
+    pos = np.array(centres, dtype=float).reshape(-1, 2)
+    half = (np.array(sizes, dtype=float).reshape(-1, 2) + gap) / 2
+    n = len(pos)
+    if n < 2:
+        return pos
+
+    # Boxes with more area than their bounding box must overlap; such a pile
+    # is spread out around its centre first, to SPREAD times that area
+    bounds = np.ptp(np.concatenate((pos - half, pos + half)), axis=0)
+    crowding = (4 * half.prod(axis=1)).sum() / max(bounds.prod(), 1e-9)
+    if crowding > 1:
+        centre = pos.mean(axis=0)
+        pos = centre + (pos - centre) * np.sqrt(SPREAD * crowding)
+
+    rng = np.random.default_rng(seed)
+    # Pairs are pushed a little further than needed, so that a crowded pile
+    # does not creep apart by ever smaller amounts
+    margin = MARGIN * half.min()
+    for _ in range(max_iterations):
+        i, j = _overlapping_pairs(pos, half)
+        if not len(i):
+            return pos
+
+        delta = pos[j] - pos[i]
+        overlap = half[i] + half[j] - np.abs(delta)
+        pair = np.arange(len(i))
+        axis = (overlap[:, 0] >= overlap[:, 1]).astype(int)
+        direction = np.sign(delta[pair, axis])
+        ties = direction == 0
+        direction[ties] = rng.choice((-1.0, 1.0), size=ties.sum())
+        shift = direction * (overlap[pair, axis] + margin) / 2
+        step = np.zeros_like(pos)
+        np.add.at(step, (i, axis), -shift)
+        np.add.at(step, (j, axis), shift)
+        pos += step
+
+    i, j = _overlapping_pairs(pos, half)
+    if len(i):
+        # Keep the boxes that are clear, move the rest out of their way
+        stuck = np.unique(np.concatenate((i, j)))
+        pos = _place_clear(pos, half, stuck, margin)
+    return pos
+
+
+def pack_clusters(headers, notes, note_gap=6.0, cluster_gap=36.0, compaction_rounds=10,
+                  seed=LAYOUT_SEED, start=None):
+    """
+    Lay out clusters of notes, each under its own header, without overlaps.
+
+    Args:
+        headers (dict): cluster -> (width, height) of its header label
+        notes (dict): cluster -> list of (width, height) of its notes
+        note_gap (float): Space between notes and below the header
+        cluster_gap (float): Minimum space between cluster blocks
+        compaction_rounds (int): Number of separate-then-contract rounds
+        seed (int): Seed passed to remove_overlaps
+        start (dict, optional): cluster -> block centre from an earlier run.
+                                When given, those blocks start where they were
+                                and are only moved as far as needed to clear
+                                any overlaps, so the diagram stays stable.
+
+    Returns:
+        dict: 'headers' (cluster -> header centre), 'notes' (cluster -> list
+              of note centres), 'blocks' (cluster -> block centre, to pass as
+              start next time) and 'bounds' (xmin, ymin, xmax, ymax), all in
+              the same units as the sizes
+    """
+    clusters = list(headers)
+    blocks = []
+    for cluster in clusters:
+        header_w, header_h = headers[cluster]
+        centres, (notes_w, notes_h) = pack_rectangles(notes.get(cluster, []), gap=note_gap,
+                                                      min_width=header_w)
+        block_w = max(header_w, notes_w)
+        block_h = header_h + (note_gap + notes_h if centres else 0.0)
+        blocks.append((centres, header_h, notes_h, (block_w, block_h)))
+
+    sizes = [block[3] for block in blocks]
+
+    # Start the blocks on a circle that is too small to hold them, so overlap
+    # removal spreads them into a compact arrangement instead of a ring
+    perimeter = sum(max(w, h) + cluster_gap for w, h in sizes)
+    radius = 0.35 * perimeter / (2 * np.pi) if len(clusters) > 1 else 0.0
+    angles = 2 * np.pi * np.arange(len(clusters)) / max(len(clusters), 1)
+    positions = np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+    # Warm start: reuse the block centres of an earlier layout
+    start = start or {}
+    for i, cluster in enumerate(clusters):
+        if cluster in start:
+            positions[i] = start[cluster]
+    if any(cluster in start for cluster in clusters):
+        compaction_rounds = 0
+
+    # Alternate separation with a pull towards the centre to close the gaps
+    # that separation leaves behind
+    for _ in range(compaction_rounds):
+        positions = remove_overlaps(positions, sizes, gap=cluster_gap, seed=seed)
+        positions *= 0.9
+    positions = remove_overlaps(positions, sizes, gap=cluster_gap, seed=seed)
+
+    layout = {'headers': {}, 'notes': {}, 'blocks': {}}
+    for cluster, (bx, by), (centres, header_h, notes_h, (block_w, block_h)) in zip(clusters, positions, blocks):
+        top = by + block_h / 2
+        layout['headers'][cluster] = (bx, top - header_h / 2)
+        notes_cy = by - block_h / 2 + notes_h / 2
+        layout['notes'][cluster] = [(bx + x, notes_cy + y) for x, y in centres]
+        layout['blocks'][cluster] = (float(bx), float(by))
+
+    sizes = np.array(sizes).reshape(-1, 2)
+    margin = cluster_gap / 2
+    xmin, ymin = (positions - sizes / 2).min(axis=0) - margin
+    xmax, ymax = (positions + sizes / 2).max(axis=0) + margin
+    layout['bounds'] = (float(xmin), float(ymin), float(xmax), float(ymax))
+    return layout
@@ -0,0 +1,148 @@
+"""
+Persistent node positions, so figures keep their layout between runs.
+
+Positions are stored in layout_cache.json in the user's cache directory
+($XDG_CACHE_HOME/qualkit, by default ~/.cache/qualkit, next to the palette),
+in one section per figure and keyed by node name. On the next run the stored
+positions are reused and only nodes that were not seen before are placed, so
+adding a code or a theme no longer reshuffles the whole figure and the layout
+work is proportional to what changed:
+
+    known = load_layout('code_theme_network')
+    pos = force_layout(G, pos=known, fixed=known)   # only new nodes move
+    save_layout('code_theme_network', pos)
+
+For layouts that are cheap to compute, cached_layout merges in one step:
+
+    participant_pos = cached_layout('theme_network/participants', participant_pos)
+
+Set QUALKIT_LAYOUT_CACHE to another file to use a different cache, or to
+"off" to disable caching. Delete the file to start from fresh layouts.
+
+As with the palette, the file is rewritten under a lock after merging in what
+other processes stored, and replaced atomically, so scripts run in parallel
+neither lose each other's positions nor leave a half-written file.
+"""
+import json
+import math
+import os
+
+from .palette import _locked, user_cache_dir
+
+LAYOUT_CACHE_ENV = 'QUALKIT_LAYOUT_CACHE'
+CACHE_NAME = 'layout_cache.json'
+
+
+def get_cache_path():
+    """Return the path of the layout cache, or None if caching is switched off"""
+    path = os.environ.get(LAYOUT_CACHE_ENV)
+    if path is None:
+        return os.path.join(user_cache_dir(), CACHE_NAME)
+    path = path.strip()
+    if path.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    return path
+
+
+def _read_cache(path):
+    """Read the whole cache file; a missing or unreadable file is an empty cache"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_layout(name):
+    """
+    Load the stored positions of one figure.
+
+    Args:
+        name (str): Name of the figure's section in the cache
+
+    Returns:
+        dict: node name -> (x, y); empty if nothing is stored
+    """
+    path = get_cache_path()
+    if path is None:
+        return {}
+    section = _read_cache(path).get(name, {})
+    return {node: tuple(xy) for node, xy in section.items()}
+
+
+def save_layout(name, positions):
+    """
+    Store positions of one figure, keeping those of nodes not in positions.
+
+    Args:
+        name (str): Name of the figure's section in the cache
+        positions (dict): node -> (x, y)
+    """
+    path = get_cache_path()
+    if path is None:
+        return
+    with _locked(path):
+        # Read under the lock, so sections other processes stored are kept
+        cache = _read_cache(path)
+        section = cache.setdefault(name, {})
+        for node, (x, y) in positions.items():
+            section[str(node)] = [float(x), float(y)]
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'w') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(temp, path)
+
+
+def _free_slot(target, slots, taken, gap):
+    """
+    The slot nearest to target that no taken position is within gap of.
+
+    If every slot is taken, target is moved outwards in steps of gap until it is free.
+    """
+    def free(xy):
+        return all(math.dist(xy, other) >= gap for other in taken)
+
+    for slot in sorted(slots, key=lambda xy: math.dist(xy, target)):
+        if free(slot):
+            return slot
+    x, y = target
+    step = 1
+    while not free((x + step * gap, y)):
+        step += 1
+    return (x + step * gap, y)
+
+
+def cached_layout(name, positions):
+    """
+    Replace freshly computed positions with stored ones where available.
+
+    Known nodes keep their stored positions. The computed positions of this
+    run are the slots of the layout; every new node goes to the free slot
+    nearest its own computed position, so it never lands on a known node.
+
+    Args:
+        name (str): Name of the figure's section in the cache
+        positions (dict): node -> (x, y) as computed in this run
+
+    Returns:
+        dict: node -> (x, y), with stored positions for known nodes and free
+              slots for new nodes; no two nodes share a position
+    """
+    known = load_layout(name)
+    merged = {node: tuple(known[str(node)]) for node in positions if str(node) in known}
+    new = [node for node in positions if str(node) not in known]
+    if not new:
+        return merged
+
+    slots = [tuple(map(float, xy)) for xy in positions.values()]
+    # Positions closer than half the smallest distance between slots count as the same
+    distances = [math.dist(a, b) for i, a in enumerate(slots) for b in slots[i + 1:] if math.dist(a, b) > 0]
+    gap = min(distances) / 2 if distances else 1.0
+    taken = list(merged.values())
+    for node in new:
+        slot = _free_slot(tuple(map(float, positions[node])), slots, taken, gap)
+        merged[node] = slot
+        taken.append(slot)
+    save_layout(name, merged)
+    # In the order of positions, as the callers built them
+    return {node: merged[node] for node in positions}
@@ -0,0 +1,197 @@
+"""
+One colour per cluster, theme or participant, shared by every figure.
+
+Each script used to build its own colour map (tab20 sampled over the number of
+clusters, a hand-picked list repeated until long enough, evenly spaced HLS
+hues, ...), so the same cluster had a different colour in every figure and
+the maps were rebuilt in every function. Here a name gets its colour once and
+keeps it: colours are stored in a palette file, in one section per kind of
+name, and loaded once per process:
+
+    cluster_colors = get_colors(unique_clusters, 'clusters')    # name -> '#rrggbb'
+    theme_colors = get_rgba(unique_themes, 'themes')            # name -> (r, g, b, a)
+
+A new name takes the first colour of PALETTE (then generated hues) that is not
+used yet in its section, so adding a cluster never recolours the others.
+
+The study's colours are committed as palette.json in the Appendix C folder and
+read as the starting point. Colours given to new names are stored in the user's
+cache directory ($XDG_CACHE_HOME/qualkit/palette.json, by default
+~/.cache/qualkit/palette.json), so running the scripts does not change the
+repository. To share new colours, copy that file over Appendix C/palette.json
+and commit it, or run the scripts once with QUALKIT_PALETTE pointing at
+Appendix C/palette.json. Set QUALKIT_PALETTE to another file, or to "off" to
+keep new colours in memory only.
+
+The file is rewritten under a lock, after merging in what other processes
+stored since it was read, and replaced atomically, so scripts run in parallel
+neither lose each other's colours nor leave a half-written file.
+"""
+import json
+import os
+from colorsys import hls_to_rgb
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+PALETTE_ENV = 'QUALKIT_PALETTE'
+# The study's colours, committed with the repository
+SHARED_PALETTE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'palette.json')
+
+# The colourful but professional palette of the scripts (tab10 + its light variants)
+PALETTE = [
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
+    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5",
+    "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5",
+]
+
+_sections = None
+
+
+def user_cache_dir():
+    """qualkit's directory in the user's cache directory, outside the repository"""
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_dir, 'qualkit')
+
+
+def default_palette_path():
+    """palette.json in the user's cache directory, outside the repository"""
+    return os.path.join(user_cache_dir(), 'palette.json')
+
+
+def get_palette_path():
+    """Return the path new colours are stored in, or None if storing is switched off"""
+    path = os.environ.get(PALETTE_ENV)
+    if path is None:
+        return default_palette_path()
+    path = path.strip()
+    if path.lower() in ('', 'off', '0', 'none'):
+        return None
+    return path
+
+
+def _read(path):
+    """Sections of a palette file; a missing file is empty"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        # A broken palette only costs the stored colours
+        print(f"Ignoring palette {path}: {e}")
+        return {}
+
+
+def _merge(sections, other):
+    """Add the colours of other to sections, keeping those already there"""
+    for kind, colors in other.items():
+        section = sections.setdefault(kind, {})
+        used = set(section.values())
+        for name, color in colors.items():
+            # A colour another name already has is left out; the name gets a new one
+            if name not in section and color not in used:
+                section[name] = color
+                used.add(color)
+    return sections
+
+
+def _load():
+    """Sections of the shared palette and the stored colours, read once per process"""
+    global _sections
+    if _sections is None:
+        _sections = _merge(_read(SHARED_PALETTE), _read(get_palette_path()))
+    return _sections
+
+
+@contextmanager
+def _locked(path):
+    """Hold an exclusive lock on path + '.lock' (nothing if path is None)"""
+    if path is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.lock', 'a+') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write(path, sections):
+    """Replace the palette file in one step, so readers never see half of it"""
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'w') as f:
+        json.dump(sections, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+
+
+def _color_sequence():
+    """PALETTE, followed by golden-ratio spaced hues for as long as needed"""
+    for color in PALETTE:
+        yield color
+    i = 0
+    while True:
+        rgb = hls_to_rgb((i * 0.618033988749895) % 1, 0.5, 0.65)
+        yield '#%02x%02x%02x' % tuple(int(round(c * 255)) for c in rgb)
+        i += 1
+
+
+def get_colors(names, kind='clusters'):
+    """
+    Colours of some names, assigning (and storing) colours for new names.
+
+    Args:
+        names (iterable): Cluster, theme, ... names
+        kind (str): Section of the palette ('clusters', 'themes', 'participants', ...)
+
+    Returns:
+        dict: name -> hex colour, in the order of names
+    """
+    names = list(dict.fromkeys(str(name) for name in names))
+    sections = _load()
+    if any(name not in sections.get(kind, {}) for name in names):
+        path = get_palette_path()
+        with _locked(path):
+            # Another process may have stored colours since the file was read
+            _merge(sections, _read(path))
+            section = sections.setdefault(kind, {})
+            used = set(section.values())
+            free = (color for color in _color_sequence() if color not in used)
+            for name in sorted(name for name in names if name not in section):
+                section[name] = next(free)
+            if path:
+                _write(path, sections)
+    section = sections.get(kind, {})
+    return {name: section[name] for name in names}
+
+
+def get_color(name, kind='clusters'):
+    """Colour of one name (see get_colors)"""
+    return get_colors([name], kind)[str(name)]
+
+
+def to_rgba(color, alpha=1.0):
+    """Convert '#rrggbb' to an (r, g, b, a) tuple of floats, as matplotlib colour maps give"""
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4)) + (alpha,)
+
+
+def get_rgba(names, kind='clusters'):
+    """Like get_colors, with (r, g, b, a) tuples for code that mixes colour channels"""
+    return {name: to_rgba(color) for name, color in get_colors(names, kind).items()}
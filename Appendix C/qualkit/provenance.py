@@ -0,0 +1,467 @@
+"""
+Where the quotes of the affinity structures come from in the transcripts.
+
+The sunburst scripts (main.py, ad.py, ad1.py) hold paraphrased quotes such as
+"P3: Denmark has moved to digital electoral rolls...", with nothing that leads
+back to the transcript they were taken from. The provenance store records,
+for every quote, the place in a transcript it was anchored to:
+
+    node  codebook  category  code  quote  participant  transcript  paragraph  start  end  anchor  score  method
+
+node is the id of the quote's leaf in the sunburst (see flatten_hierarchy),
+transcript the transcript id ('P7-1' for P7-1--edited.docx and its cleaned
+version), paragraph the index of the Word paragraph, start:end the character
+span in it and anchor the text of that span when it was anchored. The
+participant prefixes of the quotes do not follow the numbering of the
+transcript files, so quotes are looked for in all transcripts.
+
+Quotes are anchored in two steps. A fragment of the quote that occurs
+verbatim (between '...') is found by one Aho-Corasick pass over every
+transcript (method 'exact'). Other quotes are paraphrases: all quotes are
+scored against all paragraphs with TF-IDF in one sparse product, and the
+best sentence of the best paragraph becomes the anchor (method 'similar',
+score its cosine similarity).
+
+ProvenanceStore keeps dict and sorted-list indexes over the records, so that
+looking up a node (or all quotes under a theme), a code, a quote or a
+transcript paragraph does not scan the table:
+
+    store = load_store()
+    store.lookup(node_id)            # records of a leaf, or of every leaf under a theme
+    store.source(record, paths)      # the paragraph, with the anchored span marked
+    store.verify(paths)              # does every anchor still hold after re-cleaning?
+
+Anchors that no longer hold are found again by fuzzy alignment, see qualkit/align.py.
+
+From the command line:
+
+    python -m qualkit.provenance --out provenance.csv            # anchor the quotes of main.py
+    python -m qualkit.provenance --verify P*_cleaned.docx       # check them against new transcripts
+    python -m qualkit.provenance --show "electoral rolls"
+
+Needs scikit-learn and python-docx.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from qualkit.hierarchy import ID_SEPARATOR, flatten_hierarchy, hierarchy_frame
+from qualkit.keywords import KeywordAutomaton
+from qualkit.suggest import APPENDIX_DIR, QUOTE_PREFIX, _affinity_structure, _transcript_lines, analyze
+
+STORE_ENV = 'QUALKIT_PROVENANCE'
+STORE_NAME = 'provenance.csv'
+
+DEFAULT_SCRIPTS = [os.path.join(APPENDIX_DIR, 'Qualitative Analysis Visualisations - Main', 'main.py')]
+DEFAULT_TRANSCRIPTS = os.path.join(APPENDIX_DIR, 'Interview Processing ', '*--edited.docx')
+# Levels of the affinity structures, as in main.py
+LEVELS = ['category', 'subcategory', 'quote']
+
+COLUMNS = ['node', 'codebook', 'category', 'code', 'quote', 'participant', 'transcript',
+           'paragraph', 'start', 'end', 'anchor', 'score', 'method']
+# Verbatim fragments shorter than this are too common to anchor a quote
+MIN_FRAGMENT = 16
+# Fragments of a quote: the text between '...' and sentence ends
+FRAGMENT_SPLIT = re.compile(r'\.\.\.|…|(?<=[.!?;])\s+')
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]*')
+PARTICIPANT_PATTERN = re.compile(r'^(P\d+|PV\d+|F\d+):')
+
+
+def transcript_id(path):
+    """Id of a transcript file: 'P7-1--edited.docx' -> 'P7-1' (as in Processing.py)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'(--edited|_cleaned)+$', '', name)
+
+
+def read_transcripts(paths):
+    """
+    Paragraphs of several transcripts.
+
+    Args:
+        paths (list): Transcript files (.docx or text)
+
+    Returns:
+        dict: transcript id -> list of paragraph texts
+    """
+    return {transcript_id(path): _transcript_lines(path) for path in paths}
+
+
+def read_quotes(scripts=None):
+    """
+    The quotes of some sunburst scripts, with the node ids of their leaves.
+
+    Args:
+        scripts (list, optional): Scripts with an affinity_structure; main.py by default
+
+    Returns:
+        pandas.DataFrame: Columns node, codebook, category, code, quote and participant
+    """
+    frames = []
+    for path in scripts or DEFAULT_SCRIPTS:
+        rows = hierarchy_frame(_affinity_structure(path), LEVELS)
+        nodes = flatten_hierarchy(rows, LEVELS)
+        # Leaves come last in the node table, in the order of the rows
+        leaves = nodes[nodes['depth'] == len(LEVELS) - 1]
+        frames.append(pd.DataFrame({
+            'node': leaves['id'].values,
+            'codebook': os.path.basename(path),
+            'category': rows['category'].values,
+            'code': rows['subcategory'].values,
+            'quote': rows['quote'].values,
+        }))
+    quotes = pd.concat(frames, ignore_index=True)
+    quotes['participant'] = quotes['quote'].str.extract(PARTICIPANT_PATTERN, expand=False).fillna('')
+    return quotes
+
+
+def _fragments(quote):
+    """Fragments of a quote that may occur verbatim in a transcript, longest first"""
+    body = QUOTE_PREFIX.sub('', quote)
+    fragments = [f.strip(' .,;:"\'') for f in FRAGMENT_SPLIT.split(body)]
+    return sorted({f for f in fragments if len(f) >= MIN_FRAGMENT}, key=len, reverse=True)
+
+
+def _paragraph_table(transcripts):
+    """One row per non-empty paragraph: (transcript, paragraph index, text)"""
+    return [(transcript, i, text) for transcript, paragraphs in transcripts.items()
+            for i, text in enumerate(paragraphs) if text.strip()]
+
+
+def anchor_exact(quotes, transcripts):
+    """
+    Anchor quotes with a fragment that occurs verbatim in a transcript.
+
+    All fragments of all quotes go into one automaton, so every paragraph is
+    read once however many quotes there are.
+
+    Returns:
+        dict: row of quotes -> (transcript, paragraph, start, end, anchor)
+    """
+    owners = {}
+    for row, quote in enumerate(quotes['quote']):
+        for fragment in _fragments(quote):
+            owners.setdefault(fragment.lower(), []).append(row)
+    automaton = KeywordAutomaton({fragment: fragment for fragment in owners})
+    anchors = {}
+    for transcript, paragraph, text in _paragraph_table(transcripts):
+        for start, end, fragment in automaton.finditer(text):
+            for row in owners[fragment]:
+                # The longest fragment wins; the first occurrence among equals
+                if row not in anchors or end - start > anchors[row][3] - anchors[row][2]:
+                    anchors[row] = (transcript, paragraph, start, end, text[start:end])
+    return anchors
+
+
+def anchor_similar(quotes, transcripts):
+    """
+    Anchor quotes to the most similar sentence of the most similar paragraph.
+
+    Returns:
+        dict: row of quotes -> (transcript, paragraph, start, end, anchor, score)
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    table = _paragraph_table(transcripts)
+    if not table or quotes.empty:
+        return {}
+    bodies = [QUOTE_PREFIX.sub('', quote) for quote in quotes['quote']]
+    vectorizer = TfidfVectorizer(analyzer=analyze, sublinear_tf=True)
+    vectorizer.fit([text for _, _, text in table] + bodies)
+    quote_vectors = vectorizer.transform(bodies)
+    scores = quote_vectors @ vectorizer.transform([text for _, _, text in table]).T
+    best = np.asarray(scores.argmax(axis=1)).ravel()
+
+    anchors = {}
+    for row, p in enumerate(best):
+        transcript, paragraph, text = table[p]
+        sentences = [(m.start(), m.end()) for m in SENTENCE_PATTERN.finditer(text) if m.group().strip()]
+        sentence_scores = (vectorizer.transform([text[s:e] for s, e in sentences]) @ quote_vectors[row].T).toarray().ravel()
+        start, end = sentences[int(sentence_scores.argmax())]
+        # Without the spaces around the sentence
+        start += len(text[start:end]) - len(text[start:end].lstrip())
+        end -= len(text[start:end]) - len(text[start:end].rstrip())
+        anchors[row] = (transcript, paragraph, start, end, text[start:end], float(scores[row, p]))
+    return anchors
+
+
+def anchor_quotes(quotes, transcripts):
+    """
+    Anchor every quote in the transcripts.
+
+    Args:
+        quotes (pandas.DataFrame): Quotes from read_quotes
+        transcripts (dict): transcript id -> paragraphs, from read_transcripts
+
+    Returns:
+        pandas.DataFrame: Columns COLUMNS, one row per quote
+    """
+    quotes = quotes.reset_index(drop=True)
+    exact = anchor_exact(quotes, transcripts)
+    rest = [row for row in range(len(quotes)) if row not in exact]
+    similar = anchor_similar(quotes.iloc[rest].reset_index(drop=True), transcripts)
+    # Position of each remaining quote in the frame handed to anchor_similar
+    rest_index = {row: i for i, row in enumerate(rest)}
+
+    records = []
+    for row in range(len(quotes)):
+        if row in exact:
+            anchor = exact[row] + (1.0, 'exact')
+        elif rest_index[row] in similar:
+            anchor = similar[rest_index[row]] + ('similar',)
+        else:
+            anchor = ('', -1, 0, 0, '', 0.0, 'missing')
+        records.append(anchor)
+    anchors = pd.DataFrame(records, columns=COLUMNS[6:])
+    anchors['score'] = anchors['score'].round(4)
+    return pd.concat([quotes, anchors], axis=1)[COLUMNS]
+
+
+class ProvenanceStore:
+    """
+    Anchored quotes with indexes for looking them up.
+
+    Args:
+        records (pandas.DataFrame): Columns COLUMNS, e.g. from anchor_quotes
+    """
+
+    def __init__(self, records):
+        self.records = records[COLUMNS].reset_index(drop=True)
+        self._build_indexes()
+
+    def _build_indexes(self):
+        records = self.records
+        self._by_node = {node: i for i, node in enumerate(records['node'])}
+        # Leaf ids end in a row number, so a quote added or removed above a leaf
+        # changes its id; sources are found by the quote's text under its parent
+        self._by_content = {(node.rsplit(ID_SEPARATOR, 1)[0], quote): i
+                            for i, (node, quote) in enumerate(zip(records['node'], records['quote']))}
+        # Sorted node ids, so the leaves under a theme are one bisect range
+        order = np.argsort(records['node'].values.astype(str), kind='stable')
+        self._sorted_nodes = records['node'].values[order].tolist()
+        self._sorted_rows = order.tolist()
+        self._by_code = records.groupby('code', sort=False).indices
+        self._by_quote = records.groupby('quote', sort=False).indices
+        # Per transcript: rows sorted by (paragraph, start), for lookups by position
+        self._by_transcript = {}
+        for transcript, rows in records.groupby('transcript', sort=False).indices.items():
+            rows = sorted(rows, key=lambda r: (records.at[r, 'paragraph'], records.at[r, 'start']))
+            self._by_transcript[transcript] = ([records.at[r, 'paragraph'] for r in rows], rows)
+
+    def __len__(self):
+        return len(self.records)
+
+    def lookup(self, node):
+        """
+        Records of a sunburst node: the quote of a leaf, or all quotes under a category or code.
+
+        Args:
+            node (str): Node id, as in the node table of flatten_hierarchy
+
+        Returns:
+            pandas.DataFrame: The matching records
+        """
+        if node in self._by_node:
+            return self.records.iloc[[self._by_node[node]]]
+        prefix = node + ID_SEPARATOR
+        start = bisect_left(self._sorted_nodes, prefix)
+        # IDs under the node start with the prefix; '\U0010ffff' sorts after all of them
+        end = bisect_right(self._sorted_nodes, prefix + '\U0010ffff', lo=start)
+        return self.records.iloc[sorted(self._sorted_rows[start:end])]
+
+    def by_code(self, code):
+        """Records of all quotes filed under a code"""
+        return self.records.iloc[self._by_code.get(code, [])]
+
+    def by_quote(self, quote):
+        """Records of a quote (a quote filed under two codes has two)"""
+        return self.records.iloc[self._by_quote.get(quote, [])]
+
+    def at(self, transcript, paragraph):
+        """Records anchored in one paragraph of a transcript, in order of their span"""
+        paragraphs, rows = self._by_transcript.get(transcript, ([], []))
+        start = bisect_left(paragraphs, paragraph)
+        end = bisect_right(paragraphs, paragraph, lo=start)
+        return self.records.iloc[rows[start:end]]
+
+    def search(self, text):
+        """Records whose quote, code or category contains text (ignoring case)"""
+        text = text.lower()
+        mask = (self.records['quote'].str.lower().str.contains(text, regex=False)
+                | self.records['code'].str.lower().str.contains(text, regex=False)
+                | self.records['category'].str.lower().str.contains(text, regex=False))
+        return self.records[mask]
+
+    def source(self, record, transcripts):
+        """
+        The paragraph a quote is anchored in, with the span marked by [[ ]].
+
+        Args:
+            record (pandas.Series): A record of the store
+            transcripts (dict): transcript id -> paragraphs, from read_transcripts
+
+        Returns:
+            str: The paragraph, or '' if the transcript or paragraph is not there
+        """
+        paragraphs = transcripts.get(record['transcript'], [])
+        if not 0 <= record['paragraph'] < len(paragraphs):
+            return ''
+        text = paragraphs[record['paragraph']]
+        start, end = int(record['start']), int(record['end'])
+        return f"{text[:start]}[[{text[start:end]}]]{text[end:]}"
+
+    def verify(self, transcripts):
+        """
+        Check that every anchor still holds, e.g. after the transcripts were cleaned again.
+
+        An anchor holds if its span still has the anchored text. Otherwise the
+        text is looked for elsewhere in the same transcript; all anchors of a
+        transcript are found in one automaton pass over it.
+
+        Args:
+            transcripts (dict): transcript id -> paragraphs, from read_transcripts
+
+        Returns:
+            pandas.DataFrame: The records with status ('ok', 'moved' or
+                              'missing') and, for moved anchors, their new
+                              paragraph, start and end
+        """
+        records = self.records.copy()
+        records['status'] = 'missing'
+        records['new_paragraph'] = -1
+        records['new_start'] = -1
+        records['new_end'] = -1
+        for transcript, (_, rows) in self._by_transcript.items():
+            paragraphs = transcripts.get(transcript)
+            if paragraphs is None:
+                continue
+            lost = {}
+            for row in rows:
+                paragraph, start, end, anchor = records.loc[row, ['paragraph', 'start', 'end', 'anchor']]
+                if not anchor:
+                    continue
+                if 0 <= paragraph < len(paragraphs) and paragraphs[paragraph][start:end] == anchor:
+                    records.at[row, 'status'] = 'ok'
+                else:
+                    lost.setdefault(anchor, []).append(row)
+            if not lost:
+                continue
+            automaton = KeywordAutomaton({anchor: anchor for anchor in lost}, ignore_case=False, whole_words=False)
+            for paragraph, text in enumerate(paragraphs):
+                for start, end, anchor in automaton.finditer(text):
+                    for row in lost.pop(anchor, []):
+                        records.loc[row, ['status', 'new_paragraph', 'new_start', 'new_end']] = \
+                            ['moved', paragraph, start, end]
+        return records
+
+    def node_sources(self, nodes):
+        """
+        Short source references of sunburst nodes, for hover text.
+
+        Leaves are matched on their parent and label (the quote text) rather
+        than their id, so editing the quotes of main.py never shows the source
+        of another quote; a quote that is not in the store has no source.
+
+        Args:
+            nodes (pandas.DataFrame): Node table from flatten_hierarchy
+
+        Returns:
+            list: 'P4, paragraph 32' for anchored leaves, '' for other nodes
+        """
+        records = self.records
+        sources = []
+        for parent, label in zip(nodes['parent'], nodes['label']):
+            row = self._by_content.get((parent, label))
+            if row is None or records.at[row, 'method'] == 'missing':
+                sources.append('')
+            else:
+                sources.append(f"{records.at[row, 'transcript']}, paragraph {records.at[row, 'paragraph']}")
+        return sources
+
+    def save(self, path=None):
+        """Save the records as CSV (get_store_path() by default)"""
+        self.records.to_csv(path or get_store_path(), index=False)
+
+
+def get_store_path():
+    """Path of the provenance store (QUALKIT_PROVENANCE, or provenance.csv)"""
+    return os.environ.get(STORE_ENV, '').strip() or STORE_NAME
+
+
+def load_store(path=None):
+    """
+    Load a saved provenance store.
+
+    Returns:
+        ProvenanceStore: The store, or None if there is no file
+    """
+    path = path or get_store_path()
+    if not os.path.exists(path):
+        return None
+    records = pd.read_csv(path, dtype={'transcript': str, 'anchor': str}, keep_default_na=False)
+    for column in ('paragraph', 'start', 'end'):
+        records[column] = records[column].astype(int)
+    return ProvenanceStore(records)
+
+
+def build_store(scripts=None, paths=None):
+    """
+    Anchor the quotes of some sunburst scripts in some transcripts.
+
+    Args:
+        scripts (list, optional): Scripts with an affinity_structure; main.py by default
+        paths (list, optional): Transcripts; the edited transcripts in Interview Processing by default
+
+    Returns:
+        ProvenanceStore: The store
+    """
+    paths = paths or sorted(glob.glob(DEFAULT_TRANSCRIPTS))
+    return ProvenanceStore(anchor_quotes(read_quotes(scripts), read_transcripts(paths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Anchor the quotes of the affinity structures in the transcripts")
+    parser.add_argument('transcripts', nargs='*',
+                        help="Transcripts (default: the edited transcripts in Interview Processing)")
+    parser.add_argument('--scripts', nargs='+', default=None,
+                        help="Scripts with an affinity_structure (default: main.py)")
+    parser.add_argument('--out', default=None, help="Store file (default: provenance.csv)")
+    parser.add_argument('--verify', action='store_true',
+                        help="Check the stored anchors against the transcripts instead of anchoring again")
+    parser.add_argument('--show', default=None, help="Print the source of the quotes containing this text")
+    args = parser.parse_args(argv)
+
+    path = args.out or get_store_path()
+    paths = args.transcripts or sorted(glob.glob(DEFAULT_TRANSCRIPTS))
+    if args.verify or args.show:
+        store = load_store(path)
+        if store is None:
+            parser.error(f"No provenance store at {path}; build it first")
+        transcripts = read_transcripts(paths)
+        if args.verify:
+            checked = store.verify(transcripts)
+            print(checked['status'].value_counts().to_string())
+            for _, row in checked[checked['status'] == 'missing'].iterrows():
+                print(f"missing: {row['quote'][:80]} ({row['transcript']} paragraph {row['paragraph']})")
+            if (checked['status'] == 'missing').any():
+                print("Re-anchor the missing quotes with: python -m qualkit.align --out provenance.csv")
+        if args.show:
+            for _, record in store.search(args.show).iterrows():
+                print(f"\n{record['quote']}\n  -> {record['transcript']} paragraph {record['paragraph']} "
+                      f"({record['method']}, {record['score']:.2f}): {store.source(record, transcripts)[:300]}")
+        return 0
+
+    store = build_store(args.scripts, paths)
+    store.save(path)
+    print(store.records['method'].value_counts().to_string())
+    print(f"{len(store)} quotes anchored; saved {os.path.abspath(path)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
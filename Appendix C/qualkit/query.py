@@ -0,0 +1,125 @@
+"""
+Filtered, paged and aggregated slices of a table of records.
+
+Used by the API mode of qualkit/serve.py, so that a viewer asks the Python
+side for the rows it shows instead of receiving every row and filtering them
+in the browser. Each facet (e.g. theme, participant, source) gets an inverted
+index from value to row numbers when the table is loaded; a query intersects
+the row numbers of the selected values, so its cost depends on the size of
+the result rather than on the size of the study:
+
+    index = RecordIndex(codes, ['theme', 'participant'])
+    index.query({'theme': ['Hybrid Warfare Dynamics']}, offset=0, limit=50)
+    index.aggregate('participant', {'theme': ['Hybrid Warfare Dynamics']})
+
+A facet whose values are lists (e.g. the participants of a code) indexes every
+element, so a filter on one participant matches all rows that include them.
+"""
+import numpy as np
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 5000
+
+
+class RecordIndex:
+    """
+    Inverted index of a list of records (dicts) over some of their fields.
+
+    Args:
+        records (list): Records, in display order
+        facets (list): Fields that can be filtered and aggregated on
+    """
+
+    def __init__(self, records, facets):
+        self.records = list(records)
+        self.facets = list(facets)
+        self.index = {}
+        for facet in self.facets:
+            rows = {}
+            for i, record in enumerate(self.records):
+                value = record.get(facet)
+                for v in (value if isinstance(value, (list, tuple)) else [value]):
+                    rows.setdefault(v, []).append(i)
+            self.index[facet] = {v: np.array(r, dtype=np.int64) for v, r in rows.items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def select(self, filters=None):
+        """
+        Row numbers matching all filters.
+
+        Args:
+            filters (dict, optional): facet -> list of accepted values. Values
+                                      within one facet are alternatives; facets
+                                      are combined with AND. 'all' or an empty
+                                      list leaves a facet unfiltered.
+
+        Returns:
+            numpy.ndarray: Sorted row numbers
+
+        Raises:
+            KeyError: If a filter names a field that is not a facet
+        """
+        selected = None
+        for facet, values in (filters or {}).items():
+            if facet not in self.index:
+                raise KeyError(facet)
+            values = [v for v in values if v != 'all']
+            if not values:
+                continue
+            parts = [self.index[facet].get(v) for v in values]
+            parts = [p for p in parts if p is not None]
+            rows = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        if selected is None:
+            return np.arange(len(self.records))
+        return selected
+
+    def query(self, filters=None, offset=0, limit=DEFAULT_LIMIT):
+        """
+        One page of the records matching the filters.
+
+        Returns:
+            dict: 'total' (number of matches), 'offset', 'limit' and 'records'
+        """
+        rows = self.select(filters)
+        offset = max(int(offset), 0)
+        limit = min(max(int(limit), 0), MAX_LIMIT)
+        return {
+            'total': int(len(rows)),
+            'offset': offset,
+            'limit': limit,
+            'records': [self.records[i] for i in rows[offset:offset + limit]],
+        }
+
+    def aggregate(self, by, filters=None):
+        """
+        Number of matching records per value of one facet.
+
+        Args:
+            by (str): Facet to group by
+            filters (dict, optional): As for select
+
+        Returns:
+            dict: 'by', 'total' and 'counts' ([{'value', 'count'}], largest first)
+
+        Raises:
+            KeyError: If by or a filter names a field that is not a facet
+        """
+        if by not in self.index:
+            raise KeyError(by)
+        rows = self.select(filters)
+        if len(rows) == len(self.records):
+            counts = [(v, len(r)) for v, r in self.index[by].items()]
+        else:
+            matched = np.zeros(len(self.records), dtype=bool)
+            matched[rows] = True
+            counts = [(v, int(matched[r].sum())) for v, r in self.index[by].items()]
+        counts = sorted((c for c in counts if c[1]), key=lambda c: (-c[1], str(c[0])))
+        return {'by': by, 'total': int(len(rows)),
+                'counts': [{'value': v, 'count': int(n)} for v, n in counts]}
+
+    def facet_values(self):
+        """All values of every facet, sorted"""
+        return {facet: sorted(self.index[facet], key=str) for facet in self.facets}
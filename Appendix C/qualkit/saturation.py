@@ -0,0 +1,322 @@
+"""
+Code saturation: how many new codes every further interview brings.
+
+The interviews are taken in the order they were held (P1, P2, ... P15) and
+the codes of every participant are added to a running set. The saturation
+curve is the number of distinct codes after each interview; where it
+flattens out, further interviews stopped yielding new codes:
+
+    codes = read_participant_codes()          # participant, code (main.py by default)
+    curve = saturation_curve(codes)           # one row per interview
+    saturation_point(curve)                   # first interview after which little is new
+
+The running set is a boolean array over the codes and a count array of how
+often each code was seen, updated with the code indices of one participant
+at a time; codes seen by a single participant so far are reported separately,
+as they are the ones a further interview might not confirm.
+
+The order of the interviews is an accident of scheduling, so the curve is
+also computed for many random orderings (bootstrap_curves). Each ordering is
+the cumulative OR of the rows of the (participants x codes) matrix in that
+order; a batch of orderings is one numpy accumulation, and the batches run
+in a process pool, so 10,000 orderings take a few seconds. From the command line:
+
+    python -m qualkit.saturation --bootstrap 10000 --out saturation.csv --plot saturation
+
+Codes come from sunburst scripts with an affinity_structure (the participant
+is the quote prefix, the code its subcategory), from scripts with a
+LATEX_CONTENT codebook like vis.py (the PV tables), or from a CSV file with
+participant and code columns.
+"""
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from qualkit.suggest import APPENDIX_DIR, _affinity_structure, _load_script
+
+DEFAULT_SOURCES = [os.path.join(APPENDIX_DIR, 'Qualitative Analysis Visualisations - Main', 'main.py')]
+PARTICIPANT_PATTERN = re.compile(r'^\s*((?:PV|P|F)\d+)\s*:')
+# New codes in RUN further interviews, as a share of the codes so far, below
+# which the interviews count as saturated (Guest et al., 2020 use 5%)
+RUN = 2
+THRESHOLD = 0.05
+# Orderings per process pool job
+BATCH_SIZE = 500
+
+
+def read_participant_codes(sources=None):
+    """
+    The codes of every participant.
+
+    Args:
+        sources (list, optional): Scripts with an affinity_structure or a
+                                  LATEX_CONTENT codebook, or CSV files with
+                                  participant and code columns; main.py by default
+
+    Returns:
+        pandas.DataFrame: Columns participant and code, one row per pair
+
+    Raises:
+        ValueError: If a source holds no participant codes
+    """
+    frames = []
+    for path in sources or DEFAULT_SOURCES:
+        rows = []
+        if path.lower().endswith('.py'):
+            structure = _affinity_structure(path)
+            if structure:
+                for subcategories in structure.values():
+                    for code, quotes in subcategories.items():
+                        for quote in quotes:
+                            match = PARTICIPANT_PATTERN.match(quote)
+                            if match:
+                                rows.append((match.group(1), code))
+            else:
+                module = _load_script(path)
+                latex = getattr(module, 'LATEX_CONTENT', None)
+                if latex is not None:
+                    for table in (module.parse_hybrid_threats_table(latex), module.parse_themed_codes_table(latex)):
+                        if len(table):
+                            rows.extend(zip(table['participant'], table['code']))
+        else:
+            table = pd.read_csv(path, dtype=str)
+            table.columns = [c.strip().lower() for c in table.columns]
+            rows.extend(zip(table['participant'], table['code']))
+        if not rows:
+            raise ValueError(f"No participant codes found in {path}")
+        frames.append(pd.DataFrame(rows, columns=['participant', 'code']))
+    codes = pd.concat(frames, ignore_index=True).astype(str)
+    codes['participant'] = codes['participant'].str.strip()
+    codes['code'] = codes['code'].str.strip()
+    return codes.drop_duplicates().reset_index(drop=True)
+
+
+def interview_order(participants):
+    """
+    Participants in interview order: P1, P2, ..., P10 (numbers, not text), then PV1, ...
+    """
+    def key(participant):
+        match = re.match(r'([A-Za-z]+)(\d+)', participant)
+        if not match:
+            return (participant, 0)
+        return (match.group(1), int(match.group(2)))
+
+    return sorted(set(participants), key=key)
+
+
+def participant_matrix(codes, order=None):
+    """
+    Which participant has which code.
+
+    Args:
+        codes (pandas.DataFrame): From read_participant_codes
+        order (list, optional): Participants, in the order of the rows;
+                                interview_order() by default
+
+    Returns:
+        tuple: ((participants x codes) bool array, participants, code names)
+    """
+    order = order or interview_order(codes['participant'])
+    names, code_index = np.unique(codes['code'].values, return_inverse=True)
+    rows = pd.Index(order).get_indexer(codes['participant'])
+    keep = rows >= 0
+    matrix = np.zeros((len(order), len(names)), dtype=bool)
+    matrix[rows[keep], code_index[keep]] = True
+    return matrix, list(order), list(names)
+
+
+def saturation_curve(codes, order=None):
+    """
+    New and cumulative codes, one interview at a time.
+
+    Args:
+        codes (pandas.DataFrame): From read_participant_codes
+        order (list, optional): Participants in the order to add them;
+                                interview_order() by default
+
+    Returns:
+        pandas.DataFrame: Columns position, participant, codes (of this
+                          participant), new_codes, cumulative, singletons
+                          (codes so far seen by one participant only),
+                          share (cumulative as a share of all codes) and
+                          new (the new codes, separated by '; ')
+    """
+    matrix, participants, names = participant_matrix(codes, order)
+    seen = np.zeros(len(names), dtype=bool)
+    counts = np.zeros(len(names), dtype=np.int64)
+    rows = []
+    for position, (participant, row) in enumerate(zip(participants, matrix), 1):
+        present = np.flatnonzero(row)
+        new = present[~seen[present]]
+        seen[present] = True
+        counts[present] += 1
+        rows.append({
+            'position': position,
+            'participant': participant,
+            'codes': len(present),
+            'new_codes': len(new),
+            'cumulative': int(seen.sum()),
+            'singletons': int((counts == 1).sum()),
+            'share': round(seen.sum() / max(len(names), 1), 3),
+            'new': '; '.join(names[i] for i in new),
+        })
+    return pd.DataFrame(rows)
+
+
+def saturation_point(curve, run=RUN, threshold=THRESHOLD):
+    """
+    The first interview after which run further interviews add at most
+    threshold x the codes found so far.
+
+    Args:
+        curve (pandas.DataFrame or numpy.ndarray): A saturation_curve, or
+                                                    cumulative counts
+        run (int): Number of further interviews to look at
+        threshold (float): Largest share of new codes that still counts as saturated
+
+    Returns:
+        int: Position (1-based) of that interview, or None if saturation is not reached
+    """
+    cumulative = np.asarray(curve['cumulative'] if isinstance(curve, pd.DataFrame) else curve)
+    for i in range(len(cumulative) - run):
+        if cumulative[i + run] - cumulative[i] <= threshold * cumulative[i]:
+            return i + 1
+    return None
+
+
+def _bootstrap_batch(job):
+    """Cumulative code counts of a batch of random orderings (runs in a worker process)"""
+    matrix, size, seed = job
+    rng = np.random.default_rng(seed)
+    orders = np.argsort(rng.random((size, matrix.shape[0])), axis=1)
+    # (orderings, participants, codes): codes seen after each interview
+    seen = np.logical_or.accumulate(matrix[orders], axis=1)
+    return seen.sum(axis=2)
+
+
+def bootstrap_curves(codes, n=10000, seed=42, jobs=None):
+    """
+    Saturation curves of random interview orderings.
+
+    Args:
+        codes (pandas.DataFrame): From read_participant_codes
+        n (int): Number of orderings
+        seed (int): Seed, so that repeated runs give the same curves
+        jobs (int, optional): Worker processes; all CPUs by default, 1 runs in this process
+
+    Returns:
+        numpy.ndarray: (n, participants) cumulative code counts
+    """
+    matrix, _, _ = participant_matrix(codes)
+    sizes = [min(BATCH_SIZE, n - start) for start in range(0, n, BATCH_SIZE)]
+    # One independent stream per batch, so the result does not depend on jobs
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = [(matrix, size, s) for size, s in zip(sizes, seeds)]
+    if jobs == 1 or len(batches) <= 1:
+        return np.concatenate([_bootstrap_batch(batch) for batch in batches])
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return np.concatenate(list(pool.map(_bootstrap_batch, batches)))
+
+
+def summarize_bootstrap(curves, run=RUN, threshold=THRESHOLD):
+    """
+    Mean and 95% band of bootstrapped curves, and where they saturate.
+
+    Returns:
+        tuple: (DataFrame with columns position, mean, low and high;
+                Series of the saturation point of every ordering, NaN where none)
+    """
+    summary = pd.DataFrame({
+        'position': np.arange(1, curves.shape[1] + 1),
+        'mean': curves.mean(axis=0).round(2),
+        'low': np.percentile(curves, 2.5, axis=0),
+        'high': np.percentile(curves, 97.5, axis=0),
+    })
+    # Saturation points of all orderings at once: the first i where the next
+    # run interviews add at most threshold x cumulative[i]
+    head = curves[:, :-run] if run else curves
+    saturated = (curves[:, run:] - head) <= threshold * head
+    points = np.where(saturated.any(axis=1), saturated.argmax(axis=1) + 1, np.nan)
+    return summary, pd.Series(points, name='saturation_point')
+
+
+def plot_saturation(curve, summary=None, name='saturation'):
+    """
+    Plot the saturation curve, with the bootstrap band if given.
+
+    Args:
+        curve (pandas.DataFrame): From saturation_curve
+        summary (pandas.DataFrame, optional): From summarize_bootstrap
+        name (str): Output path without extension
+
+    Returns:
+        str: Path of the file that was written
+    """
+    from qualkit.export import save_figure
+    from qualkit.figures import figure
+
+    with figure('saturation', figsize=(12, 6)) as fig:
+        ax = fig.subplots()
+        ax.bar(curve['position'], curve['new_codes'], color='#95a5a6', alpha=0.6, label='New codes')
+        if summary is not None:
+            ax.fill_between(summary['position'], summary['low'], summary['high'], color='#3498db', alpha=0.2,
+                            label='95% of random orders')
+            ax.plot(summary['position'], summary['mean'], color='#3498db', linestyle='--', label='Mean of random orders')
+        ax.plot(curve['position'], curve['cumulative'], color='#e74c3c', marker='o', label='Interview order')
+        point = saturation_point(curve)
+        if point is not None:
+            ax.axvline(point, color='#2c3e50', linestyle=':', label=f"Saturation ({curve['participant'][point - 1]})")
+        ax.set_xticks(curve['position'])
+        ax.set_xticklabels(curve['participant'], rotation=45)
+        ax.set_xlabel('Interview')
+        ax.set_ylabel('Codes')
+        ax.set_title('Code Saturation')
+        ax.legend(loc='center right')
+        return save_figure(fig, name, dpi=300, bbox_inches='tight')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Saturation curve of the codes over the interviews")
+    parser.add_argument('sources', nargs='*',
+                        help="Scripts with an affinity_structure or LATEX_CONTENT, or CSV files with "
+                             "participant and code columns (default: main.py)")
+    parser.add_argument('--bootstrap', type=int, default=0, help="Number of random interview orderings (default: none)")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes for the bootstrap (default: all CPUs)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=None, help="CSV file for the curve (and the bootstrap summary)")
+    parser.add_argument('--plot', default=None, help="Save a plot under this name (without extension)")
+    args = parser.parse_args(argv)
+
+    codes = read_participant_codes(args.sources)
+    curve = saturation_curve(codes)
+    print(curve.drop(columns='new').to_string(index=False))
+    point = saturation_point(curve)
+    if point is None:
+        print("Not saturated: the last interviews still add new codes")
+    else:
+        print(f"Saturated after {curve['participant'][point - 1]} (interview {point} of {len(curve)})")
+
+    summary = None
+    if args.bootstrap:
+        curves = bootstrap_curves(codes, args.bootstrap, args.seed, args.jobs)
+        summary, points = summarize_bootstrap(curves)
+        reached = points.notna()
+        print(f"{args.bootstrap} random orderings: saturated in {reached.mean():.0%}, "
+              f"median after interview {points[reached].median():.0f}" if reached.any() else
+              f"{args.bootstrap} random orderings: none saturated")
+        curve = curve.merge(summary, on='position')
+    if args.out:
+        curve.to_csv(args.out, index=False)
+        print(f"Saved {os.path.abspath(args.out)}")
+    if args.plot:
+        print(f"Saved {plot_saturation(curve, summary, args.plot)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Topic sections of interview transcripts.
+
+Processing.py used to start a new section whenever a turn contained one of a
+few phrases ("next question", "let's move on to", ...), and called the
+sections "Topic 1", "Topic 2", ... segment_turns offers three modes:
+
+- 'phrases': the old behaviour, with the phrases found by one Aho-Corasick
+  pass (qualkit/keywords.py) instead of one substring scan per phrase.
+- 'guide': sections follow the interview guide. Every interviewer turn is
+  compared with the questions of the guide (Interview Guides/
+  guide_questions.csv) as TF-IDF vectors, the turns of all transcripts in
+  one sparse matrix product. The score of a turn is smoothed over a sliding
+  window of the turns that follow it (the answer usually repeats words of
+  the question). The interviewer turns that match a question are given
+  topics that follow the order of the guide (the best-scoring sequence that
+  never goes back to an earlier topic), and a new section starts where the
+  topic changes. Sections are named after the topic, e.g. "Governance and
+  Compliance".
+- 'keywords': the same, scoring turns by the content words of the guide
+  questions found by an Aho-Corasick automaton. Used when scikit-learn is
+  not installed.
+
+Turns are records with transcript, speaker, text, section and topic fields,
+such as the Turn namedtuples of Processing.py; segment_turns returns them with
+new section and topic values:
+
+    turns = segment_turns(turns, mode='guide')
+"""
+import csv
+import math
+import os
+import re
+
+import numpy as np
+
+from qualkit.keywords import KeywordAutomaton
+
+GUIDE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'Interview Guides', 'guide_questions.csv')
+
+# Phrases the interviewer uses to change the subject ('phrases' mode)
+SECTION_BREAK_PHRASES = [
+    "let's move on to", "next topic", "another question",
+    "next question", "changing subjects", "moving forward"
+]
+
+# Guide of each kind of transcript: PV* and F* are validation interviews
+GUIDE_PREFIXES = [('PV', 'validation'), ('F', 'validation'), ('P', 'interview')]
+
+# Turns in the sliding window and the weight of each turn after the first
+WINDOW = 3
+WINDOW_DECAY = 0.5
+# Lowest score of an interviewer turn with a question for it to start a
+# section: cosine similarity in 'guide' mode, keyword weight in 'keywords' mode.
+# Interviewers rephrase the guide a lot; about a quarter of their turns pass.
+MIN_SIMILARITY = 0.06
+MIN_KEYWORD_SCORE = 0.5
+
+KEYWORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'-]{3,}")
+
+
+def load_guide(path=GUIDE_PATH):
+    """
+    Read the questions of the interview guides.
+
+    Args:
+        path (str): CSV file with columns guide, topic and question
+
+    Returns:
+        list: (guide, topic, question) tuples in the order of the guides
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [(row['guide'], row['topic'], row['question']) for row in csv.DictReader(f)]
+
+
+def guide_of(transcript):
+    """Name of the guide used in a transcript ('P3' -> 'interview', 'PV1' -> 'validation')"""
+    for prefix, guide in GUIDE_PREFIXES:
+        if (transcript or '').upper().startswith(prefix):
+            return guide
+    return None
+
+
+def _renumber(turns, sections, topics):
+    """Turns with new section numbers and topics"""
+    return [turn._replace(section=int(section), topic=topic)
+            for turn, section, topic in zip(turns, sections, topics)]
+
+
+def segment_by_phrases(turns, phrases=SECTION_BREAK_PHRASES):
+    """
+    Start a new section at every turn that contains one of the phrases.
+
+    Returns:
+        list: The turns, with sections numbered per transcript and no topic
+    """
+    automaton = KeywordAutomaton(phrases, whole_words=False)
+    sections, previous, section = [], None, 0
+    for turn in turns:
+        if turn.transcript != previous:
+            previous, section = turn.transcript, 0
+        elif automaton.search(turn.text):
+            section += 1
+        sections.append(section)
+    return _renumber(turns, sections, [None] * len(turns))
+
+
+def _tfidf_scores(texts, questions):
+    """(texts, questions) cosine similarities of TF-IDF vectors"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from qualkit.suggest import analyze
+
+    vectorizer = TfidfVectorizer(analyzer=analyze, sublinear_tf=True)
+    # The idf comes from the questions and the turns together
+    vectorizer.fit(list(questions) + list(texts))
+    return (vectorizer.transform(texts) @ vectorizer.transform(questions).T).toarray()
+
+
+def _keyword_scores(texts, questions):
+    """(texts, questions) scores from the content words of the questions, found by one automaton"""
+    stop_words = _keyword_stop_words()
+    # Every content word points to the questions it occurs in, weighted by rarity
+    owners = {}
+    for q, question in enumerate(questions):
+        for word in set(w.lower() for w in KEYWORD_PATTERN.findall(question)):
+            if word not in stop_words:
+                owners.setdefault(word, set()).add(q)
+    automaton = KeywordAutomaton({word: word for word in owners})
+    weights = {word: 1.0 / math.log(1 + len(qs)) for word, qs in owners.items()}
+    lengths = np.array([max(1, sum(1 for w in set(KEYWORD_PATTERN.findall(q.lower())) if w in owners))
+                        for q in questions], dtype=float)
+
+    scores = np.zeros((len(texts), len(questions)))
+    for t, text in enumerate(texts):
+        for word, n in automaton.count(text).items():
+            for q in owners[word]:
+                scores[t, q] += weights[word]
+    # Normalise by the number of content words, so long questions do not win by length
+    return scores / np.sqrt(lengths)
+
+
+def _keyword_stop_words():
+    """English stop words of scikit-learn, or none if it is not installed"""
+    try:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        return ENGLISH_STOP_WORDS
+    except ImportError:
+        return frozenset()
+
+
+def _window(scores, transcripts, window, decay):
+    """
+    Smooth scores over the next window - 1 turns of the same transcript.
+
+    Returns:
+        numpy.ndarray: scores[i] + decay * scores[i + 1] + decay ** 2 * scores[i + 2] + ...
+    """
+    smoothed = scores.copy()
+    transcripts = np.asarray(transcripts, dtype=object)
+    for k in range(1, window):
+        same = np.zeros(len(scores), dtype=bool)
+        same[:-k] = transcripts[:-k] == transcripts[k:]
+        smoothed[:-k] += np.where(same[:-k, None], (decay ** k) * scores[k:], 0)
+    return smoothed
+
+
+def _monotone_topics(scores):
+    """
+    Topic of each asked question, in guide order.
+
+    Interviews follow their guide: a topic that is over is not come back to.
+    Of all topic sequences that never go back in the guide, this picks the
+    one with the highest total score (dynamic programming over the rows).
+
+    Args:
+        scores (numpy.ndarray): (questions asked, topics) scores, topics in guide order
+
+    Returns:
+        list: Topic index of each row, never decreasing
+    """
+    rows, n_topics = scores.shape
+    columns = np.arange(n_topics)
+    total = scores[0].copy()
+    back = np.zeros((rows, n_topics), dtype=int)
+    for j in range(1, rows):
+        # Best sequence so far ending at any topic up to t, and where it ends
+        best = np.maximum.accumulate(total)
+        back[j] = np.maximum.accumulate(np.where(total == best, columns, 0))
+        total = best + scores[j]
+    path = [int(total.argmax())]
+    for j in range(rows - 1, 0, -1):
+        path.append(int(back[j, path[-1]]))
+    return path[::-1]
+
+
+def segment_by_guide(turns, guide=None, mode='guide', window=WINDOW, decay=WINDOW_DECAY,
+                     min_similarity=None):
+    """
+    Sections that follow the topics of the interview guide.
+
+    Interviewer turns that score at least min_similarity against a guide
+    question are the questions asked. Each is given a topic by _monotone_topics
+    from its windowed scores, so the sections of a transcript follow the order
+    of its guide, and a new section starts where the topic changes.
+    Transcripts whose guide is unknown (see guide_of) are compared with the
+    questions of all guides, and reported.
+
+    Args:
+        turns (list): Turns of one or more transcripts, in order
+        guide (list, optional): (guide, topic, question) tuples; load_guide() by default
+        mode (str): 'guide' (TF-IDF) or 'keywords' (Aho-Corasick)
+        window (int): Turns in the sliding window
+        decay (float): Weight of each further turn in the window
+        min_similarity (float, optional): Lowest score of an interviewer turn to
+                                          start a section; MIN_SIMILARITY or
+                                          MIN_KEYWORD_SCORE by default
+
+    Returns:
+        list: The turns, with sections numbered per transcript and topics from the guide
+    """
+    guide = guide if guide is not None else load_guide()
+    if min_similarity is None:
+        min_similarity = MIN_KEYWORD_SCORE if mode == 'keywords' else MIN_SIMILARITY
+    texts = [turn.text for turn in turns]
+    transcripts = [turn.transcript for turn in turns]
+    guide_names = set(g for g, _, _ in guide)
+    names = [name if name in guide_names else None for name in (guide_of(t) for t in transcripts)]
+    unknown = sorted(set(t for t, n in zip(transcripts, names) if n is None and t))
+    if unknown:
+        print(f"No interview guide for {', '.join(unknown)}; comparing them with all guides")
+
+    sections = np.zeros(len(turns), dtype=int)
+    topics = [None] * len(turns)
+    for name in set(names):
+        rows = [i for i, n in enumerate(names) if n == name]
+        questions = [(topic, question) for g, topic, question in guide if name is None or g == name]
+        if not questions:
+            continue
+        question_texts = [question for _, question in questions]
+        if mode == 'keywords':
+            scores = _keyword_scores([texts[i] for i in rows], question_texts)
+        else:
+            scores = _tfidf_scores([texts[i] for i in rows], question_texts)
+        # The windowed score picks the topic, the turn's own score decides
+        # whether the interviewer asked a question at all
+        smoothed = _window(scores, [transcripts[i] for i in rows], window, decay)
+        asked = np.array([turns[i].speaker == 'Interviewer' for i in rows]) & (scores.max(axis=1) >= min_similarity)
+
+        # Score of each topic: that of its best question
+        topic_names = list(dict.fromkeys(topic for topic, _ in questions))
+        topic_of = np.array([topic_names.index(topic) for topic, _ in questions])
+        topic_scores = np.full((len(rows), len(topic_names)), -np.inf)
+        for t in range(len(topic_names)):
+            topic_scores[:, t] = smoothed[:, topic_of == t].max(axis=1)
+
+        transcript_rows = {}
+        for j, i in enumerate(rows):
+            transcript_rows.setdefault(transcripts[i], []).append(j)
+        for own in transcript_rows.values():
+            questions_asked = [j for j in own if asked[j]]
+            path = []
+            if questions_asked:
+                # Relative to the topic's mean in this transcript, so a topic with
+                # generic questions ("Closing") does not win every turn
+                asked_scores = topic_scores[questions_asked]
+                path = _monotone_topics(asked_scores - asked_scores.mean(axis=0))
+            path = iter(path)
+            current, section = None, 0
+            for j in own:
+                if asked[j]:
+                    topic = topic_names[next(path)]
+                    if topic != current:
+                        # Turns before the first question stay in section 0
+                        section += 1
+                        current = topic
+                sections[rows[j]] = section
+                topics[rows[j]] = current
+    return _renumber(turns, sections, topics)
+
+
+def segment_turns(turns, mode='phrases', guide=None):
+    """
+    Number the topic sections of transcript turns.
+
+    Args:
+        turns (list): Turns of one or more transcripts, in order
+        mode (str): 'phrases', 'guide' or 'keywords' (see the module docstring)
+        guide (list, optional): Guide questions for 'guide' and 'keywords'
+
+    Returns:
+        list: The turns with section and topic set
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode == 'phrases':
+        return segment_by_phrases(turns)
+    if mode not in ('guide', 'keywords'):
+        raise ValueError(f"Unknown segmentation mode {mode!r}; use 'phrases', 'guide' or 'keywords'")
+    if mode == 'guide':
+        try:
+            import sklearn  # noqa: F401
+        except ImportError:
+            print("scikit-learn is not installed; segmenting by guide keywords instead")
+            mode = 'keywords'
+    return segment_by_guide(turns, guide, mode)
@@ -0,0 +1,397 @@
+"""
+Local live-reload server for the interactive boards.
+
+Instead of regenerating miro_visualization.html or interactive_visualization.html
+and reopening it by hand, run the viewer from a small local server that
+watches the source tables:
+
+    python -m qualkit.serve "Qualitative Analysis Visualisations - Main/data.csv"
+    python cloud.py --serve        (network view of paste.txt)
+
+and open http://127.0.0.1:8000/. Whenever a watched file is saved, the payload
+is rebuilt and only the difference to the previous payload is pushed to every
+open page over Server-Sent Events; the page patches its data and redraws in
+place, keeping the current view, zoom and pan.
+
+Endpoints:
+
+    /                     the viewer page, with the current payload inlined
+    /data.json            {"version", "payload"}: the current parsed dataset
+    /events               Server-Sent Events: "patch" ({"version", "ops"}) and
+                          "reset" ({"version", "payload"}) messages
+    /qualkit-assets/...   the shared JS/CSS bundle (see qualkit/html.py)
+
+In API mode (serve(..., api=('codes', ['theme', 'participant']))) the rows
+under that key stay on the server. The page payload only says which facets
+exist, and the viewer asks for the slice it shows:
+
+    /api/facets                              every value of every facet
+    /api/query?theme=A&participant=PV1&offset=0&limit=200
+                                             one page of the matching rows
+    /api/aggregate?by=participant&theme=A    matching rows per facet value
+
+Repeating a facet (theme=A&theme=B) accepts either value. See qualkit/query.py.
+
+Only the standard library is used. Files are polled every 0.2 s, so an edit
+reaches the browser well within a second for tables of this size.
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .html import ASSET_DIR, get_bundle, render_page
+from .query import DEFAULT_LIMIT, RecordIndex
+
+POLL_INTERVAL = 0.2
+KEEPALIVE = 15.0
+
+
+def diff_payload(old, new, path=()):
+    """
+    Describe how to turn one JSON payload into another.
+
+    Dicts are compared key by key and lists element by element, so a renamed
+    note or a moved position only sends the values that changed. Operations:
+
+        {"op": "set", "path": [...], "value": v}        replace the value at path
+        {"op": "del", "path": [...]}                    remove a dict key
+        {"op": "items", "path": [...], "items": [[i, v], ...]}
+                                                        replace list elements
+        {"op": "splice", "path": [...], "start": i, "delete": n, "values": [...]}
+                                                        resize a list from index i
+
+    Args:
+        old: Previous payload (JSON-compatible)
+        new: Current payload (JSON-compatible)
+        path (tuple): Location of old/new in the full payload
+
+    Returns:
+        list: Operations; empty if the payloads are equal
+    """
+    replace = [{'op': 'set', 'path': list(path), 'value': new}]
+    if type(old) is not type(new):
+        return replace if old != new else []
+
+    if isinstance(new, dict):
+        ops = [{'op': 'del', 'path': list(path) + [key]} for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                ops.extend(diff_payload(old[key], value, path + (key,)))
+            else:
+                ops.append({'op': 'set', 'path': list(path) + [key], 'value': value})
+        return ops
+
+    if isinstance(new, list):
+        ops = []
+        items = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            a, b = old[i], new[i]
+            if isinstance(b, (dict, list)) and type(a) is type(b):
+                ops.extend(diff_payload(a, b, path + (i,)))
+            elif a != b:
+                items.append([i, b])
+        # When most of the list changed (e.g. a row inserted near the top shifts
+        # every index), sending the list itself is smaller
+        if len(items) + len(ops) > common // 2 and len(items) + len(ops) > 8:
+            return replace
+        if items:
+            ops.append({'op': 'items', 'path': list(path), 'items': items})
+        if len(old) != len(new):
+            ops.append({'op': 'splice', 'path': list(path), 'start': common,
+                        'delete': len(old) - common, 'values': new[common:]})
+        return ops
+
+    return replace if old != new else []
+
+
+class LiveBoard:
+    """
+    The current payload of one page and the browsers subscribed to it.
+
+    Args:
+        build (callable): Returns a fresh payload; called on start-up and
+                          whenever a watched file changes
+        sources (list): Files to watch
+        viewer (str): Name of the viewer in the bundle ('board', 'network', 'thememap')
+        title (str): Page title
+        scripts (iterable): Extra script URLs the viewer needs (e.g. D3)
+        api (tuple, optional): (key, facets): serve the records under
+                               payload[key] through the query API instead of
+                               sending them to the page
+    """
+
+    def __init__(self, build, sources, viewer, title, scripts=(), api=None):
+        self.build = build
+        self.sources = list(sources)
+        self.viewer = viewer
+        self.title = title
+        self.scripts = list(scripts)
+        self.api = api
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.payload, self.index = self._split(build())
+        self.version = 1
+        self.stamps = self._stamps()
+
+    def _split(self, payload):
+        """In API mode, move the records out of the page payload into an index"""
+        if self.api is None:
+            return payload, None
+        key, facets = self.api
+        records = payload.get(key, [])
+        index = RecordIndex(records, facets)
+        page = dict(payload)
+        page[key] = []
+        # The revision changes with any record, so open pages know to query again
+        revision = hashlib.sha1(json.dumps(records, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+        page['api'] = {'records': key, 'facets': index.facet_values(), 'total': len(index),
+                       'pageSize': DEFAULT_LIMIT, 'revision': revision}
+        return page, index
+
+    def _stamps(self):
+        """Modification time and size of each watched file (None if missing)"""
+        stamps = []
+        for path in self.sources:
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def snapshot(self):
+        """Return (version, payload) consistently"""
+        with self.lock:
+            return self.version, self.payload
+
+    def subscribe(self):
+        """Register a browser; returns the queue its messages are put on"""
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def refresh(self):
+        """
+        Rebuild the payload if a watched file changed and broadcast the diff.
+
+        Returns:
+            int: Number of operations sent (0 if nothing changed)
+        """
+        stamps = self._stamps()
+        if stamps == self.stamps:
+            return 0
+        self.stamps = stamps
+
+        started = time.perf_counter()
+        try:
+            payload, index = self._split(self.build())
+        except Exception:
+            # Keep serving the last good payload while a table is half-edited
+            print("Rebuild failed, keeping the previous data:")
+            traceback.print_exc()
+            return 0
+
+        with self.lock:
+            ops = diff_payload(self.payload, payload)
+            if not ops:
+                return 0
+            self.payload = payload
+            self.index = index
+            self.version += 1
+            message = ('patch', self.version, json.dumps({'version': self.version, 'ops': ops},
+                                                         separators=(',', ':')))
+            for q in self.subscribers:
+                q.put(message)
+            print(f"Pushed version {self.version}: {len(ops)} change(s) to "
+                  f"{len(self.subscribers)} browser(s) in {time.perf_counter() - started:.3f}s")
+        return len(ops)
+
+    def watch(self, interval=POLL_INTERVAL):
+        """Poll the watched files forever (run in a daemon thread)"""
+        while True:
+            time.sleep(interval)
+            self.refresh()
+
+    def page(self):
+        """The viewer page, with the current payload and a live connection"""
+        version, payload = self.snapshot()
+        assets = {'js': ASSET_DIR + '/' + get_bundle()['js'][0],
+                  'css': ASSET_DIR + '/' + get_bundle()['css'][0]}
+        boot = "qualkit.live('{}', {});".format(self.viewer, version)
+        return render_page(self.viewer, payload, self.title, assets, self.scripts, boot=boot)
+
+    def answer(self, endpoint, params):
+        """
+        Answer an API request.
+
+        Args:
+            endpoint (str): 'facets', 'query' or 'aggregate'
+            params (dict): Query string, parsed into lists of values
+
+        Returns:
+            dict: JSON-compatible answer
+
+        Raises:
+            KeyError: For an unknown endpoint, facet or missing index
+            ValueError: For malformed offset/limit
+        """
+        with self.lock:
+            index = self.index
+        if index is None:
+            raise KeyError('API mode is not enabled')
+
+        special = ('offset', 'limit', 'by')
+        filters = {k: v for k, v in params.items() if k not in special}
+        if endpoint == 'facets':
+            return index.facet_values()
+        if endpoint == 'query':
+            return index.query(filters, offset=params.get('offset', ['0'])[0],
+                               limit=params.get('limit', [str(DEFAULT_LIMIT)])[0])
+        if endpoint == 'aggregate':
+            return index.aggregate(params.get('by', [''])[0], filters)
+        raise KeyError(endpoint)
+
+
+def make_handler(board):
+    """Request handler class bound to one LiveBoard"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            # Keep the console for rebuild messages
+            pass
+
+        def _send(self, body, content_type, cache=False):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            # Bundle names carry their content hash, so they can be cached forever
+            self.send_header('Cache-Control', 'public, max-age=31536000, immutable' if cache else 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in ('/', '/index.html'):
+                self._send(board.page(), 'text/html; charset=utf-8')
+            elif url.path == '/data.json':
+                version, payload = board.snapshot()
+                self._send(json.dumps({'version': version, 'payload': payload}, separators=(',', ':')),
+                           'application/json')
+            elif url.path == '/events':
+                self._events(url)
+            elif url.path.startswith('/api/'):
+                try:
+                    answer = board.answer(url.path[len('/api/'):], parse_qs(url.query))
+                except (KeyError, ValueError) as e:
+                    self.send_error(400, 'Bad query: {}'.format(e))
+                    return
+                self._send(json.dumps(answer, separators=(',', ':'), default=str), 'application/json')
+            elif url.path.startswith('/' + ASSET_DIR + '/'):
+                name = url.path.rsplit('/', 1)[-1]
+                for kind, (bundle_name, text) in get_bundle().items():
+                    if name == bundle_name:
+                        content_type = 'text/css' if kind == 'css' else 'application/javascript'
+                        self._send(text, content_type + '; charset=utf-8', cache=True)
+                        return
+                self.send_error(404)
+            else:
+                self.send_error(404)
+
+        def _write_event(self, event, version, data):
+            self.wfile.write(f"event: {event}\nid: {version}\ndata: {data}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        def _events(self, url):
+            # The version the page has: from the URL, or from the last event
+            # it received when the browser reconnects by itself
+            since = self.headers.get('Last-Event-ID') or parse_qs(url.query).get('since', ['0'])[0]
+            q = board.subscribe()
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                self.wfile.write(b'retry: 1000\n\n')
+
+                version, payload = board.snapshot()
+                if str(version) != since:
+                    # The page missed updates; send the whole payload once
+                    self._write_event('reset', version, json.dumps(
+                        {'version': version, 'payload': payload}, separators=(',', ':')))
+                while True:
+                    try:
+                        event, message_version, data = q.get(timeout=KEEPALIVE)
+                    except queue.Empty:
+                        self.wfile.write(b': keepalive\n\n')
+                        self.wfile.flush()
+                        continue
+                    if message_version > version:
+                        self._write_event(event, message_version, data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                board.unsubscribe(q)
+
+    return Handler
+
+
+def serve(build, sources, viewer, title, scripts=(), api=None, host='127.0.0.1', port=8000):
+    """
+    Serve a viewer and push updates to it whenever a source file changes.
+
+    Args:
+        build (callable): Returns the payload for the viewer
+        sources (list): Files to watch (the source tables)
+        viewer (str): Name of the viewer in the bundle
+        title (str): Page title
+        scripts (iterable): Extra script URLs the viewer needs
+        api (tuple, optional): (key, facets) to serve payload[key] through
+                               the query API (see LiveBoard)
+        host (str): Interface to listen on (local only by default)
+        port (int): Port to listen on
+    """
+    board = LiveBoard(build, sources, viewer, title, scripts, api)
+    threading.Thread(target=board.watch, daemon=True).start()
+
+    server = ThreadingHTTPServer((host, port), make_handler(board))
+    server.daemon_threads = True
+    print(f"Serving {title} on http://{host}:{port}/ (watching {', '.join(sources)}); Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """Serve the affinity board of a pattern label table (data.csv or a LaTeX table)"""
+    from .board import board_from_table
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('table', help='Pattern label table to watch')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    serve(lambda: board_from_table(args.table), [args.table], 'board',
+          'Cybersecurity Pattern Labels Visualization', host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
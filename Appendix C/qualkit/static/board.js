@@ -0,0 +1,408 @@
+// Canvas viewer for affinity boards (qualkit.mount('board')).
+//
+// The board data is a compact, column-oriented JSON payload (see
+// qualkit/board.py). Notes are drawn on a single canvas; only notes inside the
+// viewport are visited, found through a uniform grid, so panning and zooming
+// stay smooth with tens of thousands of notes. One set of pointer handlers on
+// the canvas handles dragging notes, panning and hovering.
+qualkit.viewers.board = function (payload) {
+    'use strict';
+
+    document.body.insertAdjacentHTML('beforeend',
+        '<div class="tab"><span class="status" id="status"></span></div>' +
+        '<canvas id="board"></canvas>' +
+        '<div class="instructions" id="instructions"></div>' +
+        '<div class="legend" id="legend"></div>' +
+        '<div class="tooltip" id="tooltip"></div>');
+
+    var NOTE_W = 120, NOTE_H = 48;   // Note size in board units
+    var CELL = 256;                  // Grid cell size, larger than a note
+    var TEXT_MIN_SCALE = 0.35;       // Below this zoom notes are drawn without text
+    var FONT = '10px Arial', META_FONT = '8px Arial';
+
+    var canvas = document.getElementById('board');
+    var ctx = canvas.getContext('2d');
+    var tooltip = document.getElementById('tooltip');
+
+    var data, notes, count, views, view, fills, wrapped;
+    var width = 0, height = 0, dpr = 1;
+    var drag = null, lifted = -1, dirty = false;
+
+    // ---- Data --------------------------------------------------------------
+
+    function load(payload) {
+        data = payload;
+        notes = data.notes;
+        count = notes.label.length;
+        wrapped = new Array(count);
+        fills = data.colors.map(function (c) { return c + '80'; });
+
+        var previous = views;
+        views = {};
+        data.views.forEach(function (v) {
+            var state = {
+                id: v.id, title: v.title, description: v.description, meta: v.meta,
+                headers: v.headers, x: Float32Array.from(v.x), y: Float32Array.from(v.y),
+                grid: null, camera: previous && previous[v.id] ? previous[v.id].camera : null
+            };
+            buildGrid(state);
+            views[v.id] = state;
+        });
+
+        buildTabs();
+        buildLegend();
+        show(view && views[view.id] ? view.id : data.views[0].id);
+    }
+
+    function cellKey(cx, cy) {
+        return cx + ',' + cy;
+    }
+
+    function buildGrid(v) {
+        v.grid = new Map();
+        for (var i = 0; i < count; i++) {
+            addToGrid(v, i);
+        }
+    }
+
+    function addToGrid(v, i) {
+        var key = cellKey(Math.floor(v.x[i] / CELL), Math.floor(v.y[i] / CELL));
+        var bucket = v.grid.get(key);
+        if (!bucket) {
+            bucket = [];
+            v.grid.set(key, bucket);
+        }
+        bucket.push(i);
+    }
+
+    function removeFromGrid(v, i, x, y) {
+        var bucket = v.grid.get(cellKey(Math.floor(x / CELL), Math.floor(y / CELL)));
+        if (bucket) {
+            var at = bucket.indexOf(i);
+            if (at >= 0) bucket.splice(at, 1);
+        }
+    }
+
+    // ---- Chrome (tabs, instructions, legend) -------------------------------
+
+    function buildTabs() {
+        var tab = document.querySelector('.tab');
+        tab.querySelectorAll('button').forEach(function (b) { b.remove(); });
+        var status = document.getElementById('status');
+        data.views.forEach(function (v) {
+            var button = document.createElement('button');
+            button.className = 'tablinks';
+            button.dataset.view = v.id;
+            button.textContent = v.title;
+            tab.insertBefore(button, status);
+        });
+        status.textContent = count + ' notes';
+    }
+
+    function buildLegend() {
+        document.getElementById('legend').innerHTML = '<div class="legend-title">Clusters</div>' +
+            data.clusters.map(function (cluster, c) {
+                return qualkit.legendItem(data.colors[c], cluster);
+            }).join('');
+    }
+
+    function show(id) {
+        view = views[id];
+        document.querySelectorAll('.tablinks').forEach(function (b) {
+            b.classList.toggle('active', b.dataset.view === id);
+        });
+
+        var panel = document.getElementById('instructions');
+        panel.innerHTML = '';
+        var title = document.createElement('h3');
+        title.textContent = view.title + ' View';
+        panel.appendChild(title);
+        view.description.forEach(function (line) {
+            var p = document.createElement('p');
+            p.textContent = line;
+            panel.appendChild(p);
+        });
+
+        if (!view.camera) view.camera = fit(view);
+        redraw();
+    }
+
+    // One delegated handler for all tab buttons
+    document.querySelector('.tab').addEventListener('click', function (e) {
+        var button = e.target.closest('button[data-view]');
+        if (button) show(button.dataset.view);
+    });
+
+    // ---- Camera ------------------------------------------------------------
+
+    function fit(v) {
+        var xmin = Infinity, ymin = Infinity, xmax = -Infinity, ymax = -Infinity;
+        for (var i = 0; i < count; i++) {
+            xmin = Math.min(xmin, v.x[i]); xmax = Math.max(xmax, v.x[i]);
+            ymin = Math.min(ymin, v.y[i]); ymax = Math.max(ymax, v.y[i]);
+        }
+        v.headers.forEach(function (h) {
+            xmin = Math.min(xmin, h.x); xmax = Math.max(xmax, h.x);
+            ymin = Math.min(ymin, h.y); ymax = Math.max(ymax, h.y);
+        });
+        if (!isFinite(xmin)) return { x: 0, y: 0, scale: 1 };
+        var bw = xmax - xmin + 2 * NOTE_W, bh = ymax - ymin + 2 * NOTE_H;
+        var scale = Math.min(1, 0.95 * Math.min(width / bw, height / bh));
+        return { x: (xmin + xmax) / 2, y: (ymin + ymax) / 2, scale: scale };
+    }
+
+    function toBoard(clientX, clientY) {
+        var rect = canvas.getBoundingClientRect();
+        var cam = view.camera;
+        return {
+            x: cam.x + (clientX - rect.left - width / 2) / cam.scale,
+            y: cam.y + (clientY - rect.top - height / 2) / cam.scale
+        };
+    }
+
+    function resize() {
+        dpr = window.devicePixelRatio || 1;
+        width = canvas.clientWidth;
+        height = canvas.clientHeight;
+        canvas.width = Math.round(width * dpr);
+        canvas.height = Math.round(height * dpr);
+        redraw();
+    }
+
+    // ---- Drawing -----------------------------------------------------------
+
+    function redraw() {
+        if (!dirty) {
+            dirty = true;
+            window.requestAnimationFrame(draw);
+        }
+    }
+
+    function visibleNotes() {
+        var cam = view.camera;
+        var x0 = Math.floor((cam.x - width / 2 / cam.scale - NOTE_W) / CELL);
+        var x1 = Math.floor((cam.x + width / 2 / cam.scale + NOTE_W) / CELL);
+        var y0 = Math.floor((cam.y - height / 2 / cam.scale - NOTE_H) / CELL);
+        var y1 = Math.floor((cam.y + height / 2 / cam.scale + NOTE_H) / CELL);
+        var visible = [];
+        if ((x1 - x0 + 1) * (y1 - y0 + 1) > view.grid.size) {
+            // Zoomed far out: walking the occupied cells is cheaper
+            view.grid.forEach(function (bucket) { visible.push.apply(visible, bucket); });
+            return visible;
+        }
+        for (var cx = x0; cx <= x1; cx++) {
+            for (var cy = y0; cy <= y1; cy++) {
+                var bucket = view.grid.get(cellKey(cx, cy));
+                if (bucket) visible.push.apply(visible, bucket);
+            }
+        }
+        return visible;
+    }
+
+    function wrap(i) {
+        // Up to two lines of label text, measured once per note
+        if (wrapped[i]) return wrapped[i];
+        ctx.font = FONT;
+        var words = notes.label[i].split(/\s+/), lines = [''], max = NOTE_W - 12;
+        words.forEach(function (word) {
+            var line = lines[lines.length - 1];
+            var candidate = line ? line + ' ' + word : word;
+            if (ctx.measureText(candidate).width <= max || !line) {
+                lines[lines.length - 1] = candidate;
+            } else {
+                lines.push(word);
+            }
+        });
+        if (lines.length > 2) {
+            lines = lines.slice(0, 2);
+            lines[1] += '…';
+        }
+        wrapped[i] = lines;
+        return lines;
+    }
+
+    function metaText(i) {
+        var source = data.sources[notes.source[i]];
+        if (view.meta === 'source_tag') return source === 'Interview' ? '(I)' : '(S)';
+        return source + ' · ' + data.clusters[notes.cluster[i]];
+    }
+
+    function drawNote(i, detailed) {
+        var x = view.x[i] - NOTE_W / 2, y = view.y[i] - NOTE_H / 2;
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(x, y, NOTE_W, NOTE_H);
+        ctx.fillStyle = fills[notes.cluster[i]];
+        ctx.fillRect(x, y, NOTE_W, NOTE_H);
+        ctx.strokeStyle = data.sources[notes.source[i]] === 'Interview' ? '#000' : '#555';
+        ctx.strokeRect(x, y, NOTE_W, NOTE_H);
+        if (!detailed) return;
+
+        ctx.fillStyle = '#000';
+        ctx.font = FONT;
+        wrap(i).forEach(function (line, n) {
+            ctx.fillText(line, x + 6, y + 14 + n * 12, NOTE_W - 12);
+        });
+        ctx.fillStyle = '#555';
+        ctx.font = META_FONT;
+        ctx.fillText(metaText(i), x + 6, y + NOTE_H - 6, NOTE_W - 12);
+    }
+
+    function drawHeaders() {
+        view.headers.forEach(function (h) {
+            ctx.font = 'bold ' + (h.size || 14) + 'px Arial';
+            var w = ctx.measureText(h.label).width + 20, hh = (h.size || 14) + 20;
+            if (h.color) {
+                ctx.fillStyle = '#ffffff';
+                ctx.fillRect(h.x - w / 2, h.y - hh / 2, w, hh);
+                ctx.fillStyle = h.color + '40';
+                ctx.fillRect(h.x - w / 2, h.y - hh / 2, w, hh);
+                ctx.strokeStyle = h.color;
+                ctx.strokeRect(h.x - w / 2, h.y - hh / 2, w, hh);
+            }
+            ctx.fillStyle = '#000';
+            ctx.textAlign = 'center';
+            ctx.fillText(h.label, h.x, h.y + (h.size || 14) / 3);
+            ctx.textAlign = 'left';
+        });
+    }
+
+    function draw() {
+        dirty = false;
+        if (!view) return;
+        var cam = view.camera;
+        ctx.setTransform(1, 0, 0, 1, 0, 0);
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.setTransform(dpr * cam.scale, 0, 0, dpr * cam.scale,
+                         dpr * (width / 2 - cam.x * cam.scale), dpr * (height / 2 - cam.y * cam.scale));
+        ctx.lineWidth = 1 / Math.max(cam.scale, 0.25);
+
+        var visible = visibleNotes();
+        var detailed = cam.scale >= TEXT_MIN_SCALE;
+        if (detailed) {
+            visible.forEach(function (i) { if (i !== lifted) drawNote(i, true); });
+        } else {
+            // Zoomed out: one filled path per cluster instead of one call per note
+            var byCluster = new Map();
+            visible.forEach(function (i) {
+                var c = notes.cluster[i];
+                if (!byCluster.has(c)) byCluster.set(c, []);
+                byCluster.get(c).push(i);
+            });
+            byCluster.forEach(function (indices, c) {
+                ctx.beginPath();
+                indices.forEach(function (i) {
+                    ctx.rect(view.x[i] - NOTE_W / 2, view.y[i] - NOTE_H / 2, NOTE_W, NOTE_H);
+                });
+                ctx.fillStyle = data.colors[c];
+                ctx.fill();
+            });
+        }
+        drawHeaders();
+        // The note being dragged is drawn last, on top of everything else
+        if (lifted >= 0) drawNote(lifted, true);
+    }
+
+    // ---- Interaction -------------------------------------------------------
+
+    function hitTest(p) {
+        var cx = Math.floor(p.x / CELL), cy = Math.floor(p.y / CELL), hit = -1;
+        for (var dx = -1; dx <= 1; dx++) {
+            for (var dy = -1; dy <= 1; dy++) {
+                var bucket = view.grid.get(cellKey(cx + dx, cy + dy));
+                if (!bucket) continue;
+                for (var k = 0; k < bucket.length; k++) {
+                    var i = bucket[k];
+                    if (Math.abs(p.x - view.x[i]) <= NOTE_W / 2 && Math.abs(p.y - view.y[i]) <= NOTE_H / 2) {
+                        hit = Math.max(hit, i);
+                    }
+                }
+            }
+        }
+        return hit;
+    }
+
+    function showTooltip(i, e) {
+        if (i < 0) {
+            tooltip.style.display = 'none';
+            return;
+        }
+        tooltip.innerHTML = '';
+        var label = document.createElement('div');
+        label.textContent = notes.label[i];
+        var meta = document.createElement('div');
+        meta.className = 'meta';
+        meta.textContent = data.sources[notes.source[i]] + ' · ' + data.clusters[notes.cluster[i]];
+        tooltip.appendChild(label);
+        tooltip.appendChild(meta);
+        tooltip.style.left = (e.clientX + 12) + 'px';
+        tooltip.style.top = (e.clientY + 12) + 'px';
+        tooltip.style.display = 'block';
+    }
+
+    canvas.addEventListener('pointerdown', function (e) {
+        var p = toBoard(e.clientX, e.clientY);
+        var hit = hitTest(p);
+        if (hit >= 0) {
+            drag = { note: hit, dx: p.x - view.x[hit], dy: p.y - view.y[hit], x0: view.x[hit], y0: view.y[hit] };
+            lifted = hit;
+        } else {
+            drag = { pan: true, sx: e.clientX, sy: e.clientY, cx: view.camera.x, cy: view.camera.y };
+        }
+        canvas.setPointerCapture(e.pointerId);
+        canvas.classList.add('dragging');
+        tooltip.style.display = 'none';
+        redraw();
+    });
+
+    canvas.addEventListener('pointermove', function (e) {
+        if (!drag) {
+            showTooltip(view.camera.scale >= TEXT_MIN_SCALE ? hitTest(toBoard(e.clientX, e.clientY)) : -1, e);
+            return;
+        }
+        if (drag.pan) {
+            view.camera.x = drag.cx - (e.clientX - drag.sx) / view.camera.scale;
+            view.camera.y = drag.cy - (e.clientY - drag.sy) / view.camera.scale;
+        } else {
+            var p = toBoard(e.clientX, e.clientY);
+            view.x[drag.note] = p.x - drag.dx;
+            view.y[drag.note] = p.y - drag.dy;
+        }
+        redraw();
+    });
+
+    function endDrag() {
+        if (drag && !drag.pan) {
+            // Re-bucket the note at its new position
+            removeFromGrid(view, drag.note, drag.x0, drag.y0);
+            addToGrid(view, drag.note);
+        }
+        drag = null;
+        lifted = -1;
+        canvas.classList.remove('dragging');
+        redraw();
+    }
+
+    canvas.addEventListener('pointerup', endDrag);
+    canvas.addEventListener('pointercancel', endDrag);
+    canvas.addEventListener('pointerleave', function () { tooltip.style.display = 'none'; });
+
+    canvas.addEventListener('wheel', function (e) {
+        e.preventDefault();
+        // Zoom around the cursor
+        var before = toBoard(e.clientX, e.clientY);
+        var cam = view.camera;
+        cam.scale = Math.min(4, Math.max(0.02, cam.scale * Math.exp(-e.deltaY * 0.0015)));
+        var after = toBoard(e.clientX, e.clientY);
+        cam.x += before.x - after.x;
+        cam.y += before.y - after.y;
+        redraw();
+    }, { passive: false });
+
+    window.addEventListener('resize', resize);
+
+    // ---- Start -------------------------------------------------------------
+
+    resize();
+    load(payload);
+    return { load: load, update: load };
+};
@@ -0,0 +1,98 @@
+// Shared runtime of the qualkit HTML visualizations.
+//
+// Every page written by qualkit/html.py is a small shell: a link to this
+// bundle, the page data as a JSON island (<script id="qualkit-data">) and a
+// call to qualkit.mount(viewer). The viewers register themselves in
+// qualkit.viewers, so one cached bundle serves all pages.
+var qualkit = window.qualkit = { viewers: {} };
+
+// Parse the page data and start the named viewer
+qualkit.mount = function (name) {
+    var viewer = qualkit.viewers[name];
+    if (!viewer) throw new Error('Unknown qualkit viewer: ' + name);
+    var island = document.getElementById('qualkit-data');
+    qualkit.payload = island ? JSON.parse(island.textContent) : {};
+    qualkit.current = viewer(qualkit.payload);
+    return qualkit.current;
+};
+
+// Apply diff operations from qualkit/serve.py (diff_payload) to a payload.
+// The payload is changed in place; the (possibly replaced) root is returned.
+qualkit.applyPatch = function (root, ops) {
+    ops.forEach(function (op) {
+        if (!op.path.length) {
+            root = op.value;
+            return;
+        }
+        var parent = root;
+        for (var i = 0; i < op.path.length - 1; i++) parent = parent[op.path[i]];
+        var key = op.path[op.path.length - 1];
+        if (op.op === 'set') {
+            parent[key] = op.value;
+        } else if (op.op === 'del') {
+            delete parent[key];
+        } else if (op.op === 'items') {
+            op.items.forEach(function (item) { parent[key][item[0]] = item[1]; });
+        } else if (op.op === 'splice') {
+            var list = parent[key];
+            list.splice.apply(list, [op.start, op.delete].concat(op.values));
+        }
+    });
+    return root;
+};
+
+// Mount a viewer served by qualkit/serve.py and keep it up to date: every
+// change of the source tables arrives as a patch and is redrawn in place
+qualkit.live = function (name, version) {
+    var instance = qualkit.mount(name);
+    var events = new EventSource('events?since=' + version);
+
+    function update(message, payload) {
+        qualkit.payload = payload;
+        version = message.version;
+        if (instance && instance.update) instance.update(payload);
+    }
+
+    events.addEventListener('patch', function (e) {
+        var message = JSON.parse(e.data);
+        update(message, qualkit.applyPatch(qualkit.payload, message.ops));
+    });
+    events.addEventListener('reset', function (e) {
+        var message = JSON.parse(e.data);
+        update(message, message.payload);
+    });
+    return instance;
+};
+
+// Ask the qualkit/serve.py query API (API mode) for a slice of the records.
+// params maps facet names to a value or a list of values, plus offset/limit/by
+qualkit.api = function (endpoint, params) {
+    var query = new URLSearchParams();
+    Object.keys(params || {}).forEach(function (key) {
+        [].concat(params[key]).forEach(function (value) { query.append(key, value); });
+    });
+    return fetch('api/' + endpoint + '?' + query.toString()).then(function (response) {
+        if (!response.ok) throw new Error('qualkit API ' + endpoint + ': ' + response.status);
+        return response.json();
+    });
+};
+
+// Escape text for use in innerHTML
+qualkit.escapeHtml = function (text) {
+    return String(text).replace(/[&<>"']/g, function (c) {
+        return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c];
+    });
+};
+
+// Build a legend item: a colour swatch followed by a label
+qualkit.legendItem = function (color, label) {
+    return '<div class="legend-item"><div class="legend-color" style="background-color:' +
+        color + '"></div><div>' + qualkit.escapeHtml(label) + '</div></div>';
+};
+
+// Map each value of key to its record, for constant-time lookups
+qualkit.indexBy = function (records, key) {
+    var index = new Map();
+    records.forEach(function (record) { index.set(record[key], record); });
+    return index;
+};
@@ -0,0 +1,325 @@
+// Theme / code / participant force network (qualkit.mount('network')).
+//
+// Payload (see create_interactive_visualization in cloud.py):
+//     {"themes": [{"name", "count", "color"}],
+//      "codes": [{"name", "theme", "participants": [...]}],
+//      "participants": [{"name", "count"}]}
+//
+// When served by qualkit/serve.py in API mode, "codes" is empty and "api" is
+// set: theme and participant filters appear, and the matching codes are
+// fetched from the server instead of being shipped with the page.
+//
+// Needs D3 v7, loaded by the page shell. Neighbours are indexed when the data
+// is loaded, so highlighting a node costs its degree instead of a scan over
+// all links. update(payload) rejoins the graph by node id, in place.
+qualkit.viewers.network = function (payload) {
+    'use strict';
+
+    document.body.insertAdjacentHTML('beforeend',
+        '<h1>' + qualkit.escapeHtml(document.title) + '</h1>' +
+        '<div class="controls">' +
+        '<button id="themeBtn">Theme-centric View</button>' +
+        '<button id="participantBtn">Participant-centric View</button>' +
+        '<button id="resetBtn">Reset</button>' +
+        '<span id="filters"></span>' +
+        '</div>' +
+        '<div id="visualization"></div>' +
+        '<div class="tooltip" id="tooltip"></div>');
+
+    var width = document.getElementById('visualization').clientWidth;
+    var height = document.getElementById('visualization').clientHeight;
+    var svg = d3.select('#visualization')
+        .append('svg')
+        .attr('width', width)
+        .attr('height', height);
+
+    var tooltip = d3.select('#tooltip');
+    var linkLayer = svg.append('g');
+    var nodeLayer = svg.append('g');
+    var themeByName, data, linksOf, link, node, simulation;
+    var source, request = 0;
+
+    // ---- Data --------------------------------------------------------------
+
+    // Take a payload; in API mode, fetch the codes matching the filters first
+    function load(payload) {
+        source = payload;
+        if (!payload.api) {
+            build(payload);
+            return;
+        }
+        if (!document.getElementById('filterTheme')) {
+            document.getElementById('filters').innerHTML =
+                '<select id="filterTheme"></select><select id="filterParticipant"></select>' +
+                '<span class="status" id="status"></span>';
+            ['filterTheme', 'filterParticipant'].forEach(function (id) {
+                document.getElementById(id).addEventListener('change', function () { load(source); });
+            });
+        }
+        var facets = payload.api.facets;
+        var theme = fillFilter('filterTheme', facets.theme || [], 'All Themes');
+        var participant = fillFilter('filterParticipant', facets.participants || [], 'All Participants');
+
+        var params = { limit: payload.api.pageSize };
+        if (theme !== 'all') params.theme = theme;
+        if (participant !== 'all') params.participants = participant;
+        var current = ++request;
+        qualkit.api('query', params).then(function (page) {
+            // A newer filter change overtook this request
+            if (current !== request) return;
+            document.getElementById('status').textContent = page.records.length + ' of ' + page.total + ' codes';
+            build({ themes: payload.themes, participants: payload.participants, codes: page.records });
+        });
+    }
+
+    // Refill a filter, keeping its selection if it still exists; returns the selection
+    function fillFilter(id, values, allLabel) {
+        var select = document.getElementById(id);
+        var selected = select.value || 'all';
+        select.innerHTML = '<option value="all">' + allLabel + '</option>' + values.map(function (v) {
+            return '<option value="' + qualkit.escapeHtml(v) + '">' + qualkit.escapeHtml(v) + '</option>';
+        }).join('');
+        select.value = values.indexOf(selected) >= 0 ? selected : 'all';
+        return select.value;
+    }
+
+    // ---- Graph -------------------------------------------------------------
+
+    // Build nodes and links from a payload. Nodes that were already on screen
+    // keep their position and velocity, so an update does not scatter the graph
+    function build(payload) {
+        var previous = new Map();
+        if (data) data.nodes.forEach(function (n) { previous.set(n.id, n); });
+
+        themeByName = qualkit.indexBy(payload.themes, 'name');
+        data = { nodes: [], links: [] };
+
+        payload.themes.forEach(function (theme) {
+            data.nodes.push({ id: 'theme-' + theme.name, name: theme.name, type: 'theme',
+                              count: theme.count, color: theme.color });
+        });
+        payload.codes.forEach(function (code) {
+            data.nodes.push({ id: 'code-' + code.name, name: code.name, type: 'code',
+                              theme: code.theme, participants: code.participants });
+        });
+        payload.participants.forEach(function (participant) {
+            data.nodes.push({ id: 'participant-' + participant.name, name: participant.name,
+                              type: 'participant', count: participant.count });
+        });
+        data.nodes.forEach(function (n) {
+            var old = previous.get(n.id);
+            if (old) {
+                ['x', 'y', 'vx', 'vy', 'fx', 'fy'].forEach(function (k) { n[k] = old[k]; });
+            }
+        });
+
+        payload.codes.forEach(function (code) {
+            data.links.push({ source: 'code-' + code.name, target: 'theme-' + code.theme, type: 'code-theme' });
+            code.participants.forEach(function (participant) {
+                data.links.push({ source: 'code-' + code.name, target: 'participant-' + participant,
+                                  type: 'code-participant' });
+            });
+        });
+        // Links pointing at a node that is not in the payload would stop the simulation
+        var ids = new Set(data.nodes.map(function (n) { return n.id; }));
+        data.links = data.links.filter(function (l) { return ids.has(l.source) && ids.has(l.target); });
+
+        // Links of each node, indexed before D3 replaces the ids with the nodes
+        linksOf = new Map();
+        data.nodes.forEach(function (n) { linksOf.set(n.id, []); });
+        data.links.forEach(function (l) {
+            linksOf.get(l.source).push(l);
+            linksOf.get(l.target).push(l);
+        });
+
+        var first = !simulation;
+        render(previous.size > 0);
+        // Start with the theme-centric view
+        if (first) pinOnCircle('theme');
+    }
+
+    // ---- Drawing -----------------------------------------------------------
+
+    function render(warm) {
+        if (!simulation) {
+            simulation = d3.forceSimulation()
+                .force('link', d3.forceLink().id(function (d) { return d.id; }).distance(100))
+                .force('charge', d3.forceManyBody().strength(-300))
+                .force('center', d3.forceCenter(width / 2, height / 2))
+                .force('collision', d3.forceCollide().radius(function (d) { return nodeRadius(d) + 5; }));
+            simulation.on('tick', function () {
+                link
+                    .attr('x1', function (d) { return d.source.x; })
+                    .attr('y1', function (d) { return d.source.y; })
+                    .attr('x2', function (d) { return d.target.x; })
+                    .attr('y2', function (d) { return d.target.y; });
+                node.attr('transform', function (d) { return 'translate(' + d.x + ',' + d.y + ')'; });
+            });
+        }
+        simulation.nodes(data.nodes);
+        simulation.force('link').links(data.links);
+
+        link = linkLayer.selectAll('line')
+            .data(data.links)
+            .join('line')
+            .attr('class', 'link')
+            .attr('stroke', linkColor)
+            .attr('stroke-width', function (d) { return d.type === 'code-theme' ? 2 : 1; })
+            .attr('stroke-opacity', null);
+
+        node = nodeLayer.selectAll('.node')
+            .data(data.nodes, function (d) { return d.id; })
+            .join(function (enter) {
+                var g = enter.append('g')
+                    .attr('class', 'node')
+                    .call(d3.drag()
+                        .on('start', dragstarted)
+                        .on('drag', dragged)
+                        .on('end', dragended))
+                    .on('mouseover', showTooltip)
+                    .on('mouseout', function () { tooltip.style('opacity', 0); })
+                    .on('click', handleNodeClick);
+                g.append('circle')
+                    .attr('stroke', '#fff')
+                    .attr('stroke-width', 2);
+                g.append('text')
+                    .attr('dy', '.35em');
+                return g;
+            })
+            .attr('opacity', null);
+
+        node.select('circle')
+            .attr('r', nodeRadius)
+            .attr('fill', nodeColor);
+        node.select('text')
+            .attr('class', function (d) { return d.type === 'theme' ? 'label theme-label' : 'label'; })
+            .attr('dx', function (d) { return nodeRadius(d) + 5; })
+            .text(function (d) { return d.name; });
+
+        // A small nudge settles the changed part without restarting the layout
+        simulation.alpha(warm ? 0.3 : 1).restart();
+    }
+
+    function nodeRadius(d) {
+        if (d.type === 'theme') return 15 + d.count * 2;
+        if (d.type === 'participant') return 12 + d.count;
+        return 8;
+    }
+
+    function themeColor(name) {
+        var theme = themeByName.get(name);
+        return theme ? theme.color : '#999';
+    }
+
+    function nodeColor(d) {
+        if (d.type === 'theme') return d.color;
+        if (d.type === 'code') return themeColor(d.theme);
+        return '#3498db';
+    }
+
+    function linkColor(d) {
+        if (d.type === 'code-theme') return themeColor(d.target.name);
+        return '#999';
+    }
+
+    function showTooltip(event, d) {
+        var content = '<strong>' + qualkit.escapeHtml(d.name) + '</strong><br>';
+        if (d.type === 'code') {
+            content += 'Theme: ' + qualkit.escapeHtml(d.theme) +
+                '<br>Participants: ' + qualkit.escapeHtml(d.participants.join(', '));
+        } else {
+            content += 'Codes: ' + d.count;
+        }
+        tooltip.html(content)
+            .style('left', (event.pageX + 10) + 'px')
+            .style('top', (event.pageY - 10) + 'px')
+            .style('opacity', 0.9);
+    }
+
+    // ---- Interaction -------------------------------------------------------
+
+    function dragstarted(event) {
+        if (!event.active) simulation.alphaTarget(0.3).restart();
+        event.subject.fx = event.subject.x;
+        event.subject.fy = event.subject.y;
+    }
+
+    function dragged(event) {
+        event.subject.fx = event.x;
+        event.subject.fy = event.y;
+    }
+
+    function dragended(event) {
+        if (!event.active) simulation.alphaTarget(0);
+        event.subject.fx = null;
+        event.subject.fy = null;
+    }
+
+    // Pin the nodes of one type on a circle and let the rest settle around them
+    function pinOnCircle(type) {
+        if (!simulation) return;
+        simulation.stop();
+        var pinned = data.nodes.filter(function (d) { return d.type === type; });
+        var radius = Math.min(width, height) * 0.35;
+        pinned.forEach(function (n, i) {
+            var angle = (i / pinned.length) * 2 * Math.PI;
+            n.fx = width / 2 + radius * Math.cos(angle);
+            n.fy = height / 2 + radius * Math.sin(angle);
+        });
+        data.nodes.forEach(function (n) {
+            if (n.type !== type) { n.fx = null; n.fy = null; }
+        });
+        simulation.alpha(1).restart();
+    }
+
+    function resetVisualization() {
+        if (!simulation) return;
+        data.nodes.forEach(function (n) { n.fx = null; n.fy = null; });
+        simulation.alpha(1).restart();
+    }
+
+    // Dim everything except the given nodes and links
+    function highlight(nodeIds, links) {
+        link.attr('stroke-opacity', function (l) { return links.has(l) ? 0.8 : 0.2; });
+        node.attr('opacity', function (n) { return nodeIds.has(n.id) ? 1 : 0.2; });
+    }
+
+    function handleNodeClick(event, d) {
+        event.stopPropagation();
+        var nodeIds = new Set([d.id]);
+        var links = new Set();
+
+        if (d.type === 'code') {
+            // The code, its theme and its participants
+            linksOf.get(d.id).forEach(function (l) {
+                links.add(l);
+                nodeIds.add(l.target.id);
+            });
+        } else {
+            // The theme or participant and its codes
+            linksOf.get(d.id).forEach(function (l) {
+                links.add(l);
+                nodeIds.add(l.source.id);
+                if (d.type === 'participant') {
+                    // ... and the themes of those codes
+                    linksOf.get(l.source.id).forEach(function (m) {
+                        if (m.type === 'code-theme') {
+                            links.add(m);
+                            nodeIds.add(m.target.id);
+                        }
+                    });
+                }
+            });
+        }
+        highlight(nodeIds, links);
+    }
+
+    document.getElementById('themeBtn').addEventListener('click', function () { pinOnCircle('theme'); });
+    document.getElementById('participantBtn').addEventListener('click', function () { pinOnCircle('participant'); });
+    document.getElementById('resetBtn').addEventListener('click', resetVisualization);
+
+    load(payload);
+    return {
+        update: load
+    };
+};
@@ -0,0 +1,82 @@
+// Expand the "N more" nodes of a level-of-detail sunburst (qualkit/sunburst.py).
+//
+// level_of_detail in qualkit/hierarchy.py folds the leaves beyond the first
+// pageSize of every parent into one "N more" node and export_sunburst writes
+// them to a sidecar JSON next to the page:
+//
+//     {"pageSize": 20, "more": {"<id of N more node>": {"parent", "children": [[id, label, value]]}}}
+//
+// If the trace has customdata (hover text), every child carries its own as a
+// fourth item and customdata is restyled with the other arrays, so that it
+// stays aligned with the ids.
+//
+// The sidecar is fetched on the first click on such a node; every click then
+// adds the next page of children in place of the node. fetch cannot read
+// files straight from disk, so open the page through a web server, e.g.
+// python -m http.server --directory sunbursts
+function qualkitSunburstMore(gd, url) {
+    'use strict';
+
+    var MORE_SUFFIX = '\u001fmore';
+    var sidecar = null;
+    var shown = {};
+
+    function load() {
+        if (!sidecar) {
+            sidecar = fetch(url).then(function (response) {
+                if (!response.ok) throw new Error(url + ': ' + response.status);
+                return response.json();
+            });
+        }
+        return sidecar;
+    }
+
+    function expand(data, id) {
+        var entry = data.more[id];
+        var trace = gd.data[0];
+        // Values may arrive as typed arrays, which cannot grow
+        var ids = Array.from(trace.ids);
+        var labels = Array.from(trace.labels);
+        var parents = Array.from(trace.parents);
+        var values = Array.from(trace.values);
+        var customdata = trace.customdata ? Array.from(trace.customdata) : null;
+        var at = ids.indexOf(id);
+        if (!entry || at < 0) return;
+
+        var start = shown[id] || 0;
+        var page = entry.children.slice(start, start + data.pageSize);
+        shown[id] = start + page.length;
+        var remaining = entry.children.length - shown[id];
+
+        var added = 0;
+        page.forEach(function (child) {
+            ids.push(child[0]);
+            labels.push(child[1]);
+            parents.push(entry.parent);
+            values.push(child[2]);
+            if (customdata) customdata.push(child.length > 3 ? child[3] : '');
+            added += child[2];
+        });
+        if (remaining > 0) {
+            labels[at] = remaining + ' more';
+            values[at] -= added;
+        } else {
+            [ids, labels, parents, values, customdata].forEach(function (list) {
+                if (list) list.splice(at, 1);
+            });
+        }
+        var update = { ids: [ids], labels: [labels], parents: [parents], values: [values] };
+        if (customdata) update.customdata = [customdata];
+        Plotly.restyle(gd, update, [0]);
+    }
+
+    gd.on('plotly_sunburstclick', function (event) {
+        var point = event.points && event.points[0];
+        if (!point || !point.id || point.id.slice(-MORE_SUFFIX.length) !== MORE_SUFFIX) return;
+        load().then(function (data) { expand(data, point.id); }, function (error) {
+            console.error('Could not load the hidden quotes:', error);
+        });
+        // Keep the view instead of zooming into the "N more" node
+        return false;
+    });
+}
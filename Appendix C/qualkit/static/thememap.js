@@ -0,0 +1,224 @@
+// Codes arranged around their themes (qualkit.mount('thememap')).
+//
+// Payload (see interactive_payload in cluster.py):
+//     {"themes": [{"name", "color", "x", "y"}], "participants": [{"name", "color"}],
+//      "codes": [{"id", "label", "x", "y", "theme", "participant", "color", "borderColor"}]}
+//
+// The filters and the legend are built from the payload. When the page is
+// served by qualkit/serve.py in API mode, "codes" is empty and "api" is set:
+// the codes of the selected theme/participant are then fetched page by page
+// from the server instead of being filtered here.
+qualkit.viewers.thememap = function (payload) {
+    'use strict';
+
+    var options = function (records, allLabel) {
+        return '<option value="all">' + allLabel + '</option>' + records.map(function (r) {
+            var name = qualkit.escapeHtml(r.name);
+            return '<option value="' + name + '">' + name + '</option>';
+        }).join('');
+    };
+    var legend = function (records) {
+        return records.map(function (r) { return qualkit.legendItem(r.color, r.name); }).join('');
+    };
+
+    document.body.insertAdjacentHTML('beforeend',
+        '<div class="controls">' +
+        '<button id="zoomIn">Zoom In</button> ' +
+        '<button id="zoomOut">Zoom Out</button> ' +
+        '<button id="reset">Reset View</button> ' +
+        '<select id="filterParticipant"></select> ' +
+        '<select id="filterTheme"></select>' +
+        '<div class="status"><span id="status"></span> <button id="more">Load more</button></div>' +
+        '</div>' +
+        '<div class="container" id="visualization"></div>' +
+        '<div class="legend" id="legend"></div>');
+
+    var themes, themeByName, codes, api, total = 0, request = 0;
+
+    // Take a payload: fill the filters and the legend, keeping the selected filters
+    function load(data) {
+        themes = data.themes;
+        themeByName = qualkit.indexBy(themes, 'name');
+        api = data.api || null;
+        codes = api ? [] : data.codes;
+        [['filterParticipant', data.participants, 'All Participants'],
+         ['filterTheme', data.themes, 'All Themes']].forEach(function (filter) {
+            var select = document.getElementById(filter[0]);
+            var selected = select.value;
+            select.innerHTML = options(filter[1], filter[2]);
+            select.value = filter[1].some(function (r) { return r.name === selected; }) ? selected : 'all';
+        });
+        document.getElementById('legend').innerHTML = '<h3>Legend</h3>' +
+            '<div><h4>Participants:</h4>' + legend(data.participants) + '</div>' +
+            '<div><h4>Themes:</h4>' + legend(data.themes) + '</div>';
+    }
+
+    function filters() {
+        return {
+            participant: document.getElementById('filterParticipant').value,
+            theme: document.getElementById('filterTheme').value
+        };
+    }
+
+    // Fetch the first (or, with append, the next) page of matching codes
+    function query(append) {
+        var f = filters();
+        var params = { offset: append ? codes.length : 0, limit: api.pageSize };
+        if (f.participant !== 'all') params.participant = f.participant;
+        if (f.theme !== 'all') params.theme = f.theme;
+
+        var current = ++request;
+        return qualkit.api('query', params).then(function (page) {
+            // A newer filter change overtook this request
+            if (current !== request) return;
+            codes = append ? codes.concat(page.records) : page.records;
+            total = page.total;
+            createVisualization();
+        });
+    }
+
+    // Show the codes of the current filters, asking the server in API mode
+    function refresh() {
+        if (api) query(false);
+        else createVisualization();
+    }
+
+    var container = document.getElementById('visualization');
+    var width = container.clientWidth;
+    var height = container.clientHeight;
+    var scale = 1;
+    var translateX = width / 2;
+    var translateY = height / 2;
+
+    function edgeElement(code, theme) {
+        var dx = code.x - theme.x;
+        var dy = code.y - theme.y;
+        var edge = document.createElement('div');
+        edge.className = 'edge';
+        edge.style.width = (Math.sqrt(dx * dx + dy * dy) * scale) + 'px';
+        edge.style.height = '2px';
+        edge.style.backgroundColor = code.borderColor || '#888';
+        edge.style.opacity = '0.5';
+        edge.style.transformOrigin = '0 0';
+        edge.style.transform = 'translate(' + (width / 2 + theme.x * scale) + 'px, ' +
+            (height / 2 + theme.y * scale) + 'px) rotate(' + (Math.atan2(dy, dx) * 180 / Math.PI) + 'deg)';
+        return edge;
+    }
+
+    function themeElement(theme) {
+        var size = 100;
+        var element = document.createElement('div');
+        element.className = 'node theme-node';
+        element.textContent = theme.name;
+        element.style.width = size + 'px';
+        element.style.height = size + 'px';
+        element.style.left = (width / 2 + (theme.x - size / 2) * scale) + 'px';
+        element.style.top = (height / 2 + (theme.y - size / 2) * scale) + 'px';
+        element.style.backgroundColor = theme.color + '90';
+        element.style.border = '2px solid ' + theme.color;
+        return element;
+    }
+
+    function codeElement(code) {
+        var element = document.createElement('div');
+        element.className = 'node';
+        var text = document.createElement('div');
+        text.textContent = code.label;
+        var badge = document.createElement('div');
+        badge.className = 'badge';
+        badge.textContent = code.participant;
+        element.appendChild(text);
+        element.appendChild(badge);
+        element.style.width = '120px';
+        element.style.left = (width / 2 + (code.x - 60) * scale) + 'px';
+        element.style.top = (height / 2 + (code.y - 15) * scale) + 'px';
+        element.style.backgroundColor = code.color + '80';
+        element.style.border = '2px solid ' + (code.borderColor || '#888');
+        return element;
+    }
+
+    // Rebuild the map off-document and swap it in with a single DOM update
+    function createVisualization() {
+        var f = filters();
+        var edges = document.createDocumentFragment();
+        var elements = document.createDocumentFragment();
+
+        themes.forEach(function (theme) {
+            if (f.theme === 'all' || theme.name === f.theme) elements.appendChild(themeElement(theme));
+        });
+        // In API mode the server has already applied the filters
+        var shown = api ? codes : codes.filter(function (code) {
+            return (f.theme === 'all' || code.theme === f.theme) &&
+                (f.participant === 'all' || code.participant === f.participant);
+        });
+        shown.forEach(function (code) {
+            var theme = themeByName.get(code.theme);
+            if (theme) edges.appendChild(edgeElement(code, theme));
+            elements.appendChild(codeElement(code));
+        });
+
+        // Edges go first so that they stay behind the nodes
+        edges.appendChild(elements);
+        container.replaceChildren(edges);
+
+        document.getElementById('status').textContent =
+            shown.length + ' of ' + (api ? total : shown.length) + ' codes';
+        document.getElementById('more').style.display = api && codes.length < total ? '' : 'none';
+    }
+
+    load(payload);
+    refresh();
+
+    document.getElementById('zoomIn').addEventListener('click', function () {
+        scale *= 1.2;
+        createVisualization();
+    });
+    document.getElementById('zoomOut').addEventListener('click', function () {
+        scale /= 1.2;
+        createVisualization();
+    });
+    document.getElementById('reset').addEventListener('click', function () {
+        scale = 1;
+        translateX = width / 2;
+        translateY = height / 2;
+        container.style.transform = '';
+        createVisualization();
+    });
+    document.getElementById('more').addEventListener('click', function () { query(true); });
+    document.getElementById('filterParticipant').addEventListener('change', refresh);
+    document.getElementById('filterTheme').addEventListener('change', refresh);
+    window.addEventListener('resize', createVisualization);
+
+    // Pan by dragging the background
+    var isDragging = false;
+    var lastX, lastY;
+
+    container.addEventListener('mousedown', function (e) {
+        if (e.target === container) {
+            isDragging = true;
+            lastX = e.clientX;
+            lastY = e.clientY;
+            container.style.cursor = 'grabbing';
+        }
+    });
+    window.addEventListener('mousemove', function (e) {
+        if (!isDragging) return;
+        translateX += e.clientX - lastX;
+        translateY += e.clientY - lastY;
+        lastX = e.clientX;
+        lastY = e.clientY;
+        container.style.transform = 'translate(' + (translateX - width / 2) + 'px, ' + (translateY - height / 2) + 'px)';
+    });
+    window.addEventListener('mouseup', function () {
+        isDragging = false;
+        container.style.cursor = 'default';
+    });
+
+    return {
+        redraw: createVisualization,
+        update: function (data) {
+            load(data);
+            refresh();
+        }
+    };
+};
@@ -0,0 +1,413 @@
+"""
+Code suggestions for transcript turns from an index of the existing codebook.
+
+Pattern labels (data.csv) and thematic codes (the vis.py codebook) are
+assigned by hand, reading every turn of a cleaned transcript against a
+codebook of a few hundred labels. This module ranks the codebook for every
+turn so that the coder starts from a short list instead:
+
+    index = load_index()                                  # built once, then cached
+    turns = read_turns('cleaned_transcript_P3.docx')      # output of Processing.py
+    suggestions = index.suggest(turns['text'], k=5)       # one row per (turn, rank)
+
+Every label is described by a small document: the label itself, its cluster
+or theme, and the quotes filed under it in the affinity structure of main.py.
+The documents are turned into TF-IDF vectors of words and word pairs, with
+plurals folded into the singular so that 'attacks' still matches 'Attack
+Vectors', normalised to unit length and stored as one sparse label matrix. A batch of turns is vectorised the same way and scored
+against all labels with a single sparse matrix product; the top k per turn
+come from argpartition, so a full interview wave is ranked in milliseconds.
+
+The fitted index is pickled to label_index.pkl in the working directory and
+rebuilt only when the codebook changes. Set QUALKIT_LABEL_INDEX to another
+file name, or to "off" to rebuild it on every run. From the command line:
+
+    python -m qualkit.suggest cleaned_P3.docx cleaned_P5.txt --k 5 --out suggestions.csv
+
+Needs scikit-learn; .docx transcripts also need python-docx.
+"""
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from qualkit.board import read_pattern_table
+
+INDEX_ENV = 'QUALKIT_LABEL_INDEX'
+INDEX_NAME = 'label_index.pkl'
+
+# The codebook of the study, relative to the Appendix C folder
+APPENDIX_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CODEBOOKS = [
+    os.path.join(APPENDIX_DIR, 'Qualitative Analysis Visualisations - Main', 'data.csv'),
+    os.path.join(APPENDIX_DIR, 'Qualitative Analysis Visualisations - Validation', 'validation', 'vis.py'),
+    os.path.join(APPENDIX_DIR, 'Qualitative Analysis Visualisations - Main', 'main.py'),
+]
+
+# Speaker lines written by create_formatted_document in Processing.py
+TURN_PATTERN = re.compile(r'^(Interviewer|Expert):\s*(.*)')
+# Participant prefix of the quotes in the affinity structures, e.g. "P3: "
+QUOTE_PREFIX = re.compile(r'^P\d+:\s*')
+
+WORD_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+# Turns scored per matrix product, to bound the size of the dense score block
+BATCH_SIZE = 2048
+
+
+@lru_cache(maxsize=65536)
+def _stem(word):
+    """Fold a plural into its singular ('breaches' -> 'breach', 'policies' -> 'policy')"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def analyze(text):
+    """
+    Terms of a text for the index: lowercase words without stop words, plus word pairs.
+
+    A module-level function rather than a lambda, so that the index can be pickled.
+    """
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    words = [_stem(word) for word in WORD_PATTERN.findall(text.lower()) if word not in ENGLISH_STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _load_script(path):
+    """Import a script by path (vis.py only runs its main() under __main__)"""
+    spec = importlib.util.spec_from_file_location(f"_codebook_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _affinity_structure(path):
+    """
+    Read the affinity_structure dict of a sunburst script without running it.
+
+    Returns:
+        dict: {category: {subcategory: [quote, ...]}}, or {} if the script has none
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == 'affinity_structure' for target in node.targets):
+            return ast.literal_eval(node.value)
+    return {}
+
+
+def read_codebook(path):
+    """
+    Read the labels of one codebook file.
+
+    Supported are pattern label tables (data.csv or a LaTeX longtable, see
+    read_pattern_table), scripts with a LATEX_CONTENT codebook like vis.py,
+    and sunburst scripts with an affinity_structure like main.py.
+
+    Args:
+        path (str): Codebook file
+
+    Returns:
+        pandas.DataFrame: Columns label, group (cluster, theme or category),
+                          quotes (list of example quotes) and codebook (file name)
+
+    Raises:
+        ValueError: If the file holds no codebook
+    """
+    name = os.path.basename(path)
+    rows = []
+    if path.lower().endswith('.py'):
+        structure = _affinity_structure(path)
+        if structure:
+            for category, subcategories in structure.items():
+                for subcategory, quotes in subcategories.items():
+                    rows.append({'label': subcategory, 'group': category,
+                                 'quotes': [QUOTE_PREFIX.sub('', q) for q in quotes]})
+        else:
+            module = _load_script(path)
+            latex = getattr(module, 'LATEX_CONTENT', None)
+            if latex is None:
+                raise ValueError(f"{path} has neither an affinity_structure nor a LATEX_CONTENT codebook")
+            # Codes with a theme first, so that they keep it after de-duplication
+            themed = module.parse_themed_codes_table(latex)
+            plain = module.parse_hybrid_threats_table(latex)
+            for code, theme in zip(themed.get('code', []), themed.get('theme', [])):
+                rows.append({'label': code, 'group': theme, 'quotes': []})
+            for code in plain.get('code', []):
+                rows.append({'label': code, 'group': '', 'quotes': []})
+    else:
+        table = read_pattern_table(path)
+        for label, cluster in zip(table['pattern_label'], table['cluster']):
+            rows.append({'label': label, 'group': cluster, 'quotes': []})
+
+    if not rows:
+        raise ValueError(f"No labels found in {path}")
+    df = pd.DataFrame(rows)
+    df['label'] = df['label'].astype(str).str.strip()
+    df = df[~df['label'].str.startswith('\\textbf')]
+    df = df.drop_duplicates('label').reset_index(drop=True)
+    df['codebook'] = name
+    return df
+
+
+def read_codebooks(paths=None):
+    """Labels of several codebook files (see read_codebook); the study's codebook by default"""
+    paths = paths or DEFAULT_CODEBOOKS
+    return pd.concat([read_codebook(path) for path in paths], ignore_index=True)
+
+
+class LabelIndex:
+    """
+    TF-IDF index of codebook labels for ranking them against transcript turns.
+
+    Args:
+        codebook (pandas.DataFrame): Labels from read_codebooks
+    """
+
+    def __init__(self, codebook):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.codebook = codebook.reset_index(drop=True)
+        self.key = codebook_key(self.codebook)
+        # The label counts twice: it is the most precise description of the code
+        documents = [' '.join([label, label, group] + list(quotes)) for label, group, quotes
+                     in zip(self.codebook['label'], self.codebook['group'], self.codebook['quotes'])]
+
+        # TfidfVectorizer normalises rows to unit length, so that the product
+        # of a turn vector with a label vector is their cosine similarity
+        self.vectorizer = TfidfVectorizer(analyzer=analyze, sublinear_tf=True)
+        self.matrix = self.vectorizer.fit_transform(documents).tocsr()
+        # Transposed once here instead of on every batch
+        self.matrix_t = self.matrix.T.tocsr()
+
+    def vectorize(self, texts):
+        """Unit-length TF-IDF vectors of some texts in the space of the index"""
+        return self.vectorizer.transform([str(text) for text in texts])
+
+    def scores(self, texts):
+        """
+        Cosine similarity of every text with every label.
+
+        Returns:
+            numpy.ndarray: (texts, labels) scores
+        """
+        return (self.vectorize(texts) @ self.matrix_t).toarray()
+
+    def top_k(self, texts, k=5):
+        """
+        Best labels per text.
+
+        Args:
+            texts (list): Turns or other text fragments
+            k (int): Number of labels per text
+
+        Returns:
+            tuple: (indices, scores), both (texts, k) arrays sorted by descending score;
+                   indices are rows of self.codebook
+        """
+        texts = list(texts)
+        k = min(k, len(self.codebook))
+        indices = np.zeros((len(texts), k), dtype=np.int64)
+        best = np.zeros((len(texts), k))
+        for start in range(0, len(texts), BATCH_SIZE):
+            block = self.scores(texts[start:start + BATCH_SIZE])
+            rows = np.arange(len(block))[:, None]
+            # Unordered top k in linear time, then only those k are sorted
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            order = np.argsort(-block[rows, top], axis=1, kind='stable')
+            top = top[rows, order]
+            indices[start:start + len(block)] = top
+            best[start:start + len(block)] = block[rows, top]
+        return indices, best
+
+    def suggest(self, texts, k=5, min_score=0.05):
+        """
+        Suggested labels for a batch of turns.
+
+        Args:
+            texts (list): Turn texts, e.g. the 'text' column of read_turns
+            k (int): Suggestions per turn
+            min_score (float): Suggestions scoring lower than this are left out
+
+        Returns:
+            pandas.DataFrame: Columns turn (position in texts), rank, label,
+                              group, codebook and score
+        """
+        indices, scores = self.top_k(texts, k)
+        turn = np.repeat(np.arange(len(indices)), indices.shape[1])
+        rank = np.tile(np.arange(1, indices.shape[1] + 1), len(indices))
+        labels = self.codebook.iloc[indices.ravel()]
+        df = pd.DataFrame({
+            'turn': turn,
+            'rank': rank,
+            'label': labels['label'].values,
+            'group': labels['group'].values,
+            'codebook': labels['codebook'].values,
+            'score': scores.ravel().round(4),
+        })
+        return df[df['score'] >= min_score].reset_index(drop=True)
+
+
+def codebook_key(codebook):
+    """Hash of the codebook, to tell whether a stored index is still current"""
+    records = codebook[['label', 'group', 'quotes', 'codebook']].values.tolist()
+    return hashlib.sha1(json.dumps(records, default=list).encode('utf-8')).hexdigest()
+
+
+def get_index_path():
+    """Return the path of the stored index, or None if storing it is switched off"""
+    path = os.environ.get(INDEX_ENV, INDEX_NAME).strip()
+    if path.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    return path
+
+
+def load_index(paths=None):
+    """
+    The label index of some codebook files, built only if the stored one is out of date.
+
+    Args:
+        paths (list, optional): Codebook files; the study's codebook by default
+
+    Returns:
+        LabelIndex: The index
+    """
+    codebook = read_codebooks(paths)
+    key = codebook_key(codebook)
+    path = get_index_path()
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                index = pickle.load(f)
+            if getattr(index, 'key', None) == key:
+                return index
+        except (OSError, pickle.UnpicklingError, AttributeError, EOFError) as e:
+            print(f"Rebuilding {path}: {e}")
+
+    index = LabelIndex(codebook)
+    if path:
+        with open(path, 'wb') as f:
+            pickle.dump(index, f)
+    return index
+
+
+def _transcript_lines(path):
+    """Paragraphs of a .docx file, or lines of a text file"""
+    if path.lower().endswith('.docx'):
+        try:
+            from docx import Document
+        except ImportError:
+            print("python-docx is not installed. Install it with: pip install python-docx")
+            raise
+        return [paragraph.text for paragraph in Document(path).paragraphs]
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def read_turns(path, speakers=('Expert',)):
+    """
+    Turns of a transcript cleaned by Processing.py.
+
+    Lines without a speaker label continue the previous turn.
+
+    Args:
+        path (str): Cleaned transcript (.docx or text)
+        speakers (tuple, optional): Speakers to keep; None keeps all
+
+    Returns:
+        pandas.DataFrame: Columns transcript (file name), turn (number of the
+                          turn in the transcript), speaker and text
+    """
+    turns = []
+    for line in _transcript_lines(path):
+        line = line.strip()
+        if not line:
+            continue
+        match = TURN_PATTERN.match(line)
+        if match:
+            turns.append([match.group(1), match.group(2)])
+        elif turns:
+            turns[-1][1] += ' ' + line
+
+    df = pd.DataFrame(turns, columns=['speaker', 'text'])
+    df.insert(0, 'turn', np.arange(len(df)))
+    df.insert(0, 'transcript', os.path.basename(path))
+    if speakers is not None:
+        df = df[df['speaker'].isin(speakers)]
+    return df[df['text'].str.strip() != ''].reset_index(drop=True)
+
+
+def suggest_transcripts(paths, index=None, k=5, speakers=('Expert',), min_score=0.05):
+    """
+    Suggested labels for every turn of several transcripts, scored in one batch.
+
+    Args:
+        paths (list): Cleaned transcripts
+        index (LabelIndex, optional): The index; load_index() by default
+        k (int): Suggestions per turn
+        speakers (tuple, optional): Speakers whose turns are coded
+        min_score (float): Suggestions scoring lower than this are left out
+
+    Returns:
+        pandas.DataFrame: Columns transcript, turn, speaker, text, rank, label,
+                          group, codebook and score
+    """
+    index = index or load_index()
+    turns = pd.concat([read_turns(path, speakers) for path in paths], ignore_index=True)
+    suggestions = index.suggest(turns['text'], k=k, min_score=min_score)
+    # 'turn' of the suggestions is the row in turns, not the turn in the transcript
+    return turns.join(suggestions.set_index('turn'), how='inner').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest codebook labels for the turns of cleaned transcripts")
+    parser.add_argument('transcripts', nargs='+', help="Transcripts cleaned by Processing.py (.docx or text)")
+    parser.add_argument('--codebook', nargs='+', default=None,
+                        help="Codebook files (default: data.csv, validation/vis.py and main.py)")
+    parser.add_argument('--k', type=int, default=5, help="Suggestions per turn (default: 5)")
+    parser.add_argument('--min-score', type=float, default=0.05,
+                        help="Leave out suggestions scoring lower than this (default: 0.05)")
+    parser.add_argument('--all-speakers', action='store_true', help="Also suggest codes for interviewer turns")
+    parser.add_argument('--out', default=None, help="CSV file for the suggestions (default: print them)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = load_index(args.codebook)
+    loaded = time.perf_counter()
+    speakers = None if args.all_speakers else ('Expert',)
+    suggestions = suggest_transcripts(args.transcripts, index, args.k, speakers, args.min_score)
+    done = time.perf_counter()
+
+    print(f"{len(index.codebook)} labels indexed in {loaded - start:.2f}s; "
+          f"{len(suggestions.groupby(['transcript', 'turn']))} turns ranked in {(done - loaded) * 1000:.0f}ms")
+    if args.out:
+        suggestions.to_csv(args.out, index=False)
+        print(f"Saved {args.out}")
+    else:
+        for (transcript, turn, text), rows in suggestions.groupby(['transcript', 'turn', 'text'], sort=False):
+            print(f"\n{transcript} #{turn}: {text[:100]}")
+            for _, row in rows.iterrows():
+                print(f"  {row['rank']}. {row['label']} ({row['group']}) {row['score']:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    # Run the imported module, so that a pickled index refers to
+    # qualkit.suggest.LabelIndex rather than __main__.LabelIndex
+    import qualkit.suggest
+    sys.exit(qualkit.suggest.main())
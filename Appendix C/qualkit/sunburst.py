@@ -0,0 +1,192 @@
+"""
+Headless output for the plotly sunbursts.
+
+main.py, ad.py, ad1.py and validation/sun.py used to end in fig.show(), which
+starts a browser renderer and blocks when there is no display. They now call
+show_sunburst, which still opens the figure interactively on a desktop but, in
+headless mode, writes it to disk instead:
+
+    sunbursts/<name>.html    the figure, linking a shared sunbursts/plotly.min.js
+    sunbursts/<name>.png     a static image (svg/pdf with QUALKIT_EXPORT=svg/pdf)
+
+Headless mode is on when QUALKIT_HEADLESS=1, or automatically on Linux without
+a display; QUALKIT_HEADLESS=0 forces the interactive window. plotly.js is
+written once per output directory rather than inlined into every page. Static
+images need the optional kaleido package (pip install kaleido), which renders
+with a local Chrome; without it only the HTML is written.
+
+With hundreds of quotes per sub-theme a sunburst is unreadable and slow to
+draw. Setting QUALKIT_SUNBURST_LOD=<n> makes the scripts show only the first n
+quotes of every sub-theme plus one "N more" node (see level_of_detail in
+qualkit/hierarchy.py). The folded quotes go to sunbursts/<name>.more.json and
+are added page by page when the node is clicked, so the page itself no longer
+grows with the corpus. The sidecar is fetched, so serve the directory over
+HTTP (python -m http.server --directory sunbursts) rather than opening the
+file from disk.
+
+All sunburst scripts can be exported in one batch, each in its own process:
+
+    python -m qualkit.sunburst "Qualitative Analysis Visualisations - Main/main.py" \\
+        "Qualitative Analysis Visualisations - Main/ad.py" --out sunbursts
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from qualkit.export import get_export_mode
+
+HEADLESS_ENV = 'QUALKIT_HEADLESS'
+OUT_DIR_ENV = 'QUALKIT_SUNBURST_DIR'
+DEFAULT_OUT_DIR = 'sunbursts'
+MORE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'sunburst_more.js')
+
+
+def is_headless():
+    """
+    Whether figures should be written to disk instead of shown.
+
+    Returns:
+        bool: The value of QUALKIT_HEADLESS if it is set, otherwise True on
+              Linux when neither DISPLAY nor WAYLAND_DISPLAY is set
+    """
+    value = os.environ.get(HEADLESS_ENV, '').strip().lower()
+    if value:
+        return value not in ('0', 'false', 'no')
+    return sys.platform.startswith('linux') and not (
+        os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def _more_script(sidecar_name):
+    """Script that expands the "N more" nodes of the plot from the sidecar"""
+    with open(MORE_SCRIPT, 'r', encoding='utf-8') as f:
+        script = f.read()
+    # plotly replaces {plot_id} with the id of the plot's div
+    return script + "\nqualkitSunburstMore(document.getElementById('{plot_id}'), %s);\n" % json.dumps(sidecar_name)
+
+
+def export_sunburst(fig, name, out_dir=None, image_format=None, sidecar=None):
+    """
+    Write a figure as HTML with a shared plotly.js, plus a static image if possible.
+
+    Args:
+        fig: Plotly figure
+        name (str): File name without extension, e.g. 'main_sunburst'
+        out_dir (str, optional): Output directory; QUALKIT_SUNBURST_DIR or 'sunbursts'
+        image_format (str, optional): 'png', 'svg' or 'pdf'; follows QUALKIT_EXPORT by default
+        sidecar (dict, optional): Folded leaves from level_of_detail, written to
+                                  <name>.more.json and loaded by the page on click
+
+    Returns:
+        list: Paths of the files that were written
+    """
+    out_dir = out_dir or os.environ.get(OUT_DIR_ENV) or DEFAULT_OUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
+    written = []
+    post_script = None
+    if sidecar:
+        sidecar_path = os.path.join(out_dir, f"{name}.more.json")
+        with open(sidecar_path, 'w', encoding='utf-8') as f:
+            json.dump(sidecar, f, separators=(',', ':'), ensure_ascii=False)
+        written.append(sidecar_path)
+        post_script = _more_script(os.path.basename(sidecar_path))
+
+    # 'directory' links plotly.min.js next to the page and only copies it there
+    # if it is missing, so all sunbursts in out_dir share one copy
+    html_path = os.path.join(out_dir, f"{name}.html")
+    fig.write_html(html_path, include_plotlyjs='directory', auto_open=False, post_script=post_script)
+    written.insert(0, html_path)
+
+    image_format = image_format or get_export_mode()
+    image_path = os.path.join(out_dir, f"{name}.{image_format}")
+    try:
+        import kaleido  # noqa: F401  (used by fig.write_image)
+    except ImportError:
+        print(f"kaleido is not installed; skipping {image_path} (pip install kaleido)")
+        return written
+    try:
+        fig.write_image(image_path, format=image_format)
+        written.append(image_path)
+    except (RuntimeError, ValueError) as e:
+        # kaleido is installed but could not start its renderer (e.g. no Chrome)
+        print(f"Could not render {image_path}: {e}")
+    return written
+
+
+def show_sunburst(fig, name, sidecar=None):
+    """
+    Show a figure interactively, or export it when running headless.
+
+    Args:
+        fig: Plotly figure
+        name (str): File name used in headless mode
+        sidecar (dict, optional): Folded leaves from level_of_detail
+    """
+    if not is_headless():
+        if sidecar:
+            print(f"{name}: the \"N more\" nodes only expand in the exported page (QUALKIT_HEADLESS=1)")
+        fig.show()
+        return
+    for path in export_sunburst(fig, name, sidecar=sidecar):
+        print(f"Saved {path}")
+
+
+def _run_script(job):
+    """Run one sunburst script headlessly from its own directory"""
+    script, out_dir = job
+    script = os.path.abspath(script)
+    env = dict(os.environ, **{HEADLESS_ENV: '1'})
+    if out_dir:
+        env[OUT_DIR_ENV] = os.path.abspath(out_dir)
+    result = subprocess.run([sys.executable, script], cwd=os.path.dirname(script), env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return script, result.returncode, result.stdout
+
+
+def export_scripts(scripts, out_dir=None, jobs=None):
+    """
+    Run sunburst scripts headlessly, in parallel.
+
+    Every script runs in its own Python process, so the hierarchies are built
+    and rendered concurrently.
+
+    Args:
+        scripts (list): Paths of the scripts
+        out_dir (str, optional): Shared output directory; by default each script
+                                 writes to 'sunbursts' next to itself
+        jobs (int, optional): Number of scripts run at once; all by default
+
+    Returns:
+        list: Paths of the scripts that failed
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs or len(scripts) or 1) as pool:
+        for script, returncode, output in pool.map(_run_script, [(s, out_dir) for s in scripts]):
+            print(f"== {script}")
+            print(output.rstrip())
+            if returncode != 0:
+                failed.append(script)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export sunburst scripts headlessly")
+    parser.add_argument('scripts', nargs='+', help="Sunburst scripts to run")
+    parser.add_argument('--out', default=None,
+                        help="Shared output directory (default: 'sunbursts' next to each script)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Number of scripts run at once (default: all)")
+    args = parser.parse_args(argv)
+
+    failed = export_scripts(args.scripts, args.out, args.jobs)
+    if failed:
+        print(f"{len(failed)} script(s) failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Survey responses from the Forms workbook, as a pattern label table.
+
+The survey answers live in "Assessing Threats, Impacts, and Resilience in the
+Digital Age(1-5).xlsx": one row per respondent, six metadata columns (ID,
+Start time, Completion time, Email, Name, Last modified time) and one column
+per question, headed by the Ukrainian question followed by "*" and the
+English one. survey_affin.py used to hold the coded answers as Python tuples.
+Here the workbook is read into one record per answer:
+
+    pattern_label  source  cluster  respondent  question_id  question  response  submitted
+
+The first three columns are those of data.csv and read_pattern_table, so
+coded survey answers go through the same scripts as the interview codes.
+The workbook is opened read-only and its rows are streamed (iter_responses is
+a generator), so thousands of responses load without building the object
+graph of the whole workbook.
+
+A coding round looks like:
+
+    python -m qualkit.survey "Assessing Threats, ... (1-5).xlsx" --out survey_codes.csv
+    # fill in pattern_label and cluster in survey_codes.csv
+    python survey_affin.py      # uses survey_codes.csv instead of its built-in themes
+
+Running the first command again (e.g. for a new batch of responses) adds the
+new answers and keeps the codes already filled in. Needs openpyxl.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+WORKBOOK_NAME = 'Assessing Threats, Impacts, and Resilience in the Digital Age(1-5).xlsx'
+WORKBOOK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), WORKBOOK_NAME)
+CODES_ENV = 'QUALKIT_SURVEY_CODES'
+CODES_NAME = 'survey_codes.csv'
+SOURCE = 'Survey'
+
+# Columns Forms adds before the questions
+METADATA_COLUMNS = ('ID', 'Start time', 'Completion time', 'Email', 'Name', 'Last modified time')
+COLUMNS = ['pattern_label', 'source', 'cluster', 'respondent', 'question_id', 'question', 'response', 'submitted']
+# Key of an answer, to carry codes over between ingestions
+KEY = ['respondent', 'question_id']
+
+
+def _clean(value):
+    """Cell text with non-breaking spaces and runs of whitespace collapsed, or '' for empty cells"""
+    if value is None:
+        return ''
+    # str.split() also splits on non-breaking spaces, and is faster than a regex
+    return ' '.join(str(value).split())
+
+
+def parse_question(header):
+    """
+    The English question of a header "Ukrainian question *English question".
+
+    Forms cuts long headers off with '...'; headers without an English part are
+    returned whole.
+    """
+    text = _clean(header)
+    if '*' in text:
+        text = text.split('*', 1)[1].strip()
+    return text
+
+
+def iter_responses(path=WORKBOOK_PATH, sheet=None):
+    """
+    Stream the answers of a survey workbook, one record per non-empty answer.
+
+    Args:
+        path (str): Workbook (.xlsx)
+        sheet (str, optional): Worksheet name; the first sheet by default
+
+    Yields:
+        dict: respondent, question_id ('Q1', ...), question, response and
+              submitted (completion time)
+
+    Raises:
+        ValueError: If the sheet has no ID column
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        print("openpyxl is not installed. Install it with: pip install openpyxl")
+        raise
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        # Forms stores the dimension as A1, which would stop a read-only
+        # worksheet after the first cell; read up to the last row instead
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        header = [_clean(cell) for cell in next(rows, ())]
+        if 'ID' not in header:
+            raise ValueError(f"{path}: no ID column in the first row")
+        id_column = header.index('ID')
+        time_column = header.index('Completion time') if 'Completion time' in header else None
+        questions = [(i, parse_question(cell)) for i, cell in enumerate(header)
+                     if cell and cell not in METADATA_COLUMNS]
+
+        for row in rows:
+            respondent = _clean(row[id_column]) if id_column < len(row) else ''
+            if not respondent:
+                continue
+            submitted = _clean(row[time_column]) if time_column is not None and time_column < len(row) else ''
+            for number, (column, question) in enumerate(questions, 1):
+                response = _clean(row[column]) if column < len(row) else ''
+                if response:
+                    yield {
+                        'respondent': respondent,
+                        'question_id': f"Q{number}",
+                        'question': question,
+                        'response': response,
+                        'submitted': submitted,
+                    }
+    finally:
+        # Read-only workbooks keep the file open until closed
+        workbook.close()
+
+
+def read_survey(path=WORKBOOK_PATH, sheet=None):
+    """
+    Survey answers as a pattern label table, with empty codes.
+
+    Returns:
+        pandas.DataFrame: Columns COLUMNS, one row per answer
+    """
+    df = pd.DataFrame(iter_responses(path, sheet), columns=COLUMNS[3:])
+    df.insert(0, 'cluster', '')
+    df.insert(0, 'source', SOURCE)
+    df.insert(0, 'pattern_label', '')
+    return df[COLUMNS]
+
+
+def get_codes_path():
+    """Path of the coded survey answers (QUALKIT_SURVEY_CODES, or survey_codes.csv)"""
+    return os.environ.get(CODES_ENV, '').strip() or CODES_NAME
+
+
+def merge_codes(records, coded):
+    """
+    Copy the codes of a previous coding round onto freshly read answers.
+
+    Args:
+        records (pandas.DataFrame): Answers from read_survey
+        coded (pandas.DataFrame): A coded table with the same columns
+
+    Returns:
+        pandas.DataFrame: records with pattern_label and cluster filled in
+                          where coded has them; answers that are only in
+                          coded (e.g. from another workbook) are kept
+    """
+    coded = coded.copy()
+    coded[KEY] = coded[KEY].astype(str)
+    codes = coded.set_index(KEY)[['pattern_label', 'cluster']].fillna('')
+    merged = records.set_index(KEY)
+    merged.update(codes[codes.index.isin(merged.index)])
+    extra = coded.set_index(KEY)
+    extra = extra[~extra.index.isin(merged.index)]
+    return pd.concat([merged, extra]).reset_index()[COLUMNS]
+
+
+def load_coded_survey(path=None):
+    """
+    Coded survey answers in the shape of the themes of survey_affin.py.
+
+    Args:
+        path (str, optional): Coded table; get_codes_path() by default
+
+    Returns:
+        dict: cluster -> [(pattern_label, response), ...] for the coded answers,
+              or {} if there is no coded table or nothing is coded yet
+    """
+    path = path or get_codes_path()
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path, dtype=str).fillna('')
+    df = df[(df['pattern_label'] != '') & (df['cluster'] != '')]
+    themes = {}
+    for cluster, label, response in zip(df['cluster'], df['pattern_label'], df['response']):
+        themes.setdefault(cluster, []).append((label, response))
+    return themes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read survey responses into a pattern label table for coding")
+    parser.add_argument('workbook', nargs='?', default=WORKBOOK_PATH, help="Forms workbook (.xlsx)")
+    parser.add_argument('--sheet', default=None, help="Worksheet (default: the first)")
+    parser.add_argument('--out', default=None,
+                        help="CSV file for the answers; codes already in it are kept (default: survey_codes.csv)")
+    args = parser.parse_args(argv)
+
+    out = args.out or get_codes_path()
+    records = read_survey(args.workbook, args.sheet)
+    if os.path.exists(out):
+        records = merge_codes(records, pd.read_csv(out, dtype=str).fillna(''))
+    records.to_csv(out, index=False)
+
+    coded = (records['pattern_label'] != '').sum()
+    print(f"{len(records)} answers from {records['respondent'].nunique()} respondents, {coded} coded")
+    print(f"Saved {os.path.abspath(out)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import os
+import random
+import re
+import sys
+
+# Make the shared qualkit package importable, as the scripts do
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.keywords import KeywordAutomaton
+
+# '+' phrases next to phrases made of their repeated letter
+PHRASES = ['um+', 'uh+', 'umm', 'mmm', 'hmm+', 'like', 'you know', 'so']
+WORDS = ['um', 'umm', 'ummmmmmmmmmmm', 'mm', 'mmm', 'mmmmmmm', 'uh', 'uhhhhhhh', 'hm', 'hmm', 'hmmmmmm',
+         'like', 'likely', 'you', 'know', 'so', 'also', 'Um', 'UMMM', 'ummmh', 'um-mmm', 'mmm,', 'um.']
+
+
+def regex_sub(text):
+    """The regexes the automaton replaced, applied one after the other"""
+    for phrase in PHRASES:
+        pattern = re.escape(phrase[:-1]) + '+' if phrase.endswith('+') else re.escape(phrase)
+        text = re.sub(r'\b' + pattern + r'\b', '', text, flags=re.IGNORECASE)
+    return text
+
+
+def test_repeated_letters_match_like_the_regexes():
+    automaton = KeywordAutomaton(PHRASES)
+    assert automaton.sub('', 'ummmmmmmmmm mmm hmmmm so') == '   '
+    assert automaton.findall('ummmm mmm') == [(0, 5, 'um+'), (6, 9, 'mmm')]
+
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+        assert automaton.sub('', text) == regex_sub(text), text
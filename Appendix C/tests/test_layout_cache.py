@@ -0,0 +1,40 @@
+import math
+import os
+import sys
+
+# Make the shared qualkit package importable, as the scripts do
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from qualkit.layout_cache import LAYOUT_CACHE_ENV, cached_layout
+
+
+def circle(nodes, radius=8.0):
+    return {node: (radius * math.cos(2 * math.pi * i / len(nodes)), radius * math.sin(2 * math.pi * i / len(nodes)))
+            for i, node in enumerate(nodes)}
+
+
+def test_new_node_does_not_take_a_known_position(tmp_path, monkeypatch):
+    monkeypatch.setenv(LAYOUT_CACHE_ENV, str(tmp_path / 'layout_cache.json'))
+    first = cached_layout('participants', circle(['PV1', 'PV2', 'PV3']))
+
+    # PV0 is added and PV3 removed; PV0's computed slot is PV1's stored one
+    second = cached_layout('participants', circle(['PV0', 'PV1', 'PV2']))
+
+    assert list(second) == ['PV0', 'PV1', 'PV2']
+    assert second['PV1'] == first['PV1'] and second['PV2'] == first['PV2']
+    positions = [tuple(round(c, 9) for c in xy) for xy in second.values()]
+    assert len(set(positions)) == len(positions)
+    # The free slot is the one the removed node left
+    assert math.dist(second['PV0'], first['PV3']) < 1e-9
+
+
+def test_parallel_saves_keep_each_others_sections(tmp_path, monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+    from qualkit.layout_cache import load_layout
+
+    monkeypatch.setenv(LAYOUT_CACHE_ENV, str(tmp_path / 'layout_cache.json'))
+    names = ['figure{}'.format(i) for i in range(8)]
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(cached_layout, names, [circle(['A', 'B'])] * len(names)))
+
+    assert all(load_layout(name) for name in names)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == '.tmp'] == []